@@ -0,0 +1,55 @@
+"""
+Compares the parallel pyfiles.zip builder against a serial zipfile writer
+for a large generated package tree, by number of workers.
+
+    python benchmarks/bench_parallel_zip.py [modules] [compression] [level]
+"""
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+from bench_pyfiles_zip import generate_tree
+from emr_cli.packaging.archive import COMPRESSION_METHODS, ZipArchiveBuilder
+
+
+def serial_zip(target: str, files: dict, compression: str, level: int):
+    with zipfile.ZipFile(target, "w") as zf:
+        for arcname in sorted(files):
+            zf.write(files[arcname], arcname, COMPRESSION_METHODS[compression], level)
+
+
+def best_of(runs: int, fn, *args):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    compression = sys.argv[2] if len(sys.argv) > 2 else "deflated"
+    level = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+    cpus = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = generate_tree(os.path.join(tmp, "src"), modules)
+        print(f"{modules} modules, {compression}:{level}, {cpus} CPUs\n")
+
+        baseline = best_of(3, serial_zip, os.path.join(tmp, "serial.zip"), files, compression, level)
+        print(f"{'writer':<16}{'time (s)':>10}{'speed-up':>10}")
+        print(f"{'zipfile serial':<16}{baseline:>10.2f}{1.0:>10.2f}")
+
+        workers = 1
+        while workers <= cpus:
+            builder = ZipArchiveBuilder(compression, level, workers=workers)
+            elapsed = best_of(3, builder.build, os.path.join(tmp, f"parallel-{workers}.zip"), files)
+            print(f"{f'{workers} workers':<16}{elapsed:>10.2f}{baseline / elapsed:>10.2f}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
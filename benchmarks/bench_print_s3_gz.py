@@ -0,0 +1,110 @@
+"""
+Reports peak RSS and time to first output of print_s3_gz for large synthetic
+driver logs, compared to decompressing the whole log in memory.
+
+    python benchmarks/bench_print_s3_gz.py [size_mb ...]
+
+Each measurement runs in a fresh subprocess, with stdout sent to /dev/null.
+"""
+import gzip
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+WORDS = ["INFO", "WARN", "executor", "task", "stage", "partition", "shuffle", "ünïcödé", "✓", "rows=", "42"]
+
+
+def generate_log(path: str, size_mb: int):
+    rng = random.Random(0)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with gzip.open(path, "wb", compresslevel=1) as f:
+        while written < target:
+            block = io.StringIO()
+            for i in range(1000):
+                block.write(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 30))))
+                block.write("\n")
+            data = block.getvalue().encode()
+            f.write(data)
+            written += len(data)
+
+
+class FileClient:
+    """
+    Stands in for the S3 client, serving the local file as the object body.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def get_object(self, Bucket, Key):
+        return {"Body": open(self.path, "rb")}
+
+
+class FirstWrite:
+    """
+    Records when the first byte is written to stdout.
+    """
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.first = None
+
+    def write(self, s):
+        if self.first is None:
+            self.first = time.perf_counter()
+        return self.stream.write(s)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def child(mode: str, path: str):
+    import resource
+
+    from emr_cli.utils import print_s3_gz
+
+    client = FileClient(path)
+    out = FirstWrite(sys.stdout)
+    sys.stdout = out
+    start = time.perf_counter()
+    if mode == "streaming":
+        print_s3_gz(client, "s3://bench/stdout.gz")
+    else:
+        with gzip.open(client.get_object("bench", "stdout.gz")["Body"]) as data:
+            print(data.read().decode())
+    end = time.perf_counter()
+    sys.stdout = out.stream
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{peak_kb} {out.first - start:.3f} {end - start:.3f}", file=sys.stderr)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [64, 256, 1024]
+    print(f"{'log MiB':>8}{'mode':>12}{'peak RSS MiB':>14}{'first (s)':>11}{'total (s)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in sizes:
+            path = os.path.join(tmp, f"stdout-{size_mb}.gz")
+            generate_log(path, size_mb)
+            for mode in ["in-memory", "streaming"]:
+                with open(os.devnull, "w") as devnull:
+                    result = subprocess.run(
+                        [sys.executable, __file__, "--child", mode, path],
+                        stdout=devnull,
+                        stderr=subprocess.PIPE,
+                        check=True,
+                        text=True,
+                    )
+                peak_kb, first, total = result.stderr.split()
+                print(f"{size_mb:>8}{mode:>12}{int(peak_kb) / 1024:>14.1f}{float(first):>11.3f}{float(total):>11.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
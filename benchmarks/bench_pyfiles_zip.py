@@ -0,0 +1,75 @@
+"""
+Compares the size and build time of pyfiles.zip across compression settings
+for a large generated package tree.
+
+    python benchmarks/bench_pyfiles_zip.py [modules]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+from emr_cli.packaging.archive import ZipArchiveBuilder
+
+SETTINGS = [
+    ("stored", None),
+    ("deflated", 1),
+    ("deflated", 6),
+    ("deflated", 9),
+    ("bzip2", 9),
+    ("lzma", None),
+]
+
+
+def generate_tree(root: str, modules: int):
+    rng = random.Random(42)
+    files = {}
+    for i in range(modules):
+        relpath = os.path.join(f"pkg{i % 50}", f"sub{i % 7}", f"module_{i}.py")
+        path = os.path.join(root, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            for j in range(rng.randint(20, 400)):
+                f.write(f"def function_{j}(value_{j}):\n    return value_{j} * {rng.randint(0, 10**6)}\n\n")
+        files[relpath] = path
+    return files
+
+
+def legacy_zip(target: str, files: dict):
+    # What pyfiles.zip used to be: ZIP_STORED in walk order with real mtimes
+    with zipfile.ZipFile(target, "w") as zf:
+        for arcname, path in files.items():
+            zf.write(path, arcname)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        files = generate_tree(os.path.join(tmp, "src"), modules)
+        source_size = sum(os.path.getsize(p) for p in files.values())
+        print(f"{modules} modules, {source_size / 1024 / 1024:.1f} MiB of source\n")
+        print(f"{'setting':<16}{'time (s)':>10}{'size (MiB)':>12}{'ratio':>8}")
+
+        target = os.path.join(tmp, "legacy.zip")
+        elapsed = timed(legacy_zip, target, files)
+        size = os.path.getsize(target)
+        print(f"{'legacy':<16}{elapsed:>10.2f}{size / 1024 / 1024:>12.2f}{size / source_size:>8.2f}")
+
+        for compression, level in SETTINGS:
+            target = os.path.join(tmp, f"{compression}-{level}.zip")
+            elapsed = timed(ZipArchiveBuilder(compression, level).build, target, files)
+            size = os.path.getsize(target)
+            name = f"{compression}:{level}" if level is not None else compression
+            print(f"{name:<16}{elapsed:>10.2f}{size / 1024 / 1024:>12.2f}{size / source_size:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
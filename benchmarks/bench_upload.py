@@ -0,0 +1,70 @@
+"""
+Reports S3 upload throughput of PrettyUploader across transfer settings,
+against a local moto server standing in for S3.
+
+    pip install "moto[server]"
+    python benchmarks/bench_upload.py [size_mb] [files]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import boto3
+from moto.server import ThreadedMotoServer
+
+from emr_cli.utils import PrettyUploader, build_transfer_config
+
+BUCKET = "emr-cli-bench"
+
+# (multipart threshold MiB, chunk size MiB, max concurrency)
+SETTINGS = [
+    (None, None, None),
+    (8, 8, 1),
+    (8, 8, 4),
+    (8, 8, 10),
+    (8, 16, 10),
+    (8, 32, 20),
+]
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    file_count = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    client = boto3.client("s3", endpoint_url=f"http://{host}:{port}", region_name="us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {}
+            for i in range(file_count):
+                path = os.path.join(tmp, f"artifact{i}.bin")
+                with open(path, "wb") as f:
+                    f.write(os.urandom(size_mb * 1024 * 1024))
+                files[path] = f"bench/artifact{i}.bin"
+            total_mb = size_mb * file_count
+            print(f"{file_count} files x {size_mb} MiB\n")
+            print(f"{'threshold':>10}{'chunk':>8}{'conc.':>8}{'time (s)':>10}{'MiB/s':>10}")
+
+            for threshold, chunksize, concurrency in SETTINGS:
+                config = build_transfer_config(threshold, chunksize, concurrency)
+                uploader = PrettyUploader(client, BUCKET, files, skip_unchanged=False, transfer_config=config)
+                start = time.perf_counter()
+                uploader.run()
+                elapsed = time.perf_counter() - start
+                label = [str(v) if v is not None else "default" for v in (threshold, chunksize, concurrency)]
+                print(f"{label[0]:>10}{label[1]:>8}{label[2]:>8}{elapsed:>10.2f}{total_mb / elapsed:>10.1f}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+A single boto3 session and one client per service and region, shared across the CLI.
+
+Clients are created with the connection pool, retry and timeout settings from the
+`aws` section of `.emr/config.yaml`, e.g.
+
+    aws:
+      max_pool_connections: 64
+      retry_mode: adaptive
+      max_attempts: 10
+      connect_timeout: 10
+      read_timeout: 60
+
+boto3 is imported the first time a client is needed, not when this module is imported.
+"""
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from emr_cli.config import ConfigReader
+
+if TYPE_CHECKING:
+    from boto3.session import Session
+    from botocore.config import Config
+
+DEFAULT_AWS_SETTINGS = {
+    # Enough for concurrent multipart uploads and parallel log downloads
+    "max_pool_connections": 32,
+    "retry_mode": "adaptive",
+    "max_attempts": 10,
+    "connect_timeout": 10,
+    "read_timeout": 60,
+    "profile": None,
+}
+
+# Creating sessions and clients isn't thread-safe in boto3, using clients is
+_lock = threading.RLock()
+_session: Optional["Session"] = None
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_overrides: Dict[str, Any] = {}
+
+
+def aws_settings() -> dict:
+    """
+    Returns the client settings: defaults, then the `aws` config section, then `configure` overrides.
+    """
+    settings = dict(DEFAULT_AWS_SETTINGS)
+    settings.update((ConfigReader.read() or {}).get("aws") or {})
+    settings.update(_overrides)
+    return settings
+
+
+def configure(**overrides):
+    """
+    Overrides settings for clients created after this call, e.g. a larger
+    connection pool for a command that runs many requests at once.
+    """
+    with _lock:
+        unknown = set(overrides) - set(DEFAULT_AWS_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown AWS client settings: {', '.join(sorted(unknown))}")
+        _overrides.update(overrides)
+        _clients.clear()
+
+
+def session() -> "Session":
+    global _session
+    with _lock:
+        if _session is None:
+            import boto3
+
+            _session = boto3.session.Session(profile_name=aws_settings().get("profile"))
+        return _session
+
+
+def region_name() -> Optional[str]:
+    """
+    The region clients are created in by default. Resolving it doesn't make any API calls.
+    """
+    return session().region_name
+
+
+def client_config() -> "Config":
+    from botocore.config import Config
+
+    settings = aws_settings()
+    return Config(
+        max_pool_connections=settings["max_pool_connections"],
+        retries={"mode": settings["retry_mode"], "max_attempts": settings["max_attempts"]},
+        connect_timeout=settings["connect_timeout"],
+        read_timeout=settings["read_timeout"],
+    )
+
+
+def client(service: str, region: Optional[str] = None) -> Any:
+    """
+    Returns the shared client for `service` in `region`, or in the default region.
+    """
+    key = (service, region or None)
+    with _lock:
+        if key not in _clients:
+            _clients[key] = session().client(service, region_name=region or None, config=client_config())
+        return _clients[key]
+
+
+def reset():
+    """
+    Forgets the session, clients and overrides. Mostly useful in tests.
+    """
+    global _session
+    with _lock:
+        _session = None
+        _clients.clear()
+        _overrides.clear()
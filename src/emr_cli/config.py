@@ -1,7 +1,5 @@
 from pathlib import Path
 
-import yaml
-
 from emr_cli.utils import console_log
 
 DEFAULT_CONFIG_PATH = ".emr/config.yaml"
@@ -16,6 +14,9 @@ class ConfigReader:
         if not p.is_file():
             return config
 
+        # Only pay for importing yaml when there's actually a config file
+        import yaml
+
         with p.open() as infile:
             try:
                 config = yaml.safe_load(infile)
@@ -24,16 +25,29 @@ class ConfigReader:
                 console_log(f"There was an error parsing the config file: {exc}")
                 return config
 
+    @classmethod
+    def project_settings(cls) -> dict:
+        """
+        Returns the `project` section of the config file, which holds settings
+        for detecting and packaging the local project.
+        """
+        return (cls.read() or {}).get("project") or {}
+
 
 class ConfigWriter:
     @classmethod
     def write(cls, config):
         """
-        Write the passed config, overwriting any existing config.
+        Write the passed config sections, replacing those sections in any existing
+        config and keeping the others, like `project` and `aws`.
         """
+        import yaml
+
         p = Path(DEFAULT_CONFIG_PATH)
 
         p.parent.mkdir(parents=True, exist_ok=True)
 
+        existing = ConfigReader.read()
+        merged = {**(existing if isinstance(existing, dict) else {}), **config}
         with p.open("w") as outfile:
-            outfile.write(yaml.dump(config))
+            outfile.write(yaml.dump(merged))
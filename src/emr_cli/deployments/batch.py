@@ -0,0 +1,226 @@
+import itertools
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from emr_cli.utils import console_log
+
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Used for runs that never got a job run ID
+SUBMIT_FAILED = "SUBMIT_FAILED"
+
+
+class BatchRun:
+    """
+    One set of job arguments in a batch, and what happened to it.
+    """
+
+    def __init__(self, index: int, job_args: List[str]) -> None:
+        self.index = index
+        self.job_args = job_args
+        self.job_run_id: Optional[str] = None
+        self.state: Optional[str] = None
+        self.details: Any = None
+        self.succeeded = False
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+
+    def finish(self, state: str, details: Any = None, succeeded: bool = False):
+        self.state = state
+        self.details = details
+        self.succeeded = succeeded
+        self._finished = time.monotonic()
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self._finished is None:
+            return None
+        return self._finished - self._started
+
+
+def expand_matrix(matrix: Dict[str, List[Any]]) -> List[List[str]]:
+    """
+    Returns one set of job arguments for every combination of matrix values,
+    passed as `--<name> <value>` pairs in the order the names are defined.
+
+    {"date": ["2024-01-01", "2024-01-02"], "region": ["eu"]} becomes
+    [["--date", "2024-01-01", "--region", "eu"], ["--date", "2024-01-02", "--region", "eu"]]
+    """
+    names = list(matrix.keys())
+    for name in names:
+        if not isinstance(matrix[name], list) or not matrix[name]:
+            raise ValueError(f"matrix value for '{name}' must be a non-empty list")
+
+    arg_sets = []
+    for values in itertools.product(*(matrix[name] for name in names)):
+        args = []
+        for name, value in zip(names, values):
+            args += [f"--{name}", str(value)]
+        arg_sets.append(args)
+    return arg_sets
+
+
+def parse_batch_entries(entries: Any) -> List[List[str]]:
+    """
+    Parses the contents of a batch file. This is either a list where every item is
+    a list of job arguments or a comma-delimited string like `--job-args`, or a
+    mapping with a `matrix` of argument values to expand.
+    """
+    if isinstance(entries, dict) and "matrix" in entries:
+        return expand_matrix(entries["matrix"])
+    if not isinstance(entries, list):
+        raise ValueError("batch file must contain a list of job arguments or a `matrix` mapping")
+
+    arg_sets = []
+    for entry in entries:
+        if isinstance(entry, str):
+            arg_sets.append(entry.split(","))
+        elif isinstance(entry, list):
+            arg_sets.append([str(arg) for arg in entry])
+        else:
+            raise ValueError(f"unsupported batch entry: {entry!r}")
+    return arg_sets
+
+
+def load_batch_file(path: str) -> List[List[str]]:
+    # YAML is a superset of JSON, so this handles both
+    import yaml
+
+    with open(path) as f:
+        return parse_batch_entries(yaml.safe_load(f))
+
+
+class BatchRunner:
+    """
+    Submits one job run per set of job arguments through a bounded thread pool and
+    optionally waits for all of them to finish.
+
+    `submit(job_name, job_args)` must return a job run ID, and
+    `wait(job_run_id, label)` must return the final job run with its `state`.
+    Backends that can wait on many runs at once pass `wait_all(labels)` as well,
+    which yields `(job_run_id, final job run, error)` as each run finishes, so the
+    whole batch is waited on from one thread. Otherwise runs are waited on through
+    a pool of `max_workers` threads.
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[str, List[str]], str],
+        wait: Optional[Callable[[str, str], dict]],
+        success_state: str,
+        max_workers: int = DEFAULT_BATCH_CONCURRENCY,
+        wait_all: Optional[Callable[[Dict[str, str]], Iterable[Tuple[str, dict, Optional[BaseException]]]]] = None,
+    ) -> None:
+        self._submit = submit
+        self._wait = wait
+        self._wait_all = wait_all
+        self.success_state = success_state
+        self.max_workers = max_workers
+
+    def run(self, job_name: str, arg_sets: List[List[str]]) -> List[BatchRun]:
+        runs = [BatchRun(i + 1, args) for i, args in enumerate(arg_sets)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda run: self._submit_run(job_name, run), runs))
+
+        submitted = [run for run in runs if run.job_run_id is not None]
+        if self._wait is not None and submitted:
+            if self._wait_all is not None:
+                self._wait_batch(submitted)
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(submitted), self.max_workers)) as executor:
+                    list(executor.map(self._wait_run, submitted))
+        else:
+            for run in submitted:
+                run.finish("SUBMITTED", succeeded=True)
+        return runs
+
+    def _submit_run(self, job_name: str, run: BatchRun):
+        try:
+            run.job_run_id = self._submit(f"{job_name}-{run.index}", run.job_args)
+        except Exception as e:
+            run.finish(SUBMIT_FAILED, str(e))
+
+    def _wait_run(self, run: BatchRun):
+        assert self._wait is not None and run.job_run_id is not None
+        try:
+            response = self._wait(run.job_run_id, self._label(run))
+        except Exception as e:
+            run.finish("UNKNOWN", str(e))
+            return
+        self._finish_run(run, response)
+
+    def _wait_batch(self, runs: List[BatchRun]):
+        assert self._wait_all is not None
+        by_id = {run.job_run_id: run for run in runs}
+        labels = {run.job_run_id: self._label(run) for run in runs}
+        try:
+            for job_run_id, response, error in self._wait_all(labels):  # type: ignore[arg-type]
+                run = by_id.pop(job_run_id)
+                if error is not None:
+                    run.finish("UNKNOWN", str(error))
+                else:
+                    self._finish_run(run, response)
+        except Exception as e:
+            for run in by_id.values():
+                run.finish("UNKNOWN", str(e))
+
+    def _finish_run(self, run: BatchRun, response: dict):
+        state = response.get("state")
+        run.finish(state, response.get("stateDetails"), succeeded=state == self.success_state)
+
+    @staticmethod
+    def _label(run: BatchRun) -> str:
+        return f"Run {run.index} ({run.job_run_id})"
+
+
+def print_batch_summary(runs: List[BatchRun]):
+    from rich.console import Console
+    from rich.table import Table
+    from rich.text import Text
+
+    table = Table(title="Batch summary")
+    table.add_column("#", justify="right")
+    table.add_column("Job args")
+    table.add_column("Job run ID")
+    table.add_column("State")
+    table.add_column("Duration", justify="right")
+    table.add_column("Details")
+    for run in runs:
+        # Text cells, so job args and error messages aren't parsed as rich markup
+        table.add_row(
+            str(run.index),
+            Text(" ".join(run.job_args)),
+            Text(run.job_run_id or ""),
+            Text(str(run.state), style="green" if run.succeeded else "red"),
+            "" if run.duration is None else f"{run.duration:.0f}s",
+            Text(str(run.details or "")),
+        )
+    Console().print(table)
+
+
+def run_batch(
+    backend: Any,
+    submit: Callable[[str, List[str]], str],
+    job_name: str,
+    arg_sets: List[List[str]],
+    wait: bool,
+    max_workers: int = DEFAULT_BATCH_CONCURRENCY,
+    max_poll_interval: Optional[float] = None,
+):
+    """
+    Runs a batch against one of the deployment backends, prints a summary,
+    and exits with an error if any of the runs failed.
+    """
+    waiter = batch_waiter = None
+    if wait:
+        waiter = lambda job_run_id, label: backend.wait_for_job(job_run_id, max_poll_interval, label)  # noqa: E731
+        if hasattr(backend, "wait_for_jobs"):
+            batch_waiter = lambda labels: backend.wait_for_jobs(labels, max_poll_interval)  # noqa: E731
+
+    console_log(f"Submitting {len(arg_sets)} job runs, up to {max_workers} at a time...")
+    runs = BatchRunner(submit, waiter, backend.SUCCESS_STATE, max_workers, batch_waiter).run(job_name, arg_sets)
+    print_batch_summary(runs)
+    if not all(run.succeeded for run in runs):
+        sys.exit(1)
@@ -0,0 +1,398 @@
+"""
+Helpers for `emr bootstrap`: creating a set of AWS resources concurrently, in dependency
+order, and only creating or updating the ones that are missing or changed.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote
+
+from botocore.exceptions import ClientError
+
+from emr_cli.deployments.polling import Backoff
+from emr_cli.utils import StageTimer, console_log
+
+# How long we wait for a new IAM role or instance profile to be usable by other services
+IAM_PROPAGATION_TIMEOUT = 120
+
+BOOTSTRAP_STATE_PATH = ".emr/bootstrap-state.json"
+
+# What head/get/describe calls return for resources that don't exist. EMR returns
+# InvalidRequestException for unknown clusters and security configurations.
+NOT_FOUND_ERROR_CODES = {
+    "404",
+    "NoSuchBucket",
+    "NoSuchEntity",
+    "ResourceNotFoundException",
+    "InvalidRequestException",
+}
+
+
+class ResourceGraph:
+    """
+    Creates resources concurrently. Each resource is created as soon as the resources
+    it depends on exist, and its create function gets their results as arguments.
+
+    If a resource can't be created, nothing that hasn't started yet is created and
+    the error is raised once the resources already in flight are done.
+    """
+
+    def __init__(self, max_workers: int = 8) -> None:
+        self.max_workers = max_workers
+        self.timer = StageTimer()
+        self._resources: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+
+    def add(self, name: str, create: Callable[..., Any], depends_on: Sequence[str] = ()):
+        """
+        Adds a resource. Dependencies have to be added first, so the graph can't have cycles.
+        """
+        missing = [dep for dep in depends_on if dep not in self._resources]
+        if missing:
+            raise ValueError(f"{name} depends on unknown resources: {', '.join(missing)}")
+        self._resources[name] = (create, tuple(depends_on))
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Creates every resource and returns their results by name.
+        """
+        self.timer = StageTimer()
+        results: Dict[str, Any] = {}
+        pending = dict(self._resources)
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while running or (pending and error is None):
+                if error is None:
+                    for name, (create, deps) in list(pending.items()):
+                        if all(dep in results for dep in deps):
+                            del pending[name]
+                            # The dependency that finished last is the one this resource waited on
+                            after = max(deps, key=lambda dep: self.timer.stages[dep][1]) if deps else None
+                            args = [results[dep] for dep in deps]
+                            running[executor.submit(self.timer.time, name, create, *args, after=after)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        error = error or e
+
+        if error is not None:
+            raise error
+        return results
+
+
+def is_iam_propagation_error(e: ClientError) -> bool:
+    """
+    Whether an error is likely caused by a new IAM role or instance profile not being visible yet.
+    """
+    error = e.response.get("Error", {})
+    code, message = error.get("Code", ""), error.get("Message", "")
+    if code == "MalformedPolicyDocument":
+        # IAM rejects trust policies with principals it doesn't know about yet
+        return "principal" in message.lower()
+    if code == "ValidationException":
+        # EMR rejects instance profiles it can't see yet
+        return "instanceprofile" in message.lower().replace(" ", "")
+    return False
+
+
+def wait_for_propagation(
+    create: Callable[[], Any],
+    timeout: float = IAM_PROPAGATION_TIMEOUT,
+    backoff: Optional[Backoff] = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> Any:
+    """
+    Calls `create` until it stops failing because of IAM's eventual consistency, for up to
+    `timeout` seconds. New roles usually propagate within a few seconds, so we retry every
+    second at first and back off from there.
+    """
+    backoff = backoff or Backoff(max_interval=10)
+    deadline = clock() + timeout
+    while True:
+        try:
+            return create()
+        except ClientError as e:
+            if not is_iam_propagation_error(e) or clock() >= deadline:
+                raise
+        backoff.sleep()
+        backoff.increase()
+
+
+class BootstrapState:
+    """
+    The resources `emr bootstrap` created, saved to `.emr/bootstrap-state.json` as soon as
+    each one exists, so re-running bootstrap only creates what's missing and `--destroy`
+    knows what to delete without looking it up.
+
+    Resources are keyed like `role:<name>` and scoped to an account and region, so the
+    same project can be bootstrapped in several accounts.
+    """
+
+    def __init__(self, account_id: str, region: str, partition: str = "aws", path: str = BOOTSTRAP_STATE_PATH):
+        self.account_id = account_id
+        self.region = region
+        self.partition = partition
+        self.path = path
+        self.scope = f"{account_id}/{region}"
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_caller(cls, sts_client, region: str, path: str = BOOTSTRAP_STATE_PATH) -> "BootstrapState":
+        identity = sts_client.get_caller_identity()
+        return cls(identity["Account"], region, identity["Arn"].split(":")[1], path)
+
+    @property
+    def resources(self) -> Dict[str, dict]:
+        with self._lock:
+            return self._read().get(self.scope, {})
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.resources.get(key)
+
+    def record(self, key: str, **attrs) -> dict:
+        """
+        Merges `attrs` into the recorded resource and saves the state file.
+        """
+        with self._lock:
+            state = self._read()
+            resource = {**state.setdefault(self.scope, {}).get(key, {}), **attrs}
+            state[self.scope][key] = resource
+            self._write(state)
+            return resource
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _write(self, state: dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def error_code(e: ClientError) -> str:
+    return e.response.get("Error", {}).get("Code", "")
+
+
+def describe(call: Callable[[], Any]) -> Optional[Any]:
+    """
+    Calls a head/get/describe API and returns its response, or None if the resource doesn't exist.
+    """
+    try:
+        return call()
+    except ClientError as e:
+        if error_code(e) in NOT_FOUND_ERROR_CODES:
+            return None
+        raise
+
+
+def exists(call: Callable[[], Any]) -> bool:
+    return describe(call) is not None
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def ensure_bucket(state: BootstrapState, s3_client, bucket_name: str, policy: str):
+    """
+    Creates an S3 bucket with `policy` if it's missing, or updates its policy if it changed.
+
+    Buckets often hold data that predates the project, so an existing bucket this state
+    file didn't create is used as-is: its policy isn't touched and `--destroy` leaves it alone.
+    """
+    key = f"bucket:{bucket_name}"
+    recorded = state.get(key) or {}
+    digest = text_sha256(policy)
+    if recorded.get("policy_sha256") == digest and exists(lambda: s3_client.head_bucket(Bucket=bucket_name)):
+        console_log(f"Found S3 bucket: s3://{bucket_name}")
+        return
+
+    try:
+        s3_client.create_bucket(
+            Bucket=bucket_name,
+            CreateBucketConfiguration={"LocationConstraint": s3_client.meta.region_name},
+        )
+        console_log(f"Created S3 bucket: s3://{bucket_name}")
+    except ClientError as e:
+        if error_code(e) != "BucketAlreadyOwnedByYou":
+            raise
+        if not recorded:
+            console_log(f"Using existing S3 bucket: s3://{bucket_name} (not created by bootstrap, left unchanged)")
+            return
+        console_log(f"Updated S3 bucket: s3://{bucket_name}")
+    s3_client.put_bucket_policy(Bucket=bucket_name, Policy=policy)
+    state.record(key, name=bucket_name, policy_sha256=digest)
+
+
+def ensure_policy(state: BootstrapState, iam_client, name: str, document: str) -> str:
+    """
+    Creates a managed IAM policy if it's missing, or adds a new default version if its
+    document changed, and returns its ARN.
+
+    Only policies this state file created are ever changed. Policy names are shared by
+    the whole account, so an existing policy bootstrapped by another project is used
+    as-is if it has the same document, and is an error otherwise.
+    """
+    key = f"policy:{name}"
+    recorded = state.get(key) or {}
+    arn = recorded.get("arn") or f"arn:{state.partition}:iam::{state.account_id}:policy/{name}"
+    digest = text_sha256(document)
+    if recorded.get("document_sha256") == digest and exists(lambda: iam_client.get_policy(PolicyArn=arn)):
+        console_log(f"Found IAM Policy: {arn}")
+        return arn
+
+    try:
+        arn = iam_client.create_policy(PolicyName=name, PolicyDocument=document)["Policy"]["Arn"]
+        console_log(f"Created IAM Policy: {arn}")
+    except ClientError as e:
+        if error_code(e) != "EntityAlreadyExists":
+            raise
+        if not recorded:
+            if _policy_document(iam_client, arn) != json.loads(document):
+                raise RuntimeError(
+                    f"IAM policy {arn} already exists with a different document and wasn't created by this "
+                    f"project's bootstrap ({state.path}), so it won't be changed. Delete it or update it yourself."
+                )
+            console_log(f"Found IAM Policy: {arn}")
+            return arn
+        # IAM keeps at most 5 versions of a policy
+        versions = iam_client.list_policy_versions(PolicyArn=arn)["Versions"]
+        old_versions = sorted((v for v in versions if not v["IsDefaultVersion"]), key=lambda v: v["CreateDate"])
+        if len(versions) >= 5:
+            iam_client.delete_policy_version(PolicyArn=arn, VersionId=old_versions[0]["VersionId"])
+        iam_client.create_policy_version(PolicyArn=arn, PolicyDocument=document, SetAsDefault=True)
+        console_log(f"Updated IAM Policy: {arn}")
+    state.record(key, arn=arn, document_sha256=digest)
+    return arn
+
+
+def _policy_document(iam_client, arn: str) -> Any:
+    """
+    Returns the document of a policy's default version.
+    """
+    version_id = iam_client.get_policy(PolicyArn=arn)["Policy"]["DefaultVersionId"]
+    document = iam_client.get_policy_version(PolicyArn=arn, VersionId=version_id)["PolicyVersion"]["Document"]
+    # boto3 decodes policy documents, other clients return them URL-encoded
+    return json.loads(unquote(document)) if isinstance(document, str) else document
+
+
+def ensure_role(state: BootstrapState, iam_client, name: str, trust_policy: str) -> str:
+    """
+    Creates an IAM role if it's missing, or updates its trust policy if it changed, and returns its ARN.
+
+    Bootstrap attaches policies to the role, so an existing role this state file didn't
+    create is an error rather than something to take over.
+    """
+    key = f"role:{name}"
+    recorded = state.get(key) or {}
+    digest = text_sha256(trust_policy)
+    try:
+        arn = iam_client.get_role(RoleName=name)["Role"]["Arn"]
+    except ClientError as e:
+        if error_code(e) not in NOT_FOUND_ERROR_CODES:
+            raise
+        arn = iam_client.create_role(RoleName=name, AssumeRolePolicyDocument=trust_policy)["Role"]["Arn"]
+        console_log(f"Created IAM Role: {arn}")
+    else:
+        if not recorded:
+            raise RuntimeError(
+                f"IAM role {arn} already exists and wasn't created by this project's bootstrap ({state.path}), "
+                "so it won't be changed. Choose another role name or delete the role."
+            )
+        if recorded.get("trust_policy_sha256") == digest:
+            console_log(f"Found IAM Role: {arn}")
+        else:
+            iam_client.update_assume_role_policy(RoleName=name, PolicyDocument=trust_policy)
+            console_log(f"Updated IAM Role: {arn}")
+    state.record(key, arn=arn, trust_policy_sha256=digest)
+    return arn
+
+
+def attach_role_policies(state: BootstrapState, iam_client, role_name: str, policy_arns: List[str]):
+    """
+    Attaches managed policies to a role. Attaching is idempotent, so this always runs.
+    """
+    for policy_arn in policy_arns:
+        iam_client.attach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
+    attached = set((state.get(f"role:{role_name}") or {}).get("attached_policies", []))
+    state.record(f"role:{role_name}", attached_policies=sorted(attached | set(policy_arns)))
+
+
+def put_inline_role_policy(state: BootstrapState, iam_client, role_name: str, policy_name: str, document: str):
+    iam_client.put_role_policy(RoleName=role_name, PolicyName=policy_name, PolicyDocument=document)
+    inline = set((state.get(f"role:{role_name}") or {}).get("inline_policies", []))
+    state.record(f"role:{role_name}", inline_policies=sorted(inline | {policy_name}))
+
+
+def ensure_instance_profile(state: BootstrapState, iam_client, name: str, role_name: str):
+    """
+    Creates an instance profile holding `role_name` if it's missing, or adds the role if it isn't in the profile.
+    """
+    try:
+        roles = iam_client.get_instance_profile(InstanceProfileName=name)["InstanceProfile"]["Roles"]
+        console_log(f"Found IAM Instance Profile: {name}")
+    except ClientError as e:
+        if error_code(e) not in NOT_FOUND_ERROR_CODES:
+            raise
+        iam_client.create_instance_profile(InstanceProfileName=name)
+        console_log(f"Created IAM Instance Profile: {name}")
+        roles = []
+    if role_name not in [role["RoleName"] for role in roles]:
+        iam_client.add_role_to_instance_profile(InstanceProfileName=name, RoleName=role_name)
+    state.record(f"instance-profile:{name}", name=name, role=role_name)
+
+
+def destroy_commands(state: BootstrapState) -> List[str]:
+    """
+    Returns the AWS CLI commands that delete every resource in `state`, in an order that works.
+    """
+    resources = state.resources
+    by_type: Dict[str, List[Tuple[str, dict]]] = {}
+    for key, resource in sorted(resources.items()):
+        kind, _, name = key.partition(":")
+        by_type.setdefault(kind, []).append((name, resource))
+
+    # fmt: off
+    commands = []
+    for _, application in by_type.get("application", []):
+        commands.append(f"aws emr-serverless stop-application --application-id {application['id']}")
+        commands.append(f"aws emr-serverless delete-application --application-id {application['id']}")
+    for _, cluster in by_type.get("cluster", []):
+        commands.append(f"aws emr terminate-clusters --cluster-ids {cluster['id']}")
+        commands.append(f"aws emr wait cluster-terminated --cluster-id {cluster['id']}")
+    for name, _ in by_type.get("bucket", []):
+        commands.append(f"aws s3 rm s3://{name} --recursive")
+        commands.append(f"aws s3api delete-bucket --bucket {name}")
+    for name, profile in by_type.get("instance-profile", []):
+        commands.append(f"aws iam remove-role-from-instance-profile --instance-profile-name {name} --role-name {profile['role']}")  # noqa E501
+        commands.append(f"aws iam delete-instance-profile --instance-profile-name {name}")
+    for name, role in by_type.get("role", []):
+        for arn in role.get("attached_policies", []):
+            commands.append(f"aws iam detach-role-policy --role-name {name} --policy-arn {arn}")
+        for policy_name in role.get("inline_policies", []):
+            commands.append(f"aws iam delete-role-policy --role-name {name} --policy-name {policy_name}")
+        commands.append(f"aws iam delete-role --role-name {name}")
+    for _, policy in by_type.get("policy", []):
+        commands.append(f"aws iam delete-policy --policy-arn {policy['arn']}")
+    for name, _ in by_type.get("security-configuration", []):
+        commands.append(f"aws emr delete-security-configuration --name {name}")
+    # fmt: on
+    if commands:
+        commands.append(f"rm {state.path}")
+    return commands
@@ -1,16 +1,37 @@
 import json
+import re
 import shlex
 import sys
 import time
 from os.path import join
-from typing import List, Optional
-
-import boto3
-from botocore.exceptions import ClientError, WaiterError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from emr_cli import clients
+from emr_cli.deployments.bootstrap import (
+    BootstrapState,
+    ResourceGraph,
+    attach_role_policies,
+    describe,
+    destroy_commands,
+    ensure_bucket,
+    ensure_instance_profile,
+    ensure_policy,
+    ensure_role,
+    exists,
+    put_inline_role_policy,
+    wait_for_propagation,
+)
 from emr_cli.deployments.emr_serverless import DeploymentPackage
-from emr_cli.utils import console_log, parse_bucket_uri, print_s3_gz
+from emr_cli.deployments.polling import AdaptivePoller, Backoff
+from emr_cli.utils import console_log, iter_gz_lines, parse_bucket_uri, print_s3_gz
+
+# Upper bound, in seconds, on how long we sleep between checks for step logs
+LOG_POLL_MAX_INTERVAL = 15
 
-LOG_WAITER_DELAY_SEC = 30
+# spark-submit logs the YARN applications it submits to the step's stderr
+YARN_APPLICATION_ID = re.compile(r"\bapplication_\d+_\d+\b")
 
 
 class Bootstrap:
@@ -28,40 +49,81 @@ class Bootstrap:
         self.log_bucket = log_bucket or code_bucket
         self.instance_role_name = instance_role_name
         self.job_role_name = job_role_name
-        self.s3_client = boto3.client("s3")
-        self.iam_client = boto3.client("iam")
-        self.emr_client = boto3.client("emr")
+        self.s3_client = clients.client("s3")
+        self.iam_client = clients.client("iam")
+        self.emr_client = clients.client("emr")
+        self.sts_client = clients.client("sts")
+        self._state: Optional[BootstrapState] = None
+
+    @property
+    def state(self) -> BootstrapState:
+        """
+        What earlier runs of bootstrap created in this account and region.
+        """
+        if self._state is None:
+            self._state = BootstrapState.for_caller(self.sts_client, self.emr_client.meta.region_name)
+        return self._state
 
     def create_environment(self):
-        self._create_s3_buckets()
-        service_role_arn = self._create_service_role()
-
-        # Make sure the role exists - there can be a tiny lag that will break setting up trust policies.
-        # Unfortunately, using a waiter or querying or the role didn't help here.
-        # There's a terraform issue about it here: https://github.com/hashicorp/terraform-provider-aws/issues/8905
-        # It looks like the fix is just querying or the role, but that didn't work.
-        time.sleep(10)
-        print("Slept")
-
-        job_role_arn = self._create_runtime_role(service_role_arn)
-
+        """
+        Creates the resources that are missing or have changed since the last bootstrap.
+        """
+        # Look up the account before creating resources from several threads
+        self.state
+        graph = ResourceGraph()
+        buckets = []
+        for bucket_name in sorted(set([self.code_bucket, self.log_bucket])):
+            buckets.append(f"bucket {bucket_name}")
+            graph.add(buckets[-1], lambda name=bucket_name: self._create_s3_bucket(name))
+        graph.add("S3 policy", self._create_s3_policy)
+        graph.add("Glue policy", self._create_glue_policy)
+        graph.add("security configuration", self._create_security_config)  # "emr-cli-runtime-roles"
+        graph.add("instance role", self._create_service_role)
+        # A new role can take a few seconds to be accepted as a principal in trust policies
+        graph.add(
+            "job role",
+            lambda instance_role_arn: wait_for_propagation(lambda: self._create_runtime_role(instance_role_arn)),
+            depends_on=["instance role"],
+        )
+        graph.add(
+            "job role policies",
+            self._attach_runtime_role_policies,
+            depends_on=["job role", "S3 policy", "Glue policy"],
+        )
         # Allow the EC2 instance profile to assume the job role
-        self.iam_client.put_role_policy(
-            RoleName=self.instance_role_name,
-            PolicyName="AssumeRuntimeRole",
-            PolicyDocument=self._runtime_role_policy(job_role_arn),
+        graph.add(
+            "instance role policy",
+            lambda _, job_role_arn: put_inline_role_policy(
+                self.state,
+                self.iam_client,
+                self.instance_role_name,
+                "AssumeRuntimeRole",
+                self._runtime_role_policy(job_role_arn),
+            ),
+            depends_on=["instance role", "job role"],
+        )
+        graph.add(
+            "cluster",
+            lambda security_config, *_: self._ensure_cluster(security_config),
+            depends_on=["security configuration", "instance role", *buckets],
         )
 
-        security_config = self._create_security_config()  # "emr-cli-runtime-roles"
-        cluster_id = self._create_cluster(security_config, self.instance_role_name)
+        resources = graph.run()
+        graph.timer.report("Bootstrap timing", "Environment created")
         return {
-            "cluster_id": cluster_id,
-            "job_role_arn": job_role_arn,
+            "cluster_id": resources["cluster"],
+            "job_role_arn": resources["job role"],
             "code_bucket": self.code_bucket,
             "log_bucket": self.log_bucket,
         }
 
     def print_destroy_commands(self, cluster_id: str):
+        commands = destroy_commands(self.state)
+        if commands:
+            print("\n".join(commands))
+            return
+
+        # Environments bootstrapped before the state file existed
         # fmt: off
         print(f"aws emr terminate-clusters --cluster-ids {cluster_id}")
         print(f"aws emr wait cluster-terminated --cluster-id {cluster_id}")
@@ -81,17 +143,8 @@ class Bootstrap:
         print(f"aws emr delete-security-configuration --name emr-cli-runtime-roles")  # noqa E501
         # fmt: on
 
-    def _create_s3_buckets(self):
-        """
-        Creates both the source and log buckets if they don't already exist.
-        """
-        for bucket_name in set([self.code_bucket, self.log_bucket]):
-            self.s3_client.create_bucket(
-                Bucket=bucket_name,
-                CreateBucketConfiguration={"LocationConstraint": self.s3_client.meta.region_name},
-            )
-            console_log(f"Created S3 bucket: s3://{bucket_name}")
-            self.s3_client.put_bucket_policy(Bucket=bucket_name, Policy=self._default_s3_bucket_policy(bucket_name))
+    def _create_s3_bucket(self, bucket_name: str):
+        ensure_bucket(self.state, self.s3_client, bucket_name, self._default_s3_bucket_policy(bucket_name))
 
     def _default_s3_bucket_policy(self, bucket_name) -> str:
         bucket_policy = {
@@ -117,9 +170,11 @@ class Bootstrap:
         https://docs.aws.amazon.com/emr/latest/ManagementGuide/emr-iam-role-for-ec2.html
         """
         # First create a role that can be assumed by EC2
-        response = self.iam_client.create_role(
-            RoleName=self.instance_role_name,
-            AssumeRolePolicyDocument=json.dumps(
+        role_arn = ensure_role(
+            self.state,
+            self.iam_client,
+            self.instance_role_name,
+            json.dumps(
                 {
                     "Version": "2012-10-17",
                     "Statement": [
@@ -132,20 +187,15 @@ class Bootstrap:
                 }
             ),
         )
-        role_arn = response.get("Role").get("Arn")
-        console_log(f"Created IAM Role: {role_arn}")
-
-        self.iam_client.create_instance_profile(InstanceProfileName=self.instance_role_name)
-        self.iam_client.add_role_to_instance_profile(
-            InstanceProfileName=self.instance_role_name,
-            RoleName=self.instance_role_name,
-        )
+        ensure_instance_profile(self.state, self.iam_client, self.instance_role_name, self.instance_role_name)
         return role_arn
 
     def _create_runtime_role(self, instance_profile_role_arn: str):
-        response = self.iam_client.create_role(
-            RoleName=self.job_role_name,
-            AssumeRolePolicyDocument=json.dumps(
+        return ensure_role(
+            self.state,
+            self.iam_client,
+            self.job_role_name,
+            json.dumps(
                 {
                     "Version": "2012-10-17",
                     "Statement": [
@@ -158,13 +208,9 @@ class Bootstrap:
                 }
             ),
         )
-        role_arn = response.get("Role").get("Arn")
-        console_log(f"Created IAM Role: {role_arn}")
 
-        self.iam_client.attach_role_policy(RoleName=self.job_role_name, PolicyArn=self._create_s3_policy())
-        self.iam_client.attach_role_policy(RoleName=self.job_role_name, PolicyArn=self._create_glue_policy())
-
-        return role_arn
+    def _attach_runtime_role_policies(self, _role_arn: str, *policy_arns: str):
+        attach_role_policies(self.state, self.iam_client, self.job_role_name, list(policy_arns))
 
     def _create_s3_policy(self):
         bucket_arns = [f"arn:aws:s3:::{name}" for name in [self.code_bucket, self.log_bucket]]
@@ -185,11 +231,7 @@ class Bootstrap:
                 },
             ],
         }
-        response = self.iam_client.create_policy(
-            PolicyName=self.DEFAULT_S3_POLICY_NAME,
-            PolicyDocument=json.dumps(policy_doc),
-        )
-        return response.get("Policy").get("Arn")
+        return ensure_policy(self.state, self.iam_client, self.DEFAULT_S3_POLICY_NAME, json.dumps(policy_doc))
 
     def _create_glue_policy(self):
         policy_doc = {
@@ -214,11 +256,7 @@ class Bootstrap:
                 },
             ],
         }
-        response = self.iam_client.create_policy(
-            PolicyName=self.DEFAULT_GLUE_POLICY_NAME,
-            PolicyDocument=json.dumps(policy_doc),
-        )
-        return response.get("Policy").get("Arn")
+        return ensure_policy(self.state, self.iam_client, self.DEFAULT_GLUE_POLICY_NAME, json.dumps(policy_doc))
 
     def _runtime_role_policy(self, runtime_role_arn: str):
         return json.dumps(
@@ -236,8 +274,14 @@ class Bootstrap:
         )
 
     def _create_security_config(self):
+        name = "emr-cli-runtime-roles"
+        if exists(lambda: self.emr_client.describe_security_configuration(Name=name)):
+            console_log(f"Found EMR security configuration: {name}")
+            self.state.record(f"security-configuration:{name}", name=name)
+            return name
+
         response = self.emr_client.create_security_configuration(
-            Name="emr-cli-runtime-roles",
+            Name=name,
             SecurityConfiguration="""{
                 "AuthorizationConfiguration":{
                     "IAMConfiguration":{
@@ -246,8 +290,25 @@ class Bootstrap:
                 }
             }""",
         )
+        console_log(f"Created EMR security configuration: {name}")
+        self.state.record(f"security-configuration:{name}", name=name)
         return response.get("Name")
 
+    def _ensure_cluster(self, security_config_name: str) -> str:
+        """
+        Reuses the cluster from an earlier bootstrap while it's still running.
+        """
+        cluster_id = (self.state.get("cluster") or {}).get("id")
+        response = cluster_id and describe(lambda: self.emr_client.describe_cluster(ClusterId=cluster_id))
+        if response and not response["Cluster"]["Status"]["State"].startswith("TERMINAT"):
+            console_log(f"Found EMR Cluster: {cluster_id}")
+            return cluster_id
+
+        # EMR can take a while to see a new instance profile
+        cluster_id = wait_for_propagation(lambda: self._create_cluster(security_config_name, self.instance_role_name))
+        self.state.record("cluster", id=cluster_id)
+        return cluster_id
+
     def _create_cluster(self, security_config_name: str, instance_profile_name: str):
         """
         Create a simple Spark EMR on EC2 cluster.
@@ -316,6 +377,9 @@ class Bootstrap:
 
 
 class EMREC2:
+    TERMINAL_STATES = ["COMPLETED", "CANCELLED", "FAILED", "INTERRUPTED"]
+    SUCCESS_STATE = "COMPLETED"
+
     def __init__(
         self,
         cluster_id: str,
@@ -326,8 +390,8 @@ class EMREC2:
         self.cluster_id = cluster_id
         self.dp = deployment_package
         self.job_role = job_role
-        self.client = boto3.client("emr")
-        self.s3_client = boto3.client("s3")
+        self.client = clients.client("emr", region)
+        self.s3_client = clients.client("s3")
 
     def run_job(
         self,
@@ -336,6 +400,7 @@ class EMREC2:
         spark_submit_opts: Optional[str] = None,
         wait: bool = True,
         show_logs: bool = False,
+        max_poll_interval: Optional[float] = None,
     ):
         """
         Run a Spark job on EMR on EC2. Some important notes:
@@ -343,6 +408,63 @@ class EMREC2:
         2. entrypoint script must be the last argument
         3. show_logs implies `wait=True`
         """
+        try:
+            step_id = self.submit_job(job_name, job_args, spark_submit_opts, show_logs)
+        except ClientError as err:
+            console_log(err)
+            sys.exit(1)
+
+        if not wait and not show_logs:
+            return step_id
+
+        logs_location = None
+        if show_logs:
+            # We need to validate s3-logging is enabled before waiting on the step
+            try:
+                logs_location = self._fetch_log_location()
+            except RuntimeError as e:
+                console_log(f"ERR: {e}")
+                sys.exit(1)
+
+        console_log("Waiting for step to complete...")
+        step = self.wait_for_job(step_id, max_poll_interval)
+        finished_at = time.monotonic()
+        job_failed = step.get("state") != self.SUCCESS_STATE
+        if job_failed:
+            console_log(f"EMR on EC2 step failed: {step.get('stateDetails')}")
+            if not show_logs:
+                sys.exit(1)
+        else:
+            console_log("Job completed successfully!")
+
+        if show_logs:
+            try:
+                stdout_location = self._wait_for_logs(step_id, logs_location, 30 * 60)
+                console_log(f"Logs appeared {time.monotonic() - finished_at:.1f}s after the step finished")
+                console_log(f"stdout for {step_id}\n{'-'*36}")
+                print_s3_gz(self.s3_client, stdout_location)
+                if job_failed:
+                    sys.exit(1)
+            except RuntimeError as e:
+                console_log(f"ERR: {e}")
+                sys.exit(1)
+            except ClientError as e:
+                console_log(f"ERR: While waiting for logs to appear: {e}")
+                sys.exit(1)
+
+        return step_id
+
+    def submit_job(
+        self,
+        job_name: str,
+        job_args: Optional[List[str]] = None,
+        spark_submit_opts: Optional[str] = None,
+        show_logs: bool = False,
+    ) -> str:
+        """
+        Adds a step to the cluster and returns its ID without waiting for it.
+        `show_logs` runs the step in client mode so its stdout ends up in the step logs.
+        """
         deploy_mode = "client" if show_logs else "cluster"
         spark_submit_params = self.dp.spark_submit_parameters().params_for("emr_ec2")
 
@@ -391,49 +513,33 @@ class EMREC2:
         if self.job_role:
             add_job_flow_steps_params["ExecutionRoleArn"] = self.job_role
 
-        try:
-            response = self.client.add_job_flow_steps(**add_job_flow_steps_params)
-        except ClientError as err:
-            console_log(err)
-            sys.exit(1)
-
+        response = self.client.add_job_flow_steps(**add_job_flow_steps_params)
         step_id = response.get("StepIds")[0]
         console_log(f"Job submitted to EMR on EC2 (Step ID: {step_id})")
-        if not wait and not show_logs:
-            return step_id
+        return step_id
 
-        console_log("Waiting for step to complete...")
-        waiter = self.client.get_waiter("step_complete")
-        job_failed = False
-        try:
-            waiter.wait(
-                ClusterId=self.cluster_id,
-                StepId=step_id,
-            )
-            console_log("Job completed successfully!")
-        except WaiterError:
-            console_log("EMR on EC2 step failed!")
-            job_failed = True  # So we can exit(1) later
-            if not show_logs:
-                sys.exit(1)
+    def wait_for_job(self, step_id: str, max_poll_interval: Optional[float] = None, label: str = "Step") -> dict:
+        """
+        Waits for a step to reach a terminal state and returns its final state and failure details.
+        """
+        poller = AdaptivePoller(terminal_states=self.TERMINAL_STATES, max_interval=max_poll_interval)
+        return poller.wait(lambda: self.get_step(step_id), initial_state="PENDING", label=label)
 
-        if show_logs:
-            # We need to validate s3-logging is enabled and fetch the location of the logs
-            try:
-                logs_location = self._fetch_log_location()
-                stdout_location = self._wait_for_logs(step_id, logs_location, 30 * 60)
-                console_log(f"stdout for {step_id}\n{'-'*36}")
-                print_s3_gz(self.s3_client, stdout_location)
-                if job_failed:
-                    sys.exit(1)
-            except RuntimeError as e:
-                console_log(f"ERR: {e}")
-                sys.exit(1)
-            except WaiterError as e:
-                console_log(f"ERR: While waiting for logs to appear: {e}")
-                sys.exit(1)
+    def readiness_checks(self) -> Dict[str, Callable[[], Any]]:
+        """
+        Checks that can run while the project is being built and uploaded.
+        """
+        return {"check cluster": self.check_cluster}
 
-        return step_id
+    def check_cluster(self) -> str:
+        state = self.client.describe_cluster(ClusterId=self.cluster_id)["Cluster"]["Status"]["State"]
+        if state.startswith("TERMINAT"):
+            raise RuntimeError(f"EMR on EC2 cluster {self.cluster_id} is {state}.")
+        return state
+
+    def get_step(self, step_id: str) -> dict:
+        status = self.client.describe_step(ClusterId=self.cluster_id, StepId=step_id)["Step"]["Status"]
+        return {"state": status.get("State"), "stateDetails": status.get("FailureDetails")}
 
     def _fetch_log_location(self) -> str:
         """
@@ -446,21 +552,58 @@ class EMREC2:
             raise RuntimeError("Cluster does not have S3 logging enabled")
         return loguri.replace("s3n:", "s3:")
 
-    def _wait_for_logs(self, step_id: str, log_base: str, timeout_secs: int) -> str:
+    def log_prefix(self, step_id: str, s3_logs_uri: Optional[str] = None) -> str:
+        """
+        Returns the S3 prefix holding the logs of a step. Defaults to the cluster's log location.
+        """
+        log_base = s3_logs_uri or self._fetch_log_location()
+        return join(log_base, self.cluster_id, "steps", step_id, "")
+
+    def log_paths(self, step_id: str, s3_logs_uri: Optional[str] = None) -> Tuple[str, List[str]]:
+        """
+        Returns the cluster's log prefix and the directories below it that hold a step's logs:
+        the step's own controller, stdout and stderr, and the YARN container logs of every
+        Spark application the step submitted, e.g. the driver and executors of a
+        cluster-mode job. Applications are found in the step's stderr, so container logs
+        are only included once that has been uploaded.
+        """
+        log_base = join(s3_logs_uri or self._fetch_log_location(), self.cluster_id, "")
+        paths = [join("steps", step_id, "")]
+        bucket_name, key = parse_bucket_uri(join(log_base, paths[0], "stderr.gz"))
+        try:
+            body = self.s3_client.get_object(Bucket=bucket_name, Key=key)["Body"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                raise
+            console_log(f"Step {step_id} has no stderr in S3 yet, so its container logs can't be found")
+            return log_base, paths
+
+        application_ids: List[str] = []
+        for line in iter_gz_lines(body):
+            for application_id in YARN_APPLICATION_ID.findall(line):
+                if application_id not in application_ids:
+                    application_ids.append(application_id)
+        return log_base, paths + [join("containers", application_id, "") for application_id in application_ids]
+
+    def _wait_for_logs(self, step_id: str, log_base: Optional[str], timeout_secs: int) -> str:
         """
-        Waits for stdout logs to appear in S3. Checks every LOG_WAITER_DELAY_SEC seconds
-        until `timeout_secs`.
+        Waits for stdout logs to appear in S3, up to `timeout_secs`. EMR usually uploads
+        them within seconds of the step finishing, so we check every second at first
+        and back off to every LOG_POLL_MAX_INTERVAL seconds.
         """
-        object_name = join(log_base, self.cluster_id, "steps", step_id, "stdout.gz")
+        object_name = join(self.log_prefix(step_id, log_base), "stdout.gz")
         console_log(f"Waiting for logs to appear in {object_name} ...")
         bucket_name, key = parse_bucket_uri(object_name)
-        waiter = self.s3_client.get_waiter("object_exists")
-        waiter.wait(
-            Bucket=bucket_name,
-            Key=key,
-            WaiterConfig={
-                "Delay": LOG_WAITER_DELAY_SEC,
-                "MaxAttempts": int(timeout_secs / LOG_WAITER_DELAY_SEC),
-            },
-        )
-        return object_name
+        backoff = Backoff(max_interval=LOG_POLL_MAX_INTERVAL)
+        deadline = time.monotonic() + timeout_secs
+        while True:
+            try:
+                self.s3_client.head_object(Bucket=bucket_name, Key=key)
+                return object_name
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                    raise
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"Timed out after {timeout_secs}s waiting for logs in {object_name}")
+            backoff.sleep()
+            backoff.increase()
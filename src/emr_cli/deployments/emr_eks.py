@@ -1,40 +1,52 @@
 import re
 import sys
+import threading
+from datetime import datetime
 from os.path import join
 from platform import release
-from time import sleep
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-import boto3
+from emr_cli import clients
 from emr_cli.deployments.emr_serverless import DeploymentPackage
+from emr_cli.deployments.polling import JobRunTracker
+from emr_cli.deployments.release_labels import DEFAULT_RELEASE_LABEL_TTL, latest_release_label
 from emr_cli.utils import console_log, print_s3_gz
 
 
 class EMREKS:
+    ACTIVE_STATES = ["PENDING", "SUBMITTED", "RUNNING"]
+    TERMINAL_STATES = ["COMPLETED", "FAILED", "CANCEL_PENDING", "CANCELLED"]
+    SUCCESS_STATE = "COMPLETED"
+
     def __init__(
-        self, virtual_cluster_id: str, job_role: str, deployment_package: DeploymentPackage, region: str = ""
+        self,
+        virtual_cluster_id: str,
+        job_role: str,
+        deployment_package: DeploymentPackage,
+        region: str = "",
+        release_label_ttl: int = DEFAULT_RELEASE_LABEL_TTL,
+        refresh_release_label: bool = False,
     ) -> None:
         self.virtual_cluster_id = virtual_cluster_id
         self.job_role = job_role
         self.dp = deployment_package
-        self.s3_client = boto3.client("s3")
-        if region:
-            self.client = boto3.client("emr-containers", region_name=region)
-            self.emr_client = boto3.client("emr", region_name=region)
-        else:
-            # Note that boto3 uses AWS_DEFAULT_REGION, not AWS_REGION
-            # We may want to add an extra check here for the latter.
-            self.client = boto3.client("emr-containers")
-            self.emr_client = boto3.client("emr")
+        self.release_label_ttl = release_label_ttl
+        self.refresh_release_label = refresh_release_label
+        self._latest_release_label: Optional[str] = None
+        self._tracker: Optional[JobRunTracker] = None
+        self._tracker_lock = threading.Lock()
+        self.s3_client = clients.client("s3")
+        # Note that boto3 uses AWS_DEFAULT_REGION, not AWS_REGION, when no region is given
+        self.client = clients.client("emr-containers", region)
 
     def fetch_latest_release_label(self):
-        response = self.emr_client.list_release_labels(
-            Filters={"Application": "Spark", "Prefix": "emr-6"}, MaxResults=1
+        """
+        Returns the latest release label. It's cached per region, so the EMR API is
+        only called when the cached label is older than `release_label_ttl` seconds.
+        """
+        return latest_release_label(
+            self.client.meta.region_name, self.release_label_ttl, self.refresh_release_label
         )
-        if len(response["ReleaseLabels"]) == 0:
-            console_log("Error: No release labels found")
-            sys.exit(1)
-        return response["ReleaseLabels"][0]
 
     def run_job(
         self,
@@ -45,20 +57,71 @@ class EMREKS:
         show_logs: bool = False,
         s3_logs_uri: Optional[str] = None,
         release_label: Optional[str] = None,
+        max_poll_interval: Optional[float] = None,
     ):
         if show_logs and not s3_logs_uri:
             raise RuntimeError("--show-stdout requires --s3-logs-uri to be set.")
 
+        job_run_id = self.submit_job(job_name, job_args, spark_submit_opts, s3_logs_uri, release_label)
+        if not wait and not show_logs:
+            return job_run_id
+
+        console_log("Waiting for job to complete...")
+        jr_response = self.wait_for_job(job_run_id, max_poll_interval)
+
+        if show_logs:
+            console_log(f"stdout for {job_run_id}\n{'-'*38}")
+            print_s3_gz(self.s3_client, self.driver_log_uri(job_run_id, s3_logs_uri))
+
+        if jr_response.get("state") != self.SUCCESS_STATE:
+            console_log(f"EMR Containers job failed: {jr_response.get('stateDetails')}")
+            sys.exit(1)
+        console_log("Job completed successfully!")
+
+        return job_run_id
+
+    def resolve_release_label(self, release_label: Optional[str] = None) -> str:
+        if release_label is None:
+            if self._latest_release_label is None:
+                self._latest_release_label = self.fetch_latest_release_label()
+                console_log(f"Using latest release label {self._latest_release_label}")
+            release_label = self._latest_release_label
+        return release_label
+
+    def readiness_checks(self, release_label: Optional[str] = None) -> Dict[str, Callable[[], Any]]:
+        """
+        Checks that can run while the project is being built and uploaded. Without a
+        `release_label`, the latest one is looked up too and reused when submitting.
+        """
+        checks: Dict[str, Callable[[], Any]] = {"check virtual cluster": self.check_virtual_cluster}
         if release_label is None:
-            release_label = self.fetch_latest_release_label()
-            console_log(f"Using latest release label {release_label}")
-        release_label = f"{release_label}-latest"
+            checks["resolve release label"] = self.resolve_release_label
+        return checks
 
-        # If job_name is the default, just replace the space.
+    def check_virtual_cluster(self) -> str:
+        state = self.client.describe_virtual_cluster(id=self.virtual_cluster_id)["virtualCluster"]["state"]
+        if state != "RUNNING":
+            raise RuntimeError(f"EMR on EKS virtual cluster {self.virtual_cluster_id} is {state}.")
+        return state
+
+    def submit_job(
+        self,
+        job_name: str,
+        job_args: Optional[List[str]] = None,
+        spark_submit_opts: Optional[str] = None,
+        s3_logs_uri: Optional[str] = None,
+        release_label: Optional[str] = None,
+    ) -> str:
+        """
+        Starts a job run and returns its ID without waiting for it.
+        """
+        release_label = f"{self.resolve_release_label(release_label)}-latest"
+
+        # If job_name is the default (or a numbered batch run of it), just replace the space.
         # Otherwise throw an error
-        if job_name == "emr-cli job":
-            job_name = "emr-cli_job"
-        elif not re.fullmatch("[\.\-_/#A-Za-z0-9]+", job_name):
+        if job_name.startswith("emr-cli job"):
+            job_name = job_name.replace("emr-cli job", "emr-cli_job", 1)
+        if not re.fullmatch("[\.\-_/#A-Za-z0-9]+", job_name):
             console_log(f"Invalid characters in job name {job_name} - EMR on EKS must match [\.\-_/#A-Za-z0-9]+")
             sys.exit(1)
 
@@ -93,48 +156,60 @@ class EMREKS:
         job_run_id = response.get("id")
 
         console_log(f"Job submitted to EMR Virtual Cluster (Job Run ID: {job_run_id})")
-        if not wait and not show_logs:
-            return job_run_id
-
-        console_log("Waiting for job to complete...")
-        job_done = False
-        job_state = "SUBMITTED"
-        jr_response = {}
-        while not job_done:
-            jr_response = self.get_job_run(job_run_id)
-            new_state = jr_response.get("state")
-            if new_state != job_state:
-                console_log(f"Job state is now: {new_state}")
-                job_state = new_state
-            job_done = new_state in [
-                "COMPLETED",
-                "FAILED",
-                "CANCEL_PENDING",
-                "CANCELLED",
-            ]
-            sleep(2)
-
-        if show_logs:
-            console_log(f"stdout for {job_run_id}\n{'-'*38}")
-            log_location = join(
-                f"{s3_logs_uri}",
-                self.virtual_cluster_id,
-                "jobs",
-                job_run_id,
-                "containers",
-                f"spark-{job_run_id}",
-                f"spark-{job_run_id}-driver",
-                "stdout.gz",
-            )
-            print_s3_gz(self.s3_client, log_location)
-
-        if jr_response.get("state") != "COMPLETED":
-            console_log(f"EMR Containers job failed: {jr_response.get('stateDetails')}")
-            sys.exit(1)
-        console_log("Job completed successfully!")
-
         return job_run_id
 
+    def wait_for_job(self, job_run_id: str, max_poll_interval: Optional[float] = None, label: str = "Job") -> dict:
+        """
+        Waits for a job run to reach a terminal state and returns the final job run.
+        Concurrent waiters share a single JobRunTracker, so the number of API calls
+        doesn't grow with the number of runs being waited on.
+        """
+        return self._job_run_tracker(max_poll_interval).wait(job_run_id, label)
+
+    def wait_for_jobs(
+        self, labels: Dict[str, str], max_poll_interval: Optional[float] = None
+    ) -> Iterator[Tuple[str, dict, Optional[BaseException]]]:
+        """
+        Waits for every job run in `labels`, a mapping of job run ID to label, from the
+        calling thread and yields `(job_run_id, final job run, error)` as each one finishes.
+        """
+        return self._job_run_tracker(max_poll_interval).wait_all(labels)
+
+    def _job_run_tracker(self, max_poll_interval: Optional[float]) -> JobRunTracker:
+        with self._tracker_lock:
+            if self._tracker is None:
+                self._tracker = JobRunTracker(
+                    self.list_job_runs,
+                    self.get_job_run,
+                    active_states=self.ACTIVE_STATES,
+                    terminal_states=self.TERMINAL_STATES,
+                    max_interval=max_poll_interval,
+                )
+            return self._tracker
+
+    def list_job_runs(self, created_after: datetime, states: List[str], next_token: Optional[str] = None) -> dict:
+        kwargs = {"virtualClusterId": self.virtual_cluster_id, "createdAfter": created_after, "states": states}
+        if next_token:
+            kwargs["nextToken"] = next_token
+        return self.client.list_job_runs(**kwargs)
+
+    def log_prefix(self, job_run_id: str, s3_logs_uri: Optional[str] = None) -> str:
+        """
+        Returns the S3 prefix holding the logs of every container of a job run.
+        """
+        if not s3_logs_uri:
+            raise RuntimeError("EMR on EKS logs require --s3-logs-uri to be set.")
+        return join(s3_logs_uri, self.virtual_cluster_id, "jobs", job_run_id, "")
+
+    def driver_log_uri(self, job_run_id: str, s3_logs_uri: Optional[str] = None, name: str = "stdout.gz") -> str:
+        return join(
+            self.log_prefix(job_run_id, s3_logs_uri),
+            "containers",
+            f"spark-{job_run_id}",
+            f"spark-{job_run_id}-driver",
+            name,
+        )
+
     def get_job_run(self, job_run_id: str) -> dict:
         response = self.client.describe_job_run(virtualClusterId=self.virtual_cluster_id, id=job_run_id)
         return response.get("jobRun")
@@ -2,24 +2,52 @@ import abc
 import json
 import os
 import sys
-import zipfile
+import threading
+from concurrent.futures import Future
+from datetime import datetime
 from os.path import join
-from time import sleep
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-import boto3
+from emr_cli import clients
 from emr_cli.deployments import SparkParams
-from emr_cli.utils import console_log, find_files, mkdir, print_s3_gz
+from emr_cli.deployments.polling import AdaptivePoller, JobRunTracker
+from emr_cli.packaging.archive import ZipArchiveBuilder
+from emr_cli.packaging.scanner import ProjectScanner, ScanResult
+from emr_cli.utils import console_log, file_sha256, mkdir, print_s3_gz
+
+if TYPE_CHECKING:
+    from emr_cli.deployments.bootstrap import BootstrapState
 
 
 class DeploymentPackage(metaclass=abc.ABCMeta):
-    def __init__(self, entry_point_path: str = "entrypoint.py", s3_target_uri: str = "") -> None:
+    def __init__(
+        self,
+        entry_point_path: str = "entrypoint.py",
+        s3_target_uri: str = "",
+        deps_uri: Optional[str] = None,
+        local_build: bool = False,
+        python_version: Optional[str] = None,
+        docker_cache_dir: Optional[str] = None,
+    ) -> None:
         self.entry_point_path = entry_point_path
         self.dist_dir = "dist"
 
         # We might not populate this until we actually deploy
         self.s3_uri_base = s3_target_uri
 
+        # If set, dependency archives are stored by content hash under this prefix
+        self.deps_uri = deps_uri
+
+        # Build dependencies with pip instead of Docker, for this EMR Python version
+        self.local_build = local_build
+        self.python_version = python_version
+
+        # If set, Docker builds read and write their layer cache here
+        self.docker_cache_dir = docker_cache_dir
+
+        self._scan: Optional[ScanResult] = None
+        self._deps_sha256: Optional[str] = None
+
     def spark_submit_parameters(self) -> SparkParams:
         """
         Returns any additional arguments necessary for spark-submit
@@ -34,18 +62,161 @@ class DeploymentPackage(metaclass=abc.ABCMeta):
             raise Exception("S3 URI has not been set, aborting")
         return os.path.join(self.s3_uri_base, self.entry_point_path)
 
-    def _zip_local_pyfiles(self):
+    def source_artifacts(self, prefix: str) -> Dict[str, str]:
+        """
+        Returns the files `deploy` uploads that exist before `build` runs, mapped to
+        their keys under `prefix` in the code bucket, or to full `s3://` URIs.
+        """
+        return {self.entry_point_path: os.path.join(prefix, os.path.basename(self.entry_point_path))}
+
+    def build_artifacts(self, prefix: str) -> Dict[str, str]:
+        """
+        Like `source_artifacts`, but for the files that `build` produces.
+        Only call this once the build has finished.
+        """
+        return {}
+
+    def deps_archive_path(self) -> str:
+        return os.path.join(self.dist_dir, "pyspark_deps.tar.gz")
+
+    def deps_archive_uri(self) -> str:
+        """
+        Returns the full S3 URI of the dependency archive.
+
+        By default this is `pyspark_deps.tar.gz` next to the entrypoint. With a `deps_uri`,
+        the archive is content-addressed as `<deps_uri>/<sha256>.tar.gz`, so identical
+        dependency sets are uploaded once and shared by every job and branch.
+        """
+        if not self.deps_uri:
+            return os.path.join(self.s3_uri_base, "pyspark_deps.tar.gz")
+
+        if self._deps_sha256 is None:
+            if not os.path.isfile(self.deps_archive_path()):
+                console_log(f"ERR: {self.deps_archive_path()} not found, it's needed to find the archive in --deps-uri.")
+                console_log("ERR: Build it with `emr package` or use `emr run --build`.")
+                sys.exit(1)
+            self._deps_sha256 = file_sha256(self.deps_archive_path())
+        return os.path.join(self.deps_uri, f"{self._deps_sha256}.tar.gz")
+
+    def project_scan(self) -> ScanResult:
+        """
+        Returns a complete scan of the project directory. The scan is performed
+        once and shared by everything that needs the project's file list.
+        """
+        if self._scan is None or not self._scan.complete:
+            self._scan = ProjectScanner().scan()
+        return self._scan
+
+    def _local_pyfiles(self) -> List[str]:
+        """
+        Returns the relative paths of all the .py files except for the entrypoint file.
+        """
+        scan = self.project_scan()
+        entry_point = os.path.relpath(os.path.abspath(self.entry_point_path), scan.root)
+        return [f for f in scan.py_files if f != entry_point]
+
+    def _zip_local_pyfiles(self, force: bool = False):
         """
         Zip all the files except for the entrypoint file.
+
+        The archive is reproducible: unchanged sources produce a byte-identical zip.
+        Unless `force` is set, only files that changed since the last build are
+        compressed again.
         """
-        py_files = find_files(os.getcwd(), [".venv"], ".py")
-        py_files.remove(os.path.abspath(self.entry_point_path))
-        cwd = os.getcwd()
+        root = self.project_scan().root
         mkdir(self.dist_dir)
-        with zipfile.ZipFile(f"{self.dist_dir}/pyfiles.zip", "w") as zf:
-            for file in py_files:
-                relpath = os.path.relpath(file, cwd)
-                zf.write(file, relpath)
+        target = f"{self.dist_dir}/pyfiles.zip"
+        files = {relpath: os.path.join(root, relpath) for relpath in self._local_pyfiles()}
+        builder = ZipArchiveBuilder.from_config()
+        if force:
+            builder.build(target, files)
+            console_log(f"Built {target} with {len(files)} files")
+        else:
+            stats = builder.update(target, files)
+            console_log(f"Updated {target}: {stats}")
+
+
+def parse_worker_resources(value: str) -> Dict[str, str]:
+    """
+    Parses a `cpu,memory[,disk]` string like `4vCPU,16GB` or `4vCPU,16GB,50GB`
+    into an EMR Serverless worker configuration or maximum capacity.
+    """
+    parts = [part.strip() for part in value.split(",")]
+    if len(parts) not in (2, 3) or not all(parts):
+        raise ValueError(f"must be cpu,memory[,disk] like 4vCPU,16GB or 4vCPU,16GB,50GB, provided '{value}'")
+    return dict(zip(["cpu", "memory", "disk"], parts))
+
+
+class ApplicationConfig:
+    """
+    Settings for the EMR Serverless application created by `emr bootstrap`.
+
+    Pre-initialized drivers and executors stay warm while the application is started,
+    so jobs don't wait for workers to be provisioned. The application starts
+    automatically when a job is submitted and stops after `idle_timeout` minutes
+    without jobs, at which point the pre-initialized workers are released.
+    """
+
+    DEFAULT_RELEASE_LABEL = "emr-6.9.0"
+    DEFAULT_WORKER_SIZE = "4vCPU,16GB"
+    DEFAULT_IDLE_TIMEOUT = 15
+
+    def __init__(
+        self,
+        release_label: str = DEFAULT_RELEASE_LABEL,
+        driver_workers: int = 0,
+        driver_size: str = DEFAULT_WORKER_SIZE,
+        executor_workers: int = 0,
+        executor_size: str = DEFAULT_WORKER_SIZE,
+        max_capacity: Optional[str] = None,
+        idle_timeout: int = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        self.release_label = release_label
+        self.driver_workers = driver_workers
+        self.driver_size = driver_size
+        self.executor_workers = executor_workers
+        self.executor_size = executor_size
+        self.max_capacity = max_capacity
+        self.idle_timeout = idle_timeout
+
+    def create_application_args(self) -> dict:
+        """
+        Returns the arguments for `create_application` other than the name and type.
+        """
+        args: Dict[str, Any] = {
+            "releaseLabel": self.release_label,
+            "autoStartConfiguration": {"enabled": True},
+            "autoStopConfiguration": {"enabled": True, "idleTimeoutMinutes": self.idle_timeout},
+        }
+        initial_capacity = {}
+        for worker_type, count, size in [
+            ("DRIVER", self.driver_workers, self.driver_size),
+            ("EXECUTOR", self.executor_workers, self.executor_size),
+        ]:
+            if count > 0:
+                initial_capacity[worker_type] = {
+                    "workerCount": count,
+                    "workerConfiguration": parse_worker_resources(size),
+                }
+        if initial_capacity:
+            args["initialCapacity"] = initial_capacity
+        if self.max_capacity:
+            args["maximumCapacity"] = parse_worker_resources(self.max_capacity)
+        return args
+
+    def to_config(self) -> dict:
+        """
+        Returns these settings keyed by their `emr bootstrap` option names.
+        """
+        return {
+            "release_label": self.release_label,
+            "driver_workers": self.driver_workers,
+            "driver_size": self.driver_size,
+            "executor_workers": self.executor_workers,
+            "executor_size": self.executor_size,
+            "max_capacity": self.max_capacity,
+            "idle_timeout": self.idle_timeout,
+        }
 
 
 class Bootstrap:
@@ -53,26 +224,75 @@ class Bootstrap:
     DEFAULT_S3_POLICY_NAME = "emr-cli-S3Access"
     DEFAULT_GLUE_POLICY_NAME = "emr-cli-GlueAccess"
 
-    def __init__(self, code_bucket: str, log_bucket: str, job_role_name: str):
+    def __init__(
+        self,
+        code_bucket: str,
+        log_bucket: str,
+        job_role_name: str,
+        application_config: Optional[ApplicationConfig] = None,
+    ):
         self.code_bucket = code_bucket
         self.log_bucket = log_bucket or code_bucket
         self.job_role_name = job_role_name
-        self.s3_client = boto3.client("s3")
-        self.iam_client = boto3.client("iam")
-        self.emrs_client = boto3.client("emr-serverless")
+        self.application_config = application_config or ApplicationConfig()
+
+        self.s3_client = clients.client("s3")
+        self.iam_client = clients.client("iam")
+        self.emrs_client = clients.client("emr-serverless")
+        self.sts_client = clients.client("sts")
+        self._state: Optional["BootstrapState"] = None
+
+    @property
+    def state(self) -> "BootstrapState":
+        """
+        What earlier runs of bootstrap created in this account and region.
+        """
+        if self._state is None:
+            from emr_cli.deployments.bootstrap import BootstrapState
+
+            self._state = BootstrapState.for_caller(self.sts_client, self.emrs_client.meta.region_name)
+        return self._state
 
     def create_environment(self):
-        self._create_s3_buckets()
-        job_role_arn = self._create_job_role()
-        app_id = self._create_application()
+        """
+        Creates the resources that are missing or have changed since the last bootstrap.
+        """
+        # Project detection imports this module, so keep botocore out of `emr status`
+        from emr_cli.deployments.bootstrap import ResourceGraph
+
+        # Look up the account before creating resources from several threads
+        self.state
+        graph = ResourceGraph()
+        for bucket_name in sorted(set([self.code_bucket, self.log_bucket])):
+            graph.add(f"bucket {bucket_name}", lambda name=bucket_name: self._create_s3_bucket(name))
+        graph.add("S3 policy", self._create_s3_policy)
+        graph.add("Glue policy", self._create_glue_policy)
+        graph.add("job role", self._create_job_role)
+        graph.add(
+            "job role policies",
+            self._attach_job_role_policies,
+            depends_on=["job role", "S3 policy", "Glue policy"],
+        )
+        graph.add("application", self._ensure_application)
+
+        resources = graph.run()
+        graph.timer.report("Bootstrap timing", "Environment created")
         return {
-            "application_id": app_id,
-            "job_role_arn": job_role_arn,
+            "application_id": resources["application"],
+            "job_role_arn": resources["job role"],
             "code_bucket": self.code_bucket,
             "log_bucket": self.log_bucket,
         }
 
     def print_destroy_commands(self, application_id: str):
+        from emr_cli.deployments.bootstrap import destroy_commands
+
+        commands = destroy_commands(self.state)
+        if commands:
+            print("\n".join(commands))
+            return
+
+        # Environments bootstrapped before the state file existed
         # fmt: off
         for bucket in set([self.log_bucket, self.code_bucket]):
             print(f"aws s3 rm s3://{bucket} --recursive")
@@ -86,20 +306,10 @@ class Bootstrap:
         print(f"aws emr-serverless delete-application --application-id {application_id}")  # noqa E501
         # fmt: on
 
-    def _create_s3_buckets(self):
-        """
-        Creates both the source and log buckets if they don't already exist.
-        """
-        for bucket_name in set([self.code_bucket, self.log_bucket]):
-            self.s3_client.create_bucket(
-                Bucket=bucket_name,
-                CreateBucketConfiguration={
-                    "LocationConstraint": self.s3_client.meta.region_name  # type: ignore
-                },
-            )
+    def _create_s3_bucket(self, bucket_name: str):
+        from emr_cli.deployments.bootstrap import ensure_bucket
 
-            console_log(f"Created S3 bucket: s3://{bucket_name}")
-            self.s3_client.put_bucket_policy(Bucket=bucket_name, Policy=self._default_s3_bucket_policy(bucket_name))
+        ensure_bucket(self.state, self.s3_client, bucket_name, self._default_s3_bucket_policy(bucket_name))
 
     def _default_s3_bucket_policy(self, bucket_name) -> str:
         bucket_policy = {
@@ -120,10 +330,14 @@ class Bootstrap:
         return json.dumps(bucket_policy)
 
     def _create_job_role(self):
+        from emr_cli.deployments.bootstrap import ensure_role
+
         # First create a role that can be assumed by EMR Serverless jobs
-        response = self.iam_client.create_role(
-            RoleName=self.job_role_name,
-            AssumeRolePolicyDocument=json.dumps(
+        return ensure_role(
+            self.state,
+            self.iam_client,
+            self.job_role_name,
+            json.dumps(
                 {
                     "Version": "2012-10-17",
                     "Statement": [
@@ -136,13 +350,11 @@ class Bootstrap:
                 }
             ),
         )
-        role_arn = response.get("Role").get("Arn")
-        console_log(f"Created IAM Role: {role_arn}")
 
-        self.iam_client.attach_role_policy(RoleName=self.job_role_name, PolicyArn=self._create_s3_policy())
-        self.iam_client.attach_role_policy(RoleName=self.job_role_name, PolicyArn=self._create_glue_policy())
+    def _attach_job_role_policies(self, _role_arn: str, *policy_arns: str):
+        from emr_cli.deployments.bootstrap import attach_role_policies
 
-        return role_arn
+        attach_role_policies(self.state, self.iam_client, self.job_role_name, list(policy_arns))
 
     def _create_s3_policy(self):
         bucket_arns = [f"arn:aws:s3:::{name}" for name in [self.code_bucket, self.log_bucket]]
@@ -163,11 +375,9 @@ class Bootstrap:
                 },
             ],
         }
-        response = self.iam_client.create_policy(
-            PolicyName=self.DEFAULT_S3_POLICY_NAME,
-            PolicyDocument=json.dumps(policy_doc),
-        )
-        return response.get("Policy").get("Arn")
+        from emr_cli.deployments.bootstrap import ensure_policy
+
+        return ensure_policy(self.state, self.iam_client, self.DEFAULT_S3_POLICY_NAME, json.dumps(policy_doc))
 
     def _create_glue_policy(self):
         policy_doc = {
@@ -192,25 +402,65 @@ class Bootstrap:
                 },
             ],
         }
-        response = self.iam_client.create_policy(
-            PolicyName=self.DEFAULT_GLUE_POLICY_NAME,
-            PolicyDocument=json.dumps(policy_doc),
-        )
-        return response.get("Policy").get("Arn")
+        from emr_cli.deployments.bootstrap import ensure_policy
+
+        return ensure_policy(self.state, self.iam_client, self.DEFAULT_GLUE_POLICY_NAME, json.dumps(policy_doc))
+
+    def _ensure_application(self) -> str:
+        """
+        Reuses the application from an earlier bootstrap unless it's been deleted, and
+        updates it if `application_config` changed since.
+        """
+        from emr_cli.deployments.bootstrap import describe, text_sha256
+
+        args = self.application_config.create_application_args()
+        digest = text_sha256(json.dumps(args, sort_keys=True))
+        recorded = self.state.get("application") or {}
+        app_id = recorded.get("id")
+        response = app_id and describe(lambda: self.emrs_client.get_application(applicationId=app_id))
+        if response:
+            state = response["application"]["state"]
+            if state != "TERMINATED":
+                if recorded.get("config_sha256") == digest:
+                    console_log(f"Found EMR Serverless application: {app_id}")
+                elif state in ("CREATED", "STOPPED"):
+                    # An empty initial capacity removes pre-initialized workers that are no longer wanted
+                    self.emrs_client.update_application(applicationId=app_id, **{"initialCapacity": {}, **args})
+                    console_log(f"Updated EMR Serverless application: {app_id}")
+                    # There's no equivalent for the maximum capacity: the API requires a CPU and memory limit
+                    max_capacity = response["application"].get("maximumCapacity")
+                    if max_capacity and "maximumCapacity" not in args:
+                        limits = ",".join(max_capacity[k] for k in ("cpu", "memory", "disk") if k in max_capacity)
+                        console_log(
+                            f"WARN: EMR Serverless can't remove an application's maximum capacity, so {app_id} "
+                            f"keeps its limit of {limits}. Pass --max-capacity to change it."
+                        )
+                else:
+                    console_log(
+                        f"EMR Serverless application {app_id} is {state}, "
+                        "stop it and run bootstrap again to apply the new settings"
+                    )
+                    return app_id
+                self.state.record("application", id=app_id, config_sha256=digest)
+                return app_id
+
+        app_id = self._create_application()
+        self.state.record("application", id=app_id, config_sha256=digest)
+        return app_id
 
     def _create_application(self):
         """
-        Create a simple Spark EMR Serverless application with a default (but minimal)
-        pre-initialized capacity.
+        Create a Spark EMR Serverless application with the release label, pre-initialized
+        capacity, maximum capacity and auto-stop timeout from `application_config`.
 
         This application is only intended for demo purposes only. To customize the
-        application or create an application for production, use the AWS CLI or other
-        Infrastructure as Code services like Terraform, CDK, or CloudFormation.
+        application further or create an application for production, use the AWS CLI or
+        other Infrastructure as Code services like Terraform, CDK, or CloudFormation.
         """
         response = self.emrs_client.create_application(
             name="emr-cli-demo",
-            releaseLabel="emr-6.9.0",
             type="SPARK",
+            **self.application_config.create_application_args(),
         )
         app_id = response.get("applicationId")
         console_log(f"Created EMR Serverless application: {app_id}")
@@ -219,6 +469,12 @@ class Bootstrap:
 
 
 class EMRServerless:
+    ACTIVE_STATES = ["SUBMITTED", "PENDING", "SCHEDULED", "RUNNING", "QUEUED"]
+    TERMINAL_STATES = ["SUCCESS", "FAILED", "CANCELLING", "CANCELLED"]
+    SUCCESS_STATE = "SUCCESS"
+    # Application startup takes a minute or two, so don't back off as far as for jobs
+    APPLICATION_POLL_MAX_INTERVAL = 10
+
     def __init__(
         self,
         application_id: str,
@@ -229,13 +485,72 @@ class EMRServerless:
         self.application_id = application_id
         self.job_role = job_role
         self.dp = deployment_package
-        self.s3_client = boto3.client("s3")
-        if region:
-            self.client = boto3.client("emr-serverless", region_name=region)
-        else:
-            # Note that boto3 uses AWS_DEFAULT_REGION, not AWS_REGION
-            # We may want to add an extra check here for the latter.
-            self.client = boto3.client("emr-serverless")
+        self._tracker: Optional[JobRunTracker] = None
+        self._tracker_lock = threading.Lock()
+        self._prewarm: Optional[Future] = None
+        self.s3_client = clients.client("s3")
+        # Note that boto3 uses AWS_DEFAULT_REGION, not AWS_REGION, when no region is given
+        self.client = clients.client("emr-serverless", region)
+
+    def prewarm(self):
+        """
+        Starts the application in the background if it isn't already started, so it
+        starts up while the project is built and uploaded. Jobs submitted afterwards
+        wait until the application is STARTED.
+        """
+        state = self.check_application()
+        if state == "STARTED":
+            console_log(f"Application {self.application_id} is already started")
+            return
+        # A daemon thread, so a build or upload that fails doesn't keep the CLI
+        # running until the application has started
+        self._prewarm = Future()
+        threading.Thread(
+            target=self._run_prewarm, args=(self._prewarm, state), name="emr-cli-prewarm", daemon=True
+        ).start()
+
+    def _run_prewarm(self, future: Future, state: str):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(self._start_application(state))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def wait_until_started(self) -> str:
+        """
+        Waits for the application started by `prewarm`, if any, and raises if it failed to start.
+        """
+        if self._prewarm is None:
+            return ""
+        if not self._prewarm.done():
+            console_log(f"Waiting for application {self.application_id} to start...")
+        return self._prewarm.result()
+
+    def _start_application(self, state: str) -> str:
+        def get_application() -> dict:
+            return self.client.get_application(applicationId=self.application_id)["application"]
+
+        def wait(state: str, terminal_states: List[str]) -> str:
+            poller = AdaptivePoller(
+                terminal_states=terminal_states,
+                backoff_states=(state,),
+                max_interval=self.APPLICATION_POLL_MAX_INTERVAL,
+            )
+            return poller.wait(get_application, initial_state=state, label="Application")["state"]
+
+        # An application that's being created or stopped has to settle before it can be started
+        if state in ("CREATING", "STOPPING"):
+            state = wait(state, ["CREATED", "STARTED", "STOPPED", "TERMINATED"])
+        if state in ("CREATED", "STOPPED"):
+            console_log(f"Starting application {self.application_id}")
+            self.client.start_application(applicationId=self.application_id)
+            state = "STARTING"
+        if state == "STARTING":
+            state = wait(state, ["STARTED", "STOPPING", "STOPPED", "TERMINATED"])
+        if state != "STARTED":
+            raise RuntimeError(f"EMR Serverless application {self.application_id} failed to start, it's {state}.")
+        return state
 
     def run_job(
         self,
@@ -246,10 +561,41 @@ class EMRServerless:
         show_logs: bool = False,
         s3_logs_uri: Optional[str] = None,
         timeout: Optional[int] = None,
+        max_poll_interval: Optional[float] = None,
     ):
         if show_logs and not s3_logs_uri:
             raise RuntimeError("--show-stdout requires --s3-logs-uri to be set.")
 
+        job_run_id = self.submit_job(job_name, job_args, spark_submit_opts, s3_logs_uri, timeout)
+        if not wait and not show_logs:
+            return job_run_id
+
+        console_log("Waiting for job to complete...")
+        jr_response = self.wait_for_job(job_run_id, max_poll_interval)
+
+        if show_logs:
+            console_log(f"stdout for {job_run_id}\n{'-'*38}")
+            print_s3_gz(self.s3_client, self.driver_log_uri(job_run_id, s3_logs_uri))
+
+        if jr_response.get("state") != self.SUCCESS_STATE:
+            console_log(f"EMR Serverless job failed: {jr_response.get('stateDetails')}")
+            sys.exit(1)
+        console_log("Job completed successfully!")
+
+        return job_run_id
+
+    def submit_job(
+        self,
+        job_name: str,
+        job_args: Optional[List[str]] = None,
+        spark_submit_opts: Optional[str] = None,
+        s3_logs_uri: Optional[str] = None,
+        timeout: Optional[int] = None,
+    ) -> str:
+        """
+        Starts a job run and returns its ID without waiting for it.
+        """
+        self.wait_until_started()
         jobDriver = {
             "sparkSubmit": {
                 "entryPoint": self.dp.entrypoint_uri(),
@@ -281,46 +627,68 @@ class EMRServerless:
         job_run_id = response.get("jobRunId")
 
         console_log(f"Job submitted to EMR Serverless (Job Run ID: {job_run_id})")
-        if not wait and not show_logs:
-            return job_run_id
-
-        console_log("Waiting for job to complete...")
-        job_done = False
-        job_state = "SUBMITTED"
-        jr_response = {}
-        while not job_done:
-            jr_response = self.get_job_run(job_run_id)
-            new_state = jr_response.get("state")
-            if new_state != job_state:
-                console_log(f"Job state is now: {new_state}")
-                job_state = new_state
-            job_done = new_state in [
-                "SUCCESS",
-                "FAILED",
-                "CANCELLING",
-                "CANCELLED",
-            ]
-            sleep(2)
+        return job_run_id
 
-        if show_logs:
-            console_log(f"stdout for {job_run_id}\n{'-'*38}")
-            log_location = join(
-                f"{s3_logs_uri}",
-                "applications",
-                self.application_id,
-                "jobs",
-                job_run_id,
-                "SPARK_DRIVER",
-                "stdout.gz",
-            )
-            print_s3_gz(self.s3_client, log_location)
+    def wait_for_job(self, job_run_id: str, max_poll_interval: Optional[float] = None, label: str = "Job") -> dict:
+        """
+        Waits for a job run to reach a terminal state and returns the final job run.
+        Concurrent waiters share a single JobRunTracker, so the number of API calls
+        doesn't grow with the number of runs being waited on.
+        """
+        return self._job_run_tracker(max_poll_interval).wait(job_run_id, label)
 
-        if jr_response.get("state") != "SUCCESS":
-            console_log(f"EMR Serverless job failed: {jr_response.get('stateDetails')}")
-            sys.exit(1)
-        console_log("Job completed successfully!")
+    def wait_for_jobs(
+        self, labels: Dict[str, str], max_poll_interval: Optional[float] = None
+    ) -> Iterator[Tuple[str, dict, Optional[BaseException]]]:
+        """
+        Waits for every job run in `labels`, a mapping of job run ID to label, from the
+        calling thread and yields `(job_run_id, final job run, error)` as each one finishes.
+        """
+        return self._job_run_tracker(max_poll_interval).wait_all(labels)
+
+    def _job_run_tracker(self, max_poll_interval: Optional[float]) -> JobRunTracker:
+        with self._tracker_lock:
+            if self._tracker is None:
+                self._tracker = JobRunTracker(
+                    self.list_job_runs,
+                    self.get_job_run,
+                    active_states=self.ACTIVE_STATES,
+                    terminal_states=self.TERMINAL_STATES,
+                    max_interval=max_poll_interval,
+                )
+            return self._tracker
+
+    def readiness_checks(self) -> Dict[str, Callable[[], Any]]:
+        """
+        Checks that can run while the project is being built and uploaded. When the
+        application is being pre-warmed, that's waiting for it to start.
+        """
+        if self._prewarm is not None:
+            return {"start application": self.wait_until_started}
+        return {"check application": self.check_application}
+
+    def check_application(self) -> str:
+        state = self.client.get_application(applicationId=self.application_id)["application"]["state"]
+        if state == "TERMINATED":
+            raise RuntimeError(f"EMR Serverless application {self.application_id} is terminated.")
+        return state
+
+    def list_job_runs(self, created_after: datetime, states: List[str], next_token: Optional[str] = None) -> dict:
+        kwargs = {"applicationId": self.application_id, "createdAtAfter": created_after, "states": states}
+        if next_token:
+            kwargs["nextToken"] = next_token
+        return self.client.list_job_runs(**kwargs)
+
+    def log_prefix(self, job_run_id: str, s3_logs_uri: Optional[str] = None) -> str:
+        """
+        Returns the S3 prefix holding the logs of every container of a job run.
+        """
+        if not s3_logs_uri:
+            raise RuntimeError("EMR Serverless logs require --s3-logs-uri to be set.")
+        return join(s3_logs_uri, "applications", self.application_id, "jobs", job_run_id, "")
 
-        return job_run_id
+    def driver_log_uri(self, job_run_id: str, s3_logs_uri: Optional[str] = None, name: str = "stdout.gz") -> str:
+        return join(self.log_prefix(job_run_id, s3_logs_uri), "SPARK_DRIVER", name)
 
     def get_job_run(self, job_run_id: str) -> dict:
         response = self.client.get_job_run(applicationId=self.application_id, jobRunId=job_run_id)
@@ -0,0 +1,97 @@
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, List, Optional, Sequence
+
+from emr_cli.utils import S3Client, console_log, iter_gz_lines, parse_bucket_uri
+
+DEFAULT_LOG_CONCURRENCY = 32
+
+# Lines are written in batches, so output from different containers interleaves by batch
+WRITE_BATCH_LINES = 500
+
+
+class LogFetcher:
+    """
+    Downloads every gzipped log file under an S3 prefix in parallel and streams
+    their lines to `out`, each prefixed with the file's path below the prefix,
+    e.g. `[SPARK_EXECUTOR/1/stderr]`. If `pattern` is set, only matching lines
+    are written. `paths` limits the listing to those directories below the prefix.
+    """
+
+    def __init__(
+        self,
+        s3_client: S3Client,
+        prefix_uri: str,
+        pattern: Optional[str] = None,
+        max_workers: int = DEFAULT_LOG_CONCURRENCY,
+        out: Optional[IO[str]] = None,
+        paths: Sequence[str] = ("",),
+    ) -> None:
+        self._s3_client = s3_client
+        self.bucket, self.prefix = parse_bucket_uri(prefix_uri)
+        if self.prefix:
+            self.prefix += "/"
+        self.paths = paths
+        self.pattern = re.compile(pattern) if pattern else None
+        self.max_workers = max_workers
+        self._out = out
+        self._lock = threading.Lock()
+
+    def list_logs(self) -> List[str]:
+        keys = []
+        paginator = self._s3_client.get_paginator("list_objects_v2")
+        for path in self.paths:
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix + path):
+                keys += [obj["Key"] for obj in page.get("Contents", []) if obj["Key"].endswith(".gz")]
+        return sorted(keys)
+
+    def run(self) -> int:
+        """
+        Fetches all of the logs and returns how many files were found.
+        """
+        keys = self.list_logs()
+        if keys:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as executor:
+                list(executor.map(self._fetch, keys))
+        return len(keys)
+
+    def container(self, key: str) -> str:
+        return key[len(self.prefix) :][: -len(".gz")]
+
+    def _fetch(self, key: str):
+        label = f"[{self.container(key)}] "
+        body = self._s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        batch = []
+        for line in iter_gz_lines(body):
+            if self.pattern is not None and not self.pattern.search(line):
+                continue
+            batch.append(label + line if line.endswith("\n") else f"{label}{line}\n")
+            if len(batch) >= WRITE_BATCH_LINES:
+                self._write(batch)
+                batch = []
+        self._write(batch)
+
+    def _write(self, lines: List[str]):
+        if not lines:
+            return
+        out = self._out or sys.stdout
+        with self._lock:
+            out.write("".join(lines))
+            out.flush()
+
+
+def fetch_logs(
+    s3_client: S3Client,
+    prefix_uri: str,
+    pattern: Optional[str] = None,
+    max_workers: int = DEFAULT_LOG_CONCURRENCY,
+    paths: Sequence[str] = ("",),
+):
+    locations = ", ".join(prefix_uri + path for path in paths)
+    console_log(f"Fetching logs from {locations}")
+    count = LogFetcher(s3_client, prefix_uri, pattern, max_workers, paths=paths).run()
+    if count == 0:
+        console_log(f"ERR: No logs found in {locations}")
+        sys.exit(1)
@@ -0,0 +1,302 @@
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from emr_cli.utils import console_log
+
+DEFAULT_MIN_POLL_INTERVAL = 1.0
+DEFAULT_MAX_POLL_INTERVAL = 60.0
+
+# Error codes the AWS APIs we poll use to tell us to slow down
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ProvisionedThroughputExceededException",
+}
+
+# Job runs are listed from a little before we submitted them, in case our clock is ahead of AWS
+CLOCK_SKEW = timedelta(minutes=5)
+
+
+def is_throttling_error(e: Exception) -> bool:
+    from botocore.exceptions import ClientError
+
+    return isinstance(e, ClientError) and e.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+class Backoff:
+    """
+    The polling interval: `min_interval` while things are changing, doubling up to
+    `max_interval` while they aren't. Every sleep is jittered so that many concurrent
+    waiters don't poll in lockstep.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+        max_interval: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval or DEFAULT_MAX_POLL_INTERVAL, min_interval)
+        self.interval = min_interval
+        self._sleep = sleep
+        self._jitter = jitter
+
+    def reset(self):
+        self.interval = self.min_interval
+
+    def increase(self):
+        self.interval = min(self.interval * 2, self.max_interval)
+
+    def sleep(self):
+        # "Equal jitter": keep at least half of the interval so backoff still backs off
+        self._sleep(self._jitter(self.interval / 2, self.interval))
+
+
+class AdaptivePoller:
+    """
+    Polls a job until it reaches a terminal state, with as few API calls as we can get away with.
+
+    - Right after submit and whenever the state changes, we poll every `min_interval` so
+      state transitions show up quickly.
+    - While the job sits in one of `backoff_states` (e.g. RUNNING), the interval doubles
+      on every poll, up to `max_interval`.
+    - Throttling errors double the interval and are retried instead of failing the run.
+
+    Every sleep is jittered so that many concurrent waiters don't poll in lockstep.
+    """
+
+    def __init__(
+        self,
+        terminal_states: Iterable[str],
+        backoff_states: Iterable[str] = ("RUNNING",),
+        min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+        max_interval: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        self.terminal_states = set(terminal_states)
+        self.backoff_states = set(backoff_states)
+        self.backoff = Backoff(min_interval, max_interval, sleep, jitter)
+        self.api_calls = 0
+
+    def wait(self, get_job_run: Callable[[], dict], initial_state: str = "SUBMITTED", label: str = "Job") -> dict:
+        """
+        Calls `get_job_run` until its `state` is terminal and returns the final response.
+        """
+        state = initial_state
+        while True:
+            try:
+                self.api_calls += 1
+                response = get_job_run()
+            except Exception as e:
+                if not is_throttling_error(e):
+                    raise
+                self.backoff.increase()
+                self.backoff.sleep()
+                continue
+
+            new_state = response.get("state")
+            if new_state != state:
+                console_log(f"{label} state is now: {new_state}")
+                state = new_state
+                self.backoff.reset()
+            elif state in self.backoff_states:
+                self.backoff.increase()
+            else:
+                self.backoff.reset()
+
+            if state in self.terminal_states:
+                return response
+            self.backoff.sleep()
+
+
+class _TrackedRun:
+    def __init__(self, job_run_id: str, label: str, initial_state: str) -> None:
+        self.job_run_id = job_run_id
+        self.label = label
+        self.state = initial_state
+        self.submitted_at = datetime.now(timezone.utc)
+        self.response: dict = {}
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+        # Queues of `JobRunTracker.wait_all` callers waiting on this run
+        self.listeners: List["queue.Queue[_TrackedRun]"] = []
+
+
+class JobRunTracker:
+    """
+    Tracks the state of many job runs at once.
+
+    Instead of one `get_job_run` call per run per poll, a single background thread lists
+    every run that's still active with paginated `list_job_runs(created_after, states)`
+    calls and fans the states out to the threads blocked in `wait`. A tracked run that's
+    missing from the listing has reached a terminal state, so it's fetched once to get
+    its final details. While only one run is pending, listing every active run in the
+    application would cost more than fetching that run, so it's fetched directly. The polling interval follows the same rules as AdaptivePoller,
+    applied to the batch as a whole.
+
+    `list_job_runs(created_after, states, next_token)` must return a page with `jobRuns`
+    (each with an `id` and a `state`) and an optional `nextToken`, and
+    `get_job_run(job_run_id)` must return a single job run.
+    """
+
+    def __init__(
+        self,
+        list_job_runs: Callable[[datetime, List[str], Optional[str]], dict],
+        get_job_run: Callable[[str], dict],
+        active_states: Iterable[str],
+        terminal_states: Iterable[str],
+        backoff_states: Iterable[str] = ("RUNNING",),
+        min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+        max_interval: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        self._list_job_runs = list_job_runs
+        self._get_job_run = get_job_run
+        self.active_states = list(active_states)
+        self.terminal_states = set(terminal_states)
+        self.backoff_states = set(backoff_states)
+        self.backoff = Backoff(min_interval, max_interval, sleep, jitter)
+        self.api_calls = 0
+
+        self._runs: Dict[str, _TrackedRun] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def wait(self, job_run_id: str, label: str = "Job", initial_state: str = "SUBMITTED") -> dict:
+        """
+        Blocks until the job run reaches a terminal state and returns the final job run.
+        Safe to call from many threads at once.
+        """
+        with self._lock:
+            run = self._track(job_run_id, label, initial_state)
+
+        run.done.wait()
+        if run.error is not None:
+            raise run.error
+        return run.response
+
+    def wait_all(
+        self, labels: Dict[str, str], initial_state: str = "SUBMITTED"
+    ) -> Iterator[Tuple[str, dict, Optional[BaseException]]]:
+        """
+        Tracks every job run in `labels`, a mapping of job run ID to label, and yields
+        `(job_run_id, final job run, error)` as each one reaches a terminal state.
+        Waiting on a whole batch this way takes one thread, not one per run.
+        """
+        finished: "queue.Queue[_TrackedRun]" = queue.Queue()
+        with self._lock:
+            for job_run_id, label in labels.items():
+                run = self._track(job_run_id, label, initial_state)
+                if run.done.is_set():
+                    finished.put(run)
+                else:
+                    run.listeners.append(finished)
+
+        for _ in range(len(labels)):
+            run = finished.get()
+            yield run.job_run_id, run.response, run.error
+
+    def _track(self, job_run_id: str, label: str, initial_state: str) -> _TrackedRun:
+        """
+        Starts tracking a job run, and the polling thread if it isn't running. Call with the lock held.
+        """
+        run = self._runs.get(job_run_id)
+        if run is None:
+            run = self._runs[job_run_id] = _TrackedRun(job_run_id, label, initial_state)
+        if self._thread is None:
+            # A new run was submitted, so check on it soon
+            self.backoff.reset()
+            self._thread = threading.Thread(target=self._poll_loop, name="emr-cli-tracker", daemon=True)
+            self._thread.start()
+        return run
+
+    def _finish(self, run: _TrackedRun, response: Optional[dict] = None, error: Optional[BaseException] = None):
+        with self._lock:
+            run.response = response or {}
+            run.error = error
+            run.done.set()
+            for listener in run.listeners:
+                listener.put(run)
+
+    def _pending(self) -> List[_TrackedRun]:
+        return [run for run in self._runs.values() if not run.done.is_set()]
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                pending = self._pending()
+                if not pending:
+                    self._thread = None
+                    return
+
+            try:
+                changed = self.poll(pending)
+            except Exception as e:
+                if is_throttling_error(e):
+                    self.backoff.increase()
+                    self.backoff.sleep()
+                    continue
+                for run in pending:
+                    self._finish(run, error=e)
+                continue
+
+            still_pending = [run for run in pending if not run.done.is_set()]
+            if changed or any(run.state not in self.backoff_states for run in still_pending):
+                self.backoff.reset()
+            else:
+                self.backoff.increase()
+            if still_pending:
+                self.backoff.sleep()
+
+    def poll(self, pending: List[_TrackedRun]) -> bool:
+        """
+        Refreshes the state of every pending run. Returns True if any of them changed.
+        """
+        if len(pending) == 1:
+            self.api_calls += 1
+            return self._update(pending[0], self._get_job_run(pending[0].job_run_id))
+
+        created_after = min(run.submitted_at for run in pending) - CLOCK_SKEW
+        wanted = {run.job_run_id for run in pending}
+        listed: Dict[str, dict] = {}
+        next_token = None
+        while True:
+            self.api_calls += 1
+            page = self._list_job_runs(created_after, self.active_states, next_token)
+            for job_run in page.get("jobRuns", []):
+                if job_run.get("id") in wanted:
+                    listed[job_run["id"]] = job_run
+            next_token = page.get("nextToken")
+            if not next_token:
+                break
+
+        changed = False
+        for run in pending:
+            job_run = listed.get(run.job_run_id)
+            if job_run is None:
+                # No longer active (or not listed yet), one call tells us which
+                self.api_calls += 1
+                job_run = self._get_job_run(run.job_run_id)
+            changed = self._update(run, job_run) or changed
+        return changed
+
+    def _update(self, run: _TrackedRun, job_run: dict) -> bool:
+        new_state = job_run.get("state")
+        changed = new_state != run.state
+        if changed:
+            console_log(f"{run.label} state is now: {new_state}")
+            run.state = new_state
+        if new_state in self.terminal_states:
+            self._finish(run, job_run)
+        return changed
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import time
+from typing import Callable, Optional
+
+from emr_cli import clients
+from emr_cli.utils import console_log, user_cache_dir
+
+DEFAULT_RELEASE_LABEL_TTL = 24 * 60 * 60
+RELEASE_LABEL_CACHE_FILE = "release-labels.json"
+
+
+class ReleaseLabelCache:
+    """
+    Remembers the latest EMR release label per region for `ttl` seconds.
+
+    The cache is only an optimization: if it can't be read or written, lookups
+    just go to the EMR API.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: int = DEFAULT_RELEASE_LABEL_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path or os.path.join(user_cache_dir(), RELEASE_LABEL_CACHE_FILE)
+        self.ttl = ttl
+        self._clock = clock
+
+    def get(self, region: str) -> Optional[str]:
+        if self.ttl <= 0:
+            return None
+        entry = self._read().get(region) or {}
+        label, fetched_at = entry.get("label"), entry.get("fetched_at", 0)
+        if label and 0 <= self._clock() - fetched_at < self.ttl:
+            return label
+        return None
+
+    def put(self, region: str, label: str):
+        entries = self._read()
+        entries[region] = {"label": label, "fetched_at": self._clock()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+
+def latest_release_label(
+    region: Optional[str] = None,
+    ttl: int = DEFAULT_RELEASE_LABEL_TTL,
+    refresh: bool = False,
+) -> str:
+    """
+    Returns the latest EMR 6.x release label with Spark, from the cache if it's fresh enough.
+    `refresh` skips the cache lookup and stores a newly fetched label.
+    """
+    # Resolving the region doesn't make any API calls
+    region = region or clients.region_name() or ""
+    cache = ReleaseLabelCache(ttl=ttl)
+    label = None if refresh else cache.get(region)
+    if label:
+        return label
+
+    emr_client = clients.client("emr", region)
+    response = emr_client.list_release_labels(Filters={"Application": "Spark", "Prefix": "emr-6"}, MaxResults=1)
+    if len(response["ReleaseLabels"]) == 0:
+        console_log("Error: No release labels found")
+        sys.exit(1)
+    label = response["ReleaseLabels"][0]
+    cache.put(region, label)
+    return label
@@ -5,17 +5,127 @@ except ModuleNotFoundError:
     # https://github.com/python/importlib_metadata#compatibility-with-python-3.7
     from importlib_metadata import version
 
+import os
+import sys
+from functools import update_wrapper
+
 import click
 from emr_cli.config import DEFAULT_CONFIG_PATH, ConfigReader, ConfigWriter
-from emr_cli.deployments.emr_ec2 import EMREC2
-from emr_cli.deployments.emr_ec2 import Bootstrap as BootstrapEMRonEC2
-from emr_cli.deployments.emr_eks import EMREKS
-from emr_cli.packaging.detector import ProjectDetector
-from emr_cli.utils import console_log
+from emr_cli.deployments.batch import DEFAULT_BATCH_CONCURRENCY, run_batch
+from emr_cli.deployments.logs import DEFAULT_LOG_CONCURRENCY
+from emr_cli.deployments.release_labels import DEFAULT_RELEASE_LABEL_TTL
+from emr_cli.utils import build_transfer_config, console_log
+
+# Deployment backends and packaging classes pull in boto3 and rich, so they are
+# imported inside the subcommands that need them. This keeps `emr --help`,
+# `emr status` and friends fast, which matters when `emr` is run many times in CI.
+
+
+def upload_options(f):
+    """
+    S3 transfer tuning options shared by commands that upload artifacts.
+    """
+    f = click.option(
+        "--max-concurrency",
+        help="Maximum number of concurrent S3 requests per file",
+        type=click.IntRange(min=1),
+        default=None,
+    )(f)
+    f = click.option(
+        "--multipart-chunksize",
+        help="Size in MiB of each part of a multipart upload",
+        type=click.IntRange(min=5),
+        default=None,
+    )(f)
+    f = click.option(
+        "--multipart-threshold",
+        help="Files larger than this many MiB are uploaded in parts",
+        type=click.IntRange(min=5),
+        default=None,
+    )(f)
+    return f
+
+
+def validate_deps_uri(ctx, param, value):
+    if value is not None and not value.startswith("s3://"):
+        raise click.BadParameter(f"must be an S3 URI (s3://bucket/prefix/), provided '{value}'")
+    return value
+
+
+def deps_uri_option(f):
+    return click.option(
+        "--deps-uri",
+        help="Store dependency archives by content hash under this S3 prefix, e.g. s3://bucket/deps/",
+        callback=validate_deps_uri,
+        default=None,
+    )(f)
+
+
+def validate_docker_cache_dir(ctx, param, value):
+    if value is None:
+        return value
+    # The cache is replaced after every build, so it can't hold the project
+    cache_dir, cwd = os.path.abspath(value), os.getcwd()
+    if os.path.commonpath([cache_dir, cwd]) == cache_dir:
+        raise click.BadParameter(f"must be a directory of its own, not one containing the project, provided '{value}'")
+    return value
+
+
+def build_options(f):
+    """
+    Options for how dependencies are built, with pip or with Docker.
+    """
+    f = click.option(
+        "--docker-cache-dir",
+        help="Read and write Docker build layers from this directory with buildx, e.g. to share them between CI runs",
+        type=click.Path(file_okay=False),
+        callback=validate_docker_cache_dir,
+        default=None,
+    )(f)
+    f = click.option(
+        "--python-version",
+        help="With --local-build, the Python version on EMR to install packages for - defaults to 3.7 (EMR 6.x)",
+        default=None,
+    )(f)
+    f = click.option(
+        "--local-build",
+        help="Build dependencies with pip and prebuilt Linux wheels, without Docker",
+        default=False,
+        is_flag=True,
+    )(f)
+    return f
+
+
+def validate_worker_resources(ctx, param, value):
+    if value is None:
+        return value
+    from emr_cli.deployments.emr_serverless import parse_worker_resources
+
+    try:
+        parse_worker_resources(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    return value
+
+
+def pass_project(f):
+    """
+    Like `click.pass_obj`, but passes the detected project type.
+
+    Detection walks the working directory, so only commands that operate on a
+    project should pay for it.
+    """
+
+    @click.pass_context
+    def new_func(ctx, *args, **kwargs):
+        from emr_cli.packaging.detector import ProjectDetector
 
-from .deployments.emr_serverless import Bootstrap as BootstrapEMRServerless
-from .deployments.emr_serverless import EMRServerless
-from .packaging.python_project import PythonProject
+        # If we want the user to be able to force a project type, check out click.Choice
+        if ctx.obj is None:
+            ctx.obj = ProjectDetector().detect()
+        return ctx.invoke(f, ctx.obj, *args, **kwargs)
+
+    return update_wrapper(new_func, f)
 
 
 @click.group()
@@ -24,9 +134,6 @@ def cli(ctx):
     """
     Package, deploy, and run PySpark projects on EMR.
     """
-    # If we want the user to be able to force a project type, check out click.Choice
-    ctx.obj = ProjectDetector().detect()
-
     # If a config file exists, set those as defaults for all other options
     ctx.default_map = ConfigReader.read()
     if ctx.default_map:
@@ -34,7 +141,7 @@ def cli(ctx):
 
 
 @click.command()
-@click.pass_obj
+@pass_project
 def status(project):
     console_log("")
     print(f"Project type:\t\t{ project.__name__}")
@@ -64,13 +171,68 @@ This role has access to read and write to the source code and logs buckets,
 and access to read and create tables in the Glue Data Catalog.""",
     required=True,
 )
+@click.option(
+    "--release-label",
+    help="EMR Serverless application release label - defaults to emr-6.9.0",
+    default="emr-6.9.0",
+)
+@click.option(
+    "--driver-workers",
+    help="Number of pre-initialized EMR Serverless drivers kept warm while the application is started",
+    type=click.IntRange(min=0),
+    default=0,
+)
+@click.option(
+    "--driver-size",
+    help="Size of each pre-initialized driver as cpu,memory[,disk] - defaults to 4vCPU,16GB",
+    callback=validate_worker_resources,
+    default="4vCPU,16GB",
+)
+@click.option(
+    "--executor-workers",
+    help="Number of pre-initialized EMR Serverless executors kept warm while the application is started",
+    type=click.IntRange(min=0),
+    default=0,
+)
+@click.option(
+    "--executor-size",
+    help="Size of each pre-initialized executor as cpu,memory[,disk] - defaults to 4vCPU,16GB",
+    callback=validate_worker_resources,
+    default="4vCPU,16GB",
+)
+@click.option(
+    "--max-capacity",
+    help="Maximum total EMR Serverless application capacity as cpu,memory[,disk], e.g. 100vCPU,400GB",
+    callback=validate_worker_resources,
+    default=None,
+)
+@click.option(
+    "--idle-timeout",
+    help="Minutes without jobs before the EMR Serverless application stops - defaults to 15",
+    type=click.IntRange(min=1, max=10080),
+    default=15,
+)
 @click.option(
     "--destroy",
     default=False,
     is_flag=True,
     help="Prints the commands necessary to destroy the created environment.",
 )
-def bootstrap(target, code_bucket, logs_bucket, instance_profile_name, job_role_name, destroy):
+def bootstrap(
+    target,
+    code_bucket,
+    logs_bucket,
+    instance_profile_name,
+    job_role_name,
+    release_label,
+    driver_workers,
+    driver_size,
+    executor_workers,
+    executor_size,
+    max_capacity,
+    idle_timeout,
+    destroy,
+):
     """
     Bootstrap an EMR Serverless environment.
 
@@ -81,9 +243,24 @@ def bootstrap(target, code_bucket, logs_bucket, instance_profile_name, job_role_
     if target == "emr-ec2" and instance_profile_name is None:
         raise click.BadArgumentUsage("EMR on EC2 clusters require --instance-profile-name to be set.")
 
+    application_config = None
     if target == "emr-serverless":
-        b = BootstrapEMRServerless(code_bucket, logs_bucket, job_role_name)
+        from emr_cli.deployments.emr_serverless import ApplicationConfig
+        from emr_cli.deployments.emr_serverless import Bootstrap as BootstrapEMRServerless
+
+        application_config = ApplicationConfig(
+            release_label,
+            driver_workers,
+            driver_size,
+            executor_workers,
+            executor_size,
+            max_capacity,
+            idle_timeout,
+        )
+        b = BootstrapEMRServerless(code_bucket, logs_bucket, job_role_name, application_config)
     else:
+        from emr_cli.deployments.emr_ec2 import Bootstrap as BootstrapEMRonEC2
+
         b = BootstrapEMRonEC2(code_bucket, logs_bucket, instance_profile_name, job_role_name)
 
     resource_id = "application_id" if target == "emr-serverless" else "cluster_id"
@@ -104,6 +281,9 @@ def bootstrap(target, code_bucket, logs_bucket, instance_profile_name, job_role_
             "s3_logs_uri": f"s3://{config.get('log_bucket')}/logs/pyspark/",
         }
     }
+    if application_config:
+        # Used as the defaults if `emr bootstrap` is run again
+        run_config["bootstrap"] = application_config.to_config()
     ConfigWriter.write(run_config)
 
 
@@ -125,6 +305,9 @@ def init(path, dockerfile, project_type):
     """
     Initialize a local PySpark project.
     """
+    from emr_cli.packaging.detector import ProjectDetector
+    from emr_cli.packaging.python_project import PythonProject
+
     if dockerfile:
         click.echo("Creating sample Dockerfile...")
         PythonProject().copy_single_file("Dockerfile")
@@ -140,13 +323,26 @@ def init(path, dockerfile, project_type):
     help="Entrypoint file",
     required=True,
 )
-@click.pass_obj
-def package(project, entry_point):
+@click.option(
+    "--force-build",
+    help="Rebuild dependencies even if their inputs haven't changed",
+    default=False,
+    is_flag=True,
+)
+@build_options
+@pass_project
+def package(project, entry_point, force_build, local_build, python_version, docker_cache_dir):
     """
     Package a project and dependencies into dist/
     """
-    p = project(entry_point)
-    p.build()
+    if python_version and not local_build:
+        raise click.BadArgumentUsage("--python-version can only be used with --local-build.")
+    if docker_cache_dir and local_build:
+        raise click.BadArgumentUsage("--docker-cache-dir can't be used with --local-build.")
+    p = project(
+        entry_point, local_build=local_build, python_version=python_version, docker_cache_dir=docker_cache_dir
+    )
+    p.build(force=force_build)
 
 
 @click.command()
@@ -161,13 +357,37 @@ def package(project, entry_point):
     help="Where to copy code artifacts to",
     required=True,
 )
-@click.pass_obj
-def deploy(project, entry_point, s3_code_uri):
+@click.option(
+    "--prefetch-emr-eks-release-label",
+    help="Also look up and cache the latest EMR on EKS release label, so `emr run` doesn't have to",
+    default=False,
+    is_flag=True,
+)
+@deps_uri_option
+@upload_options
+@pass_project
+def deploy(
+    project,
+    entry_point,
+    s3_code_uri,
+    prefetch_emr_eks_release_label,
+    deps_uri,
+    multipart_threshold,
+    multipart_chunksize,
+    max_concurrency,
+):
     """
     Copy a local project to S3.
     """
-    p = project(entry_point)
-    p.deploy(s3_code_uri)
+    p = project(entry_point, deps_uri=deps_uri)
+    p.deploy(s3_code_uri, build_transfer_config(multipart_threshold, multipart_chunksize, max_concurrency))
+
+    if prefetch_emr_eks_release_label:
+        from emr_cli.deployments.release_labels import latest_release_label
+
+        # Always fetch, so the cached label is good for a full TTL
+        label = latest_release_label(refresh=True)
+        console_log(f"Cached latest EMR on EKS release label {label}")
 
 
 @click.command()
@@ -200,6 +420,18 @@ def deploy(project, entry_point, s3_code_uri):
     default=False,
     is_flag=True,
 )
+@click.option(
+    "--force-build",
+    help="With --build, rebuild dependencies even if their inputs haven't changed",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--pipeline",
+    help="With --build, upload artifacts as soon as each is ready and check the target is ready at the same time",
+    default=False,
+    is_flag=True,
+)
 @click.option(
     "--show-stdout",
     help="Show the stdout of the job after it's finished",
@@ -214,13 +446,57 @@ def deploy(project, entry_point, s3_code_uri):
 @click.option(
     "--emr-eks-release-label", help="EMR on EKS release label (emr-6.15.0) - defaults to latest release", default=None
 )
+@click.option(
+    "--emr-eks-release-label-ttl",
+    help="Seconds to cache the latest EMR on EKS release label - defaults to 1 day, 0 disables the cache",
+    type=click.IntRange(min=0),
+    default=DEFAULT_RELEASE_LABEL_TTL,
+)
+@click.option(
+    "--refresh-emr-eks-release-label",
+    help="Look up the latest EMR on EKS release label even if it's cached",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "--prewarm",
+    help="Start a stopped EMR Serverless application while the project is built, and submit once it's started",
+    default=False,
+    is_flag=True,
+)
 @click.option(
     "--emr-serverless-timeout",
     help="EMR Serverless job timeout in minutes - defaults to 12 hours",
     default=720, # set to AWS default value (12 hours in minutes)
     type=int
 )
-@click.pass_obj
+@click.option(
+    "--batch-args",
+    help="Comma-delimited job arguments for one run of a batch. Repeat for each run.",
+    multiple=True,
+)
+@click.option(
+    "--batch-file",
+    type=click.Path(exists=True, dir_okay=False, allow_dash=False),
+    help="YAML or JSON file with a list of job arguments, or a `matrix` of argument values, to run as a batch",
+    default=None,
+)
+@click.option(
+    "--batch-concurrency",
+    help="Maximum number of batch runs to submit at once",
+    type=click.IntRange(min=1),
+    default=DEFAULT_BATCH_CONCURRENCY,
+)
+@click.option(
+    "--max-poll-interval",
+    help="With --wait, the longest time in seconds between job status checks - defaults to 60",
+    type=click.FloatRange(min=1),
+    default=None,
+)
+@build_options
+@deps_uri_option
+@upload_options
+@pass_project
 @click.pass_context
 def run(
     ctx,
@@ -237,10 +513,26 @@ def run(
     job_args,
     spark_submit_opts,
     build,
+    force_build,
+    pipeline,
     show_stdout,
     save_config,
     emr_eks_release_label,
+    emr_eks_release_label_ttl,
+    refresh_emr_eks_release_label,
+    prewarm,
     emr_serverless_timeout,
+    batch_args,
+    batch_file,
+    batch_concurrency,
+    max_poll_interval,
+    local_build,
+    python_version,
+    docker_cache_dir,
+    deps_uri,
+    multipart_threshold,
+    multipart_chunksize,
+    max_concurrency,
 ):
     """
     Run a project on EMR, optionally build and deploy
@@ -262,7 +554,14 @@ def run(
     # We require entry-point and s3-code-uri
     if entry_point is None or s3_code_uri is None:
         raise click.BadArgumentUsage("--entry-point and --s3-code-uri are required.")
-    p = project(entry_point, s3_code_uri)
+    p = project(
+        entry_point,
+        s3_code_uri,
+        deps_uri=deps_uri,
+        local_build=local_build,
+        python_version=python_version,
+        docker_cache_dir=docker_cache_dir,
+    )
 
     # Do a brief validation of the EMR on EKS release label
     if emr_eks_release_label:
@@ -271,17 +570,32 @@ def run(
         elif not emr_eks_release_label.startswith("emr-"):
             raise click.BadArgumentUsage(f"--emr-eks-release-label must start with 'emr-', provided '{emr_eks_release_label}'")
 
+    arg_sets = None
+    if batch_args or batch_file:
+        if job_args:
+            raise click.BadArgumentUsage("--job-args can't be used with --batch-args or --batch-file.")
+        if show_stdout:
+            raise click.BadArgumentUsage("--show-stdout can't be used with --batch-args or --batch-file.")
+        arg_sets = [args.split(",") for args in batch_args]
+        if batch_file:
+            from emr_cli.deployments.batch import load_batch_file
+
+            try:
+                arg_sets += load_batch_file(batch_file)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--batch-file")
+        if not arg_sets:
+            raise click.BadParameter("no job arguments found", param_hint="--batch-file")
+
     # If the user passes --save-config, update our stored config file
     if save_config:
-        run_config = {"run": ctx.__dict__.get("params")}
+        # Options that can be repeated are tuples, which don't round-trip through YAML
+        params = {k: list(v) if isinstance(v, tuple) else v for k, v in ctx.params.items()}
+        run_config = {"run": params}
         del run_config["run"]["save_config"]
         ConfigWriter.write(run_config)
         console_log(f"Config file saved to {DEFAULT_CONFIG_PATH}. Use `emr run` to re-use your configuration.")  # noqa: E501
 
-    if build:
-        p.build()
-        p.deploy(s3_code_uri)
-
     if any([application_id, virtual_cluster_id]):
         # We require entry-point and job-role
         if entry_point is None or job_role is None:
@@ -292,26 +606,198 @@ def run(
     if emr_serverless_timeout < 0:
         raise click.BadArgumentUsage("--emr-serverless-timeout must be greater than or equal to 0.")
 
+    if prewarm and not application_id:
+        raise click.BadArgumentUsage("--prewarm can only be used with --application-id.")
+
+    if pipeline and not build:
+        raise click.BadArgumentUsage("--pipeline can only be used with --build.")
+    if local_build and not build:
+        raise click.BadArgumentUsage("--local-build can only be used with --build.")
+    if python_version and not local_build:
+        raise click.BadArgumentUsage("--python-version can only be used with --local-build.")
+    if docker_cache_dir and (not build or local_build):
+        raise click.BadArgumentUsage("--docker-cache-dir can only be used with --build, without --local-build.")
+
+    if job_args:
+        job_args = job_args.split(",")
+
+    transfer_config = build_transfer_config(multipart_threshold, multipart_chunksize, max_concurrency)
+
+    def build_and_deploy(readiness_checks):
+        if not build:
+            return
+        if pipeline:
+            from emr_cli.pipeline import run_pipelined
+
+            run_pipelined(p, s3_code_uri, readiness_checks, force_build, transfer_config)
+        else:
+            p.build(force=force_build)
+            p.deploy(s3_code_uri, transfer_config)
+
     # application_id indicates EMR Serverless job
     if application_id is not None:
-        if job_args:
-            job_args = job_args.split(",")
+        from emr_cli.deployments.emr_serverless import EMRServerless
+
         emrs = EMRServerless(application_id, job_role, p)
-        emrs.run_job(job_name, job_args, spark_submit_opts, wait, show_stdout, s3_logs_uri, emr_serverless_timeout)
+        if prewarm:
+            emrs.prewarm()
+        build_and_deploy(emrs.readiness_checks())
+        if arg_sets:
+            run_batch(
+                emrs,
+                lambda name, args: emrs.submit_job(name, args, spark_submit_opts, s3_logs_uri, emr_serverless_timeout),
+                job_name,
+                arg_sets,
+                wait,
+                batch_concurrency,
+                max_poll_interval,
+            )
+        else:
+            emrs.run_job(
+                job_name,
+                job_args,
+                spark_submit_opts,
+                wait,
+                show_stdout,
+                s3_logs_uri,
+                emr_serverless_timeout,
+                max_poll_interval,
+            )
 
     # cluster_id indicates EMR on EC2 job
     if cluster_id is not None:
-        if job_args:
-            job_args = job_args.split(",")
+        from emr_cli.deployments.emr_ec2 import EMREC2
+
         emr = EMREC2(cluster_id, p, job_role)
-        emr.run_job(job_name, job_args, spark_submit_opts, wait, show_stdout)
+        build_and_deploy(emr.readiness_checks())
+        if arg_sets:
+            run_batch(
+                emr,
+                lambda name, args: emr.submit_job(name, args, spark_submit_opts),
+                job_name,
+                arg_sets,
+                wait,
+                batch_concurrency,
+                max_poll_interval,
+            )
+        else:
+            emr.run_job(job_name, job_args, spark_submit_opts, wait, show_stdout, max_poll_interval)
 
     # virtual_cluster_id is EMR on EKS
     if virtual_cluster_id is not None:
-        if job_args:
-            job_args = job_args.split(",")
-        emreks = EMREKS(virtual_cluster_id, job_role, p)
-        emreks.run_job(job_name, job_args, spark_submit_opts, wait, show_stdout, s3_logs_uri, emr_eks_release_label)
+        from emr_cli.deployments.emr_eks import EMREKS
+
+        emreks = EMREKS(
+            virtual_cluster_id,
+            job_role,
+            p,
+            release_label_ttl=emr_eks_release_label_ttl,
+            refresh_release_label=refresh_emr_eks_release_label,
+        )
+        build_and_deploy(emreks.readiness_checks(emr_eks_release_label))
+        if arg_sets:
+            # Look up the latest release label once for the whole batch
+            release_label = emreks.resolve_release_label(emr_eks_release_label)
+            run_batch(
+                emreks,
+                lambda name, args: emreks.submit_job(name, args, spark_submit_opts, s3_logs_uri, release_label),
+                job_name,
+                arg_sets,
+                wait,
+                batch_concurrency,
+                max_poll_interval,
+            )
+        else:
+            emreks.run_job(
+                job_name,
+                job_args,
+                spark_submit_opts,
+                wait,
+                show_stdout,
+                s3_logs_uri,
+                emr_eks_release_label,
+                max_poll_interval,
+            )
+
+
+@click.command()
+@click.option("--application-id", help="EMR Serverless Application ID")
+@click.option("--cluster-id", help="EMR on EC2 Cluster ID")
+@click.option("--virtual-cluster-id", help="EMR on EKS Virtual Cluster ID")
+@click.option("--job-run-id", help="Job run ID, or step ID for EMR on EC2", required=True)
+@click.option("--s3-logs-uri", help="Where the job sent its logs - defaults to the cluster's log URI on EMR on EC2")
+@click.option("--grep", "pattern", help="Only show lines matching this regular expression", default=None)
+@click.option(
+    "--concurrency",
+    help="Number of log files to download at once",
+    type=click.IntRange(min=1),
+    default=DEFAULT_LOG_CONCURRENCY,
+)
+@click.pass_context
+def logs(ctx, application_id, cluster_id, virtual_cluster_id, job_run_id, s3_logs_uri, pattern, concurrency):
+    """
+    Show the logs of every container of a job run.
+
+    On EMR on EC2, these are the step's logs and the YARN container logs of the
+    Spark applications it submitted, found from the step's stderr.
+
+    Falls back to the resource ID and logs URI saved in the `run` config.
+    """
+    import re
+
+    resource_ids = [application_id, cluster_id, virtual_cluster_id]
+    if not any(resource_ids):
+        run_config = (ctx.find_root().default_map or {}).get("run") or {}
+        application_id = run_config.get("application_id")
+        cluster_id = run_config.get("cluster_id")
+        virtual_cluster_id = run_config.get("virtual_cluster_id")
+        s3_logs_uri = s3_logs_uri or run_config.get("s3_logs_uri")
+        resource_ids = [application_id, cluster_id, virtual_cluster_id]
+
+    if resource_ids.count(None) != (len(resource_ids) - 1):
+        raise click.BadArgumentUsage(
+            "Exactly one of --application-id, --cluster-id, or --virtual-cluster-id must be specified."
+        )
+    if cluster_id is None and s3_logs_uri is None:
+        raise click.BadArgumentUsage("--s3-logs-uri is required for EMR Serverless and EMR on EKS.")
+    if pattern:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise click.BadParameter(str(e), param_hint="--grep")
+
+    from emr_cli import clients
+
+    # One connection per download thread
+    if concurrency > clients.aws_settings()["max_pool_connections"]:
+        clients.configure(max_pool_connections=concurrency)
+
+    from emr_cli.deployments.emr_serverless import DeploymentPackage
+    from emr_cli.deployments.logs import fetch_logs
+
+    if application_id is not None:
+        from emr_cli.deployments.emr_serverless import EMRServerless
+
+        backend = EMRServerless(application_id, "", DeploymentPackage())
+    elif cluster_id is not None:
+        from emr_cli.deployments.emr_ec2 import EMREC2
+
+        backend = EMREC2(cluster_id, DeploymentPackage())
+    else:
+        from emr_cli.deployments.emr_eks import EMREKS
+
+        backend = EMREKS(virtual_cluster_id, "", DeploymentPackage())
+
+    try:
+        if cluster_id is not None:
+            prefix, paths = backend.log_paths(job_run_id, s3_logs_uri)
+        else:
+            prefix, paths = backend.log_prefix(job_run_id, s3_logs_uri), [""]
+    except RuntimeError as e:
+        console_log(f"ERR: {e}")
+        sys.exit(1)
+
+    fetch_logs(clients.client("s3"), prefix, pattern, concurrency, paths)
 
 
 cli.add_command(package)
@@ -320,6 +806,7 @@ cli.add_command(run)
 cli.add_command(init)
 cli.add_command(bootstrap)
 cli.add_command(status)
+cli.add_command(logs)
 
 if __name__ == "__main__":
     cli()  # type: ignore
@@ -0,0 +1,373 @@
+import bz2
+import hashlib
+import json
+import os
+import struct
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, List, Optional
+
+from emr_cli.config import ConfigReader
+from emr_cli.utils import file_sha256
+
+COMPRESSION_METHODS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+DEFAULT_COMPRESSION = "deflated"
+DEFAULT_COMPRESSLEVEL = 6
+
+# Every entry gets the same timestamp and permissions so the archive only
+# changes when file contents do. 1980-01-01 is the earliest date zip supports.
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+FILE_MODE = 0o644
+UNIX_SYSTEM = 3
+
+# Zip record layouts, see section 4.3 of https://pkware.cachefly.net/webdocs/casestudies/APPNOTE.TXT
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_OF_CENTRAL_DIR = struct.Struct("<IHHHHIIH")
+LOCAL_HEADER_SIGNATURE = 0x04034B50
+CENTRAL_HEADER_SIGNATURE = 0x02014B50
+END_OF_CENTRAL_DIR_SIGNATURE = 0x06054B50
+UTF8_FLAG = 0x800
+
+# Beyond these we'd need zip64 records, which only zipfile knows how to write
+ZIP_MAX_ENTRIES = 0xFFFF
+ZIP_MAX_SIZE = 0x7FFFFFFF
+
+MANIFEST_VERSION = 1
+
+
+class ZipMember:
+    """
+    A zip entry whose data has already been compressed.
+    """
+
+    def __init__(
+        self,
+        arcname: str,
+        compress_type: int,
+        crc: int,
+        file_size: int,
+        data: bytes,
+        sha256: Optional[str] = None,
+    ) -> None:
+        self.arcname = arcname
+        self.compress_type = compress_type
+        self.crc = crc
+        self.file_size = file_size
+        self.data = data
+        self.sha256 = sha256
+        # Set by incremental updates
+        self.reused = False
+        self.stat: Optional[os.stat_result] = None
+
+
+class UpdateStats:
+    """
+    Counts of what an incremental archive update did.
+    """
+
+    def __init__(self) -> None:
+        self.compressed = 0
+        self.reused = 0
+        self.removed = 0
+
+    def __str__(self) -> str:
+        return f"{self.compressed} compressed, {self.reused} reused, {self.removed} removed"
+
+
+class ZipArchiveBuilder:
+    """
+    Builds reproducible zip archives.
+
+    Entries are written in sorted order with normalized timestamps and
+    permissions, so building the same files twice produces byte-identical
+    archives that can be hashed for caching and upload-skipping.
+
+    Members are compressed in a thread pool (zlib and bz2 release the GIL while
+    compressing) and then written out in order as a single archive. The output
+    is the same regardless of the number of workers.
+
+    `update` rebuilds an archive incrementally using a manifest of the size,
+    mtime and hash of each archived file, only compressing what changed.
+    """
+
+    def __init__(
+        self,
+        compression: str = DEFAULT_COMPRESSION,
+        compresslevel: Optional[int] = DEFAULT_COMPRESSLEVEL,
+        workers: Optional[int] = None,
+    ):
+        if compression not in COMPRESSION_METHODS:
+            raise ValueError(
+                f"Unknown zip compression '{compression}', must be one of: {', '.join(COMPRESSION_METHODS)}"
+            )
+        self.compression = compression
+        self.compress_type = COMPRESSION_METHODS[compression]
+        # Levels don't apply to stored entries
+        self.compresslevel = None if compression == "stored" else compresslevel
+        self.workers = workers or os.cpu_count() or 1
+
+    @classmethod
+    def from_config(cls) -> "ZipArchiveBuilder":
+        """
+        Creates a builder using the `project.zip_compression`, `project.zip_compresslevel`
+        and `project.zip_workers` settings from the config file, if present.
+        """
+        settings = ConfigReader.project_settings()
+        return cls(
+            settings.get("zip_compression", DEFAULT_COMPRESSION),
+            settings.get("zip_compresslevel", DEFAULT_COMPRESSLEVEL),
+            settings.get("zip_workers"),
+        )
+
+    def build(self, target: str, files: Dict[str, str]):
+        """
+        Writes `files`, a mapping of archive name to local path, to the `target` zip.
+        """
+        # The offsets in a manifest from an earlier `update` don't describe the new archive
+        manifest_path = f"{target}.manifest.json"
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+        arcnames = sorted(files)
+        total_size = sum(os.path.getsize(files[a]) for a in arcnames)
+        # lzma entries need zipfile's private header format and very large archives
+        # need zip64, so both of those are left to the (serial) zipfile module.
+        if self.compression == "lzma" or len(arcnames) > ZIP_MAX_ENTRIES or total_size > ZIP_MAX_SIZE:
+            self._build_serial(target, arcnames, files)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            members = executor.map(lambda a: self.compress(a, files[a]), arcnames)
+            with open(target, "wb") as f:
+                write_zip(f, members)
+
+    def update(self, target: str, files: Dict[str, str]) -> UpdateStats:
+        """
+        Like `build`, but reuses the compressed bytes of files that haven't changed
+        since `target` was last built. A file is unchanged if its size and mtime
+        match the manifest, or failing that, if its contents hash the same.
+
+        The result is byte-identical to a full `build`.
+        """
+        manifest_path = f"{target}.manifest.json"
+        stats = UpdateStats()
+        arcnames = sorted(files)
+        total_size = sum(os.path.getsize(files[a]) for a in arcnames)
+        if self.compression == "lzma" or len(arcnames) > ZIP_MAX_ENTRIES or total_size > ZIP_MAX_SIZE:
+            self.build(target, files)
+            stats.compressed = len(arcnames)
+            return stats
+
+        previous = self._load_manifest(manifest_path, target)
+        stats.removed = len(set(previous) - set(a.replace(os.sep, "/") for a in arcnames))
+        old_zip = open(target, "rb") if previous else None
+        old_zip_lock = threading.Lock()
+
+        def member(arcname: str) -> ZipMember:
+            path = files[arcname]
+            st = os.stat(path)
+            entry = previous.get(arcname.replace(os.sep, "/"))
+            if entry and entry["size"] == st.st_size:
+                sha256 = None if entry["mtime_ns"] == st.st_mtime_ns else file_sha256(path)
+                if sha256 is None or sha256 == entry["sha256"]:
+                    try:
+                        with old_zip_lock:
+                            m = read_member(old_zip, entry, arcname.replace(os.sep, "/"))  # type: ignore
+                    except (ValueError, struct.error):
+                        # The archive doesn't match its manifest, so compress this file again
+                        pass
+                    else:
+                        m.sha256 = entry["sha256"]
+                        m.reused = True
+                        m.stat = st
+                        return m
+            m = self.compress(arcname, path)
+            m.stat = st
+            return m
+
+        tmp_target = f"{target}.tmp"
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                with open(tmp_target, "wb") as f:
+                    entries = write_zip(f, executor.map(member, arcnames))
+        finally:
+            if old_zip:
+                old_zip.close()
+        os.replace(tmp_target, target)
+
+        new_manifest = {}
+        for entry in entries:
+            if entry.pop("reused"):
+                stats.reused += 1
+            else:
+                stats.compressed += 1
+            new_manifest[entry.pop("arcname")] = entry
+
+        with open(manifest_path, "w") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "compression": self.compression,
+                    "compresslevel": self.compresslevel,
+                    "archive_size": os.path.getsize(target),
+                    "files": new_manifest,
+                },
+                f,
+            )
+        return stats
+
+    def compress(self, arcname: str, path: str) -> ZipMember:
+        with open(path, "rb") as f:
+            data = f.read()
+        sha256 = hashlib.sha256(data).hexdigest()
+        crc = zlib.crc32(data)
+        size = len(data)
+        if self.compression == "deflated":
+            level = -1 if self.compresslevel is None else self.compresslevel
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+            data = compressor.compress(data) + compressor.flush()
+        elif self.compression == "bzip2":
+            data = bz2.compress(data, 9 if self.compresslevel is None else self.compresslevel)
+        return ZipMember(arcname.replace(os.sep, "/"), self.compress_type, crc, size, data, sha256)
+
+    def _load_manifest(self, manifest_path: str, target: str) -> Dict[str, dict]:
+        """
+        Returns the per-file manifest entries for `target`, or an empty dict if
+        there's no usable manifest and the archive has to be built from scratch.
+        """
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            archive_size = os.path.getsize(target)
+        except (OSError, ValueError):
+            return {}
+        if (
+            manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("compression") != self.compression
+            or manifest.get("compresslevel") != self.compresslevel
+            or manifest.get("archive_size") != archive_size
+        ):
+            return {}
+        return manifest.get("files", {})
+
+    def _build_serial(self, target: str, arcnames: List[str], files: Dict[str, str]):
+        with zipfile.ZipFile(target, "w", allowZip64=True) as zf:
+            for arcname in arcnames:
+                with open(files[arcname], "rb") as f:
+                    data = f.read()
+                zf.writestr(
+                    self.zip_info(arcname),
+                    data,
+                    compress_type=self.compress_type,
+                    compresslevel=self.compresslevel,
+                )
+
+    def zip_info(self, arcname: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(arcname.replace(os.sep, "/"), date_time=FIXED_DATE_TIME)
+        info.create_system = UNIX_SYSTEM
+        info.external_attr = (0o100000 | FILE_MODE) << 16
+        info.compress_type = self.compress_type
+        return info
+
+
+def write_zip(f: BinaryIO, members: Iterable[ZipMember]) -> List[dict]:
+    """
+    Writes already-compressed members, in order, as a complete zip archive.
+
+    Returns a manifest entry for each member, recording where its compressed
+    data lives in the archive so it can be reused by `read_member`.
+    """
+    dos_time = (FIXED_DATE_TIME[3] << 11) | (FIXED_DATE_TIME[4] << 5) | (FIXED_DATE_TIME[5] // 2)
+    dos_date = ((FIXED_DATE_TIME[0] - 1980) << 9) | (FIXED_DATE_TIME[1] << 5) | FIXED_DATE_TIME[2]
+    external_attr = (0o100000 | FILE_MODE) << 16
+
+    central_dir = []
+    entries = []
+    offset = 0
+    for m in members:
+        name = m.arcname.encode("utf-8")
+        flags = 0 if name.isascii() else UTF8_FLAG
+        version = zipfile.BZIP2_VERSION if m.compress_type == zipfile.ZIP_BZIP2 else zipfile.DEFAULT_VERSION
+        fields = (m.compress_type, dos_time, dos_date, m.crc, len(m.data), m.file_size, len(name))
+
+        f.write(LOCAL_HEADER.pack(LOCAL_HEADER_SIGNATURE, version, flags, *fields, 0))
+        f.write(name)
+        f.write(m.data)
+
+        central_dir.append(
+            CENTRAL_HEADER.pack(
+                CENTRAL_HEADER_SIGNATURE,
+                (UNIX_SYSTEM << 8) | version,
+                version,
+                flags,
+                *fields,
+                0,  # extra field length
+                0,  # comment length
+                0,  # disk number
+                0,  # internal attributes
+                external_attr,
+                offset,
+            )
+            + name
+        )
+        entries.append(
+            {
+                "arcname": m.arcname,
+                "offset": offset,
+                "compress_type": m.compress_type,
+                "compress_size": len(m.data),
+                "crc": m.crc,
+                "size": m.file_size,
+                "mtime_ns": m.stat.st_mtime_ns if m.stat else None,
+                "sha256": m.sha256,
+                "reused": m.reused,
+            }
+        )
+        offset += LOCAL_HEADER.size + len(name) + len(m.data)
+
+    central_dir_size = sum(len(entry) for entry in central_dir)
+    for entry in central_dir:
+        f.write(entry)
+    f.write(
+        END_OF_CENTRAL_DIR.pack(
+            END_OF_CENTRAL_DIR_SIGNATURE, 0, 0, len(central_dir), len(central_dir), central_dir_size, offset, 0
+        )
+    )
+    return entries
+
+
+def read_member(f: BinaryIO, entry: dict, arcname: str) -> ZipMember:
+    """
+    Reads the compressed data of `arcname`, described by a `write_zip` manifest entry.
+
+    Raises ValueError if the local header at the entry's offset isn't that member's,
+    e.g. because the archive was rebuilt without updating the manifest.
+    """
+    f.seek(entry["offset"])
+    header = LOCAL_HEADER.unpack(f.read(LOCAL_HEADER.size))
+    if header[0] != LOCAL_HEADER_SIGNATURE:
+        raise ValueError(f"No zip entry at offset {entry['offset']}")
+    compress_type, crc, compress_size, file_size = header[3], header[6], header[7], header[8]
+    name_length, extra_length = header[-2:]
+    name = f.read(name_length).decode("utf-8", errors="replace")
+    if (name, compress_type, crc, compress_size, file_size) != (
+        arcname,
+        entry["compress_type"],
+        entry["crc"],
+        entry["compress_size"],
+        entry["size"],
+    ):
+        raise ValueError(f"Zip entry at offset {entry['offset']} isn't {arcname}")
+    f.seek(extra_length, os.SEEK_CUR)
+    data = f.read(entry["compress_size"])
+    if len(data) != entry["compress_size"]:
+        raise ValueError(f"Zip entry {arcname} is truncated")
+    return ZipMember(name, entry["compress_type"], entry["crc"], entry["size"], data, entry["sha256"])
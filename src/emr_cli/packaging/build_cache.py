@@ -0,0 +1,195 @@
+import hashlib
+import os
+import posixpath
+import re
+from typing import List, Optional, Pattern, Tuple
+
+from emr_cli.deployments.emr_serverless import DeploymentPackage
+from emr_cli.utils import file_sha256
+
+# Directories in the build context that builds write to, rather than read from
+BUILD_OUTPUT_DIRS = [".git", ".emr"]
+
+
+class BuildCache:
+    """
+    A content-addressed record of the inputs used to produce a build artifact.
+
+    The SHA-256 of all input files is stored next to the artifact. If the
+    artifact exists and the inputs still hash to the same value, the build
+    can be skipped.
+    """
+
+    def __init__(self, artifact_path: str, input_files: List[str], salt: str = "") -> None:
+        self.artifact_path = artifact_path
+        self.record_path = f"{artifact_path}.inputs.sha256"
+        self.input_files = sorted(set(input_files))
+        self.salt = salt
+        self._digest: Optional[str] = None
+
+    def digest(self) -> str:
+        if self._digest is None:
+            h = hashlib.sha256(self.salt.encode())
+            for path in self.input_files:
+                h.update(b"\0" + _input_name(path).encode() + b"\0")
+                h.update(file_sha256(path).encode())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def short_digest(self) -> str:
+        return self.digest()[:12]
+
+    def is_fresh(self) -> bool:
+        """
+        Returns True if the artifact exists and was built from the current inputs.
+        """
+        if not os.path.isfile(self.artifact_path) or not os.path.isfile(self.record_path):
+            return False
+        with open(self.record_path) as f:
+            return f.read().strip() == self.digest()
+
+    def record(self):
+        """
+        Records the current input hash. Call this only after a successful build,
+        with the digest computed from the inputs as they were before the build.
+        """
+        with open(self.record_path, "w") as f:
+            f.write(self.digest() + "\n")
+
+
+def docker_build_cache(package: DeploymentPackage, target: str, dockerfile: str) -> BuildCache:
+    """
+    Returns the build cache for a Docker-built `pyspark_deps.tar.gz`. Inputs are the
+    Dockerfile and every file in the Docker build context, so data files packaged by
+    `pip install .` count as well as `.py` files.
+    """
+    inputs = [dockerfile] + build_context_files(package)
+    return BuildCache(package.deps_archive_path(), inputs, salt=target)
+
+
+def local_build_cache(package: DeploymentPackage, python_version: str) -> BuildCache:
+    """
+    Like `docker_build_cache`, but for `--local-build`. The target Python version is
+    part of the hash, and a local build never reuses an archive built by Docker.
+    """
+    return BuildCache(package.deps_archive_path(), build_context_files(package), salt=f"local-{python_version}")
+
+
+def build_context_files(package: DeploymentPackage, root: str = ".") -> List[str]:
+    """
+    Returns the files Docker sends as the build context: everything under `root` that
+    `.dockerignore` doesn't exclude. Build outputs, like `dist/` and the Docker layer
+    cache, are left out so that building doesn't change the inputs.
+    """
+    rules = dockerignore_rules(os.path.join(root, ".dockerignore"))
+    skip_dirs = {posixpath.normpath(d) for d in BUILD_OUTPUT_DIRS + [package.dist_dir]}
+    if package.docker_cache_dir:
+        cache_dir = os.path.relpath(os.path.abspath(package.docker_cache_dir), os.path.abspath(root))
+        skip_dirs.add(cache_dir.replace(os.sep, "/"))
+    has_exceptions = any(not exclude for _, exclude in rules)
+
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        reldir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        prefix = "" if reldir == "." else f"{reldir}/"
+        kept = []
+        for name in sorted(dirnames):
+            path = prefix + name
+            # Without exceptions, nothing under an ignored directory can be in the context
+            if path in skip_dirs or (not has_exceptions and is_ignored(path, rules)):
+                continue
+            kept.append(name)
+        dirnames[:] = kept
+        for name in sorted(filenames):
+            path = prefix + name
+            if not is_ignored(path, rules):
+                files.append(os.path.join(dirpath, name))
+    return files
+
+
+def dockerignore_rules(path: str) -> List[Tuple[Pattern, bool]]:
+    """
+    Parses a `.dockerignore` file into (pattern, exclude) pairs, in file order.
+    Patterns follow https://docs.docker.com/build/building/context/#dockerignore-files
+    """
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+
+    rules = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        exclude = not line.startswith("!")
+        pattern = posixpath.normpath(line.lstrip("!").strip().strip("/"))
+        if pattern == ".":
+            continue
+        rules.append((re.compile(_glob_to_regex(pattern)), exclude))
+    return rules
+
+
+def is_ignored(path: str, rules: List[Tuple[Pattern, bool]]) -> bool:
+    """
+    Whether `path`, relative to the context root, is ignored. A pattern matches a path
+    or any of its parent directories, and the last matching pattern wins.
+    """
+    parts = path.split("/")
+    candidates = ["/".join(parts[: i + 1]) for i in range(len(parts))]
+    ignored = False
+    for pattern, exclude in rules:
+        if any(pattern.fullmatch(candidate) for candidate in candidates):
+            ignored = exclude
+    return ignored
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """
+    Translates a Go `filepath.Match` pattern, plus Docker's `**`, to a regex.
+    """
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**", i):
+            # `**/` matches any number of directories, including none
+            if pattern.startswith("**/", i):
+                regex += "(?:.*/)?"
+                i += 3
+            else:
+                regex += ".*"
+                i += 2
+            continue
+        if c == "*":
+            regex += "[^/]*"
+        elif c == "?":
+            regex += "[^/]"
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(c)
+            else:
+                # Go and Python both negate classes with `^`
+                regex += "[" + pattern[i + 1 : end] + "]"
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(c)
+        i += 1
+    return regex
+
+
+def _input_name(path: str) -> str:
+    """
+    Inputs are identified by their path relative to the project, so the hash
+    is the same no matter where the project is checked out.
+    """
+    relpath = os.path.relpath(os.path.abspath(path))
+    if relpath.startswith(os.pardir):
+        # e.g. the Dockerfile bundled with emr-cli
+        return os.path.basename(path)
+    return relpath.replace(os.sep, "/")
@@ -1,12 +1,11 @@
-import os
 from typing import Optional
 from emr_cli.deployments.emr_serverless import DeploymentPackage
 
 from emr_cli.packaging.python_files_project import PythonFilesProject
 from emr_cli.packaging.python_poetry_project import PythonPoetryProject
 from emr_cli.packaging.python_project import PythonProject
+from emr_cli.packaging.scanner import ProjectScanner
 from emr_cli.packaging.simple_project import SimpleProject
-from emr_cli.utils import find_files
 
 
 class ProjectDetector:
@@ -30,21 +29,22 @@ class ProjectDetector:
                 raise ValueError(f"Unknown project type {project_type}")
             return self.PROJECT_TYPE_MAPPINGS.get(project_type) # type: ignore
 
+        # Walk the project once, stopping as soon as we find a poetry.lock
+        scan = ProjectScanner().scan(stop_early=True)
+
         # We default to a single file project - if the user has just a .py or .jar
         project = SimpleProject
 
         # If there are multiple .py files, we escalate to a PythonProject
-        if len(find_files(os.getcwd(), [".venv"], ".py")) > 1:
+        if len(scan.py_files) > 1:
             project = PythonFilesProject
 
         # If we have a pyproject.toml or setup.py, we have a python project
-        if find_files(os.getcwd(), [".venv"], "pyproject.toml") or find_files(
-            os.getcwd(), [".venv"], "setup.py"
-        ):
+        if scan.has("pyproject.toml") or scan.has("setup.py"):
             project = PythonProject
 
         # If we have a poetry.lock, it's a poetry project
-        if find_files(os.getcwd(), [".venv"], "poetry.lock"):
+        if scan.has("poetry.lock"):
             project = PythonPoetryProject
 
         return project
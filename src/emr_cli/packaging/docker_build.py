@@ -0,0 +1,58 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import List, Optional
+
+
+def docker_build_command(
+    target: str,
+    output_dir: str,
+    dockerfile: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    new_cache_dir: Optional[str] = None,
+) -> List[str]:
+    """
+    Returns the command that builds `target` and exports its files to `output_dir`.
+
+    With a `cache_dir`, the build goes through buildx so layers are read from that
+    directory, e.g. one that CI runners save and restore between jobs, and written to
+    `new_cache_dir`. `run_docker_build` swaps the new cache in, because buildx never
+    prunes a local cache it exports to.
+    """
+    if cache_dir is None:
+        cmd = ["docker", "build"]
+    else:
+        cmd = ["docker", "buildx", "build"]
+        if os.path.isfile(os.path.join(cache_dir, "index.json")):
+            cmd += ["--cache-from", f"type=local,src={cache_dir}"]
+        cmd += ["--cache-to", f"type=local,dest={new_cache_dir or cache_dir},mode=max"]
+    cmd += ["--target", target, "--output", output_dir]
+    if dockerfile is not None:
+        cmd += ["--file", dockerfile]
+    return cmd + ["."]
+
+
+def run_docker_build(target: str, output_dir: str, dockerfile: Optional[str] = None, cache_dir: Optional[str] = None):
+    new_cache_dir = None
+    if cache_dir is not None:
+        # Next to the cache rather than in it, however the path is spelled
+        cache_dir = os.path.abspath(cache_dir)
+        parent, name = os.path.split(cache_dir)
+        os.makedirs(parent, exist_ok=True)
+        new_cache_dir = tempfile.mkdtemp(prefix=f"{name}-new-", dir=parent)
+
+    try:
+        subprocess.run(
+            docker_build_command(target, output_dir, dockerfile, cache_dir, new_cache_dir),
+            check=True,
+            env=dict(os.environ, DOCKER_BUILDKIT="1"),
+        )
+    except BaseException:
+        if new_cache_dir is not None:
+            shutil.rmtree(new_cache_dir, ignore_errors=True)
+        raise
+
+    if cache_dir is not None and new_cache_dir is not None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(new_cache_dir, cache_dir)
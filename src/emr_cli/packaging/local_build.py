@@ -0,0 +1,154 @@
+"""
+Docker-free builds of `pyspark_deps.tar.gz`.
+
+Dependencies are installed by pip from wheels built for EMR (manylinux x86_64 and EMR's
+Python version), whatever the local OS and Python are. They're packed in the same
+layout as venv-pack, with `bin/python` pointing at EMR's `/usr/bin/python3`, so the
+archive works with `spark.archives=...#environment` and `./environment/bin/python`.
+
+Downloaded wheels are kept in a pip cache shared by every project, so a build with a
+warm cache doesn't download anything.
+"""
+import glob
+import gzip
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from typing import Callable, List, Optional
+
+from emr_cli.utils import console_log, mkdir, user_cache_dir
+
+# EMR 6.x runs Python 3.7, EMR 7.x runs Python 3.9
+DEFAULT_EMR_PYTHON_VERSION = "3.7"
+
+# Amazon Linux 2 has glibc 2.26. pip also accepts manylinux2010/manylinux1 and pure Python wheels.
+EMR_PLATFORMS = ["manylinux2014_x86_64", "manylinux_2_24_x86_64", "manylinux_2_26_x86_64"]
+
+# The interpreter every EMR deployment type provides
+EMR_PYTHON_PATH = "/usr/bin/python3"
+
+# PEP 610 metadata recording where a package was installed from
+DIRECT_URL_FILE = "direct_url.json"
+
+
+def wheel_cache_dir() -> str:
+    return os.path.join(user_cache_dir(), "pip")
+
+
+class LocalBuilder:
+    """
+    Builds a dependency archive for EMR with pip, without Docker.
+    """
+
+    def __init__(
+        self,
+        python_version: Optional[str] = None,
+        platforms: Optional[List[str]] = None,
+        cache_dir: Optional[str] = None,
+        run: Callable[..., subprocess.CompletedProcess] = subprocess.run,
+    ) -> None:
+        self.python_version = python_version or DEFAULT_EMR_PYTHON_VERSION
+        self.platforms = platforms or EMR_PLATFORMS
+        self.cache_dir = cache_dir or wheel_cache_dir()
+        self._run = run
+
+    def build(self, output_path: str, requirements_file: Optional[str] = None):
+        """
+        Builds the project in the current directory into a wheel, installs it and its
+        dependencies (pinned by `requirements_file`, if given) and packs them into `output_path`.
+        """
+        with tempfile.TemporaryDirectory(prefix="emr-cli-build-") as tmp:
+            wheel_dir = os.path.join(tmp, "wheels")
+            site_packages = os.path.join(tmp, "site-packages")
+
+            # The project itself is built for the local platform, which is fine for pure Python code
+            self._pip("wheel", ".", "--no-deps", "--wheel-dir", wheel_dir)
+            project_wheels = sorted(glob.glob(os.path.join(wheel_dir, "*.whl")))
+
+            args = ["install", "--target", site_packages, "--only-binary=:all:"]
+            args += ["--implementation", "cp", "--python-version", self.python_version]
+            for platform in self.platforms:
+                args += ["--platform", platform]
+            if requirements_file:
+                args += ["--requirement", requirements_file]
+            self._pip(*args, *project_wheels)
+
+            mkdir(os.path.dirname(output_path) or ".")
+            pack_venv(site_packages, output_path, self.python_version)
+
+    def _pip(self, *args: str):
+        cmd = [sys.executable, "-m", "pip", *args, "--cache-dir", self.cache_dir, "--disable-pip-version-check"]
+        try:
+            self._run(cmd, check=True)
+        except subprocess.CalledProcessError:
+            console_log(
+                f"ERR: pip failed. --local-build needs every dependency to have a wheel for Linux x86_64 "
+                f"and Python {self.python_version}, otherwise build without --local-build to use Docker."
+            )
+            sys.exit(1)
+
+
+def pack_venv(site_packages: str, output_path: str, python_version: str = DEFAULT_EMR_PYTHON_VERSION):
+    """
+    Packs `site_packages` into a relocatable venv archive at `output_path`.
+
+    Entries are sorted and their timestamps and owners cleared, so the same dependencies
+    always produce the same bytes and content-addressed uploads can be skipped. For the
+    same reason, the `direct_url.json` pip writes for packages installed from a local
+    wheel is left out, along with its line in `RECORD`: it names the temporary build
+    directory the wheel was in.
+    """
+
+    def normalize(info: tarfile.TarInfo) -> tarfile.TarInfo:
+        info.mtime = 0
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    def add_bytes(tar: tarfile.TarFile, name: str, data: bytes):
+        info = normalize(tarfile.TarInfo(name))
+        info.size = len(data)
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+
+    def add_symlink(tar: tarfile.TarFile, name: str, target: str):
+        info = normalize(tarfile.TarInfo(name))
+        info.type = tarfile.SYMTYPE
+        info.linkname = target
+        info.mode = 0o777
+        tar.addfile(info)
+
+    lib_dir = f"lib/python{python_version}/site-packages"
+    pyvenv_cfg = (
+        f"home = {os.path.dirname(EMR_PYTHON_PATH)}\n"
+        "include-system-site-packages = false\n"
+        f"version = {python_version}\n"
+    )
+    with open(output_path, "wb") as raw, gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            add_bytes(tar, "pyvenv.cfg", pyvenv_cfg.encode())
+            add_symlink(tar, "bin/python", EMR_PYTHON_PATH)
+            add_symlink(tar, "bin/python3", "python")
+            add_symlink(tar, f"bin/python{python_version}", "python")
+            for root, dirs, files in os.walk(site_packages):
+                dirs.sort()
+                dist_info = root.endswith(".dist-info")
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    if name.endswith(".pyc") or (dist_info and name == DIRECT_URL_FILE):
+                        continue
+                    arcname = os.path.join(lib_dir, os.path.relpath(path, site_packages)).replace(os.sep, "/")
+                    if dist_info and name == "RECORD":
+                        add_bytes(tar, arcname, _without_direct_url(path))
+                    else:
+                        tar.add(path, arcname=arcname, recursive=False, filter=normalize)
+
+
+def _without_direct_url(record_path: str) -> bytes:
+    with open(record_path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    suffix = f".dist-info/{DIRECT_URL_FILE},".encode()
+    return b"".join(line for line in lines if suffix not in line)
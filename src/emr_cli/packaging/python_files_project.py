@@ -1,16 +1,13 @@
 import os
-import zipfile
+from typing import TYPE_CHECKING, Dict, Optional
 
-import boto3
+from emr_cli import clients
 from emr_cli.deployments import SparkParams
 from emr_cli.deployments.emr_serverless import DeploymentPackage
-from emr_cli.utils import (
-    PrettyUploader,
-    console_log,
-    find_files,
-    mkdir,
-    parse_bucket_uri,
-)
+from emr_cli.utils import PrettyUploader, console_log, parse_bucket_uri
+
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
 
 
 class PythonFilesProject(DeploymentPackage):
@@ -21,24 +18,17 @@ class PythonFilesProject(DeploymentPackage):
     additional packaging. The files in the project are simply zipped up.
     """
 
-    def build(self):
+    def build(self, force: bool = False):
         """
         Zip all the files except for the entrypoint file.
         """
-        py_files = find_files(os.getcwd(), [".venv"], ".py")
-        py_files.remove(os.path.abspath(self.entry_point_path))
-        cwd = os.getcwd()
-        mkdir(self.dist_dir)
-        with zipfile.ZipFile(f"{self.dist_dir}/pyfiles.zip", "w") as zf:
-            for file in py_files:
-                relpath = os.path.relpath(file, cwd)
-                zf.write(file, relpath)
+        self._zip_local_pyfiles(force)
 
-    def deploy(self, s3_code_uri: str) -> str:
+    def deploy(self, s3_code_uri: str, transfer_config: Optional["TransferConfig"] = None) -> str:
         """
         Copies local code to S3 and returns the path to the uploaded entrypoint
         """
-        s3_client = boto3.client("s3")
+        s3_client = clients.client("s3")
         bucket, prefix = parse_bucket_uri(s3_code_uri)
         filename = os.path.basename(self.entry_point_path)
 
@@ -47,17 +37,16 @@ class PythonFilesProject(DeploymentPackage):
         uploader = PrettyUploader(
             s3_client,
             bucket,
-            {
-                self.entry_point_path: os.path.join(prefix, filename),
-                os.path.join(self.dist_dir, "pyfiles.zip"): os.path.join(
-                    prefix, "pyfiles.zip"
-                ),
-            },
+            {**self.source_artifacts(prefix), **self.build_artifacts(prefix)},
+            transfer_config=transfer_config,
         )
         uploader.run()
 
         return f"s3://{bucket}/{prefix}/{filename}"
 
+    def build_artifacts(self, prefix: str) -> Dict[str, str]:
+        return {os.path.join(self.dist_dir, "pyfiles.zip"): os.path.join(prefix, "pyfiles.zip")}
+
     def spark_submit_parameters(self) -> SparkParams:
         zip_path = os.path.join(self.s3_uri_base, "pyfiles.zip")
         return SparkParams(
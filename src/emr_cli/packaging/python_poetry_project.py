@@ -1,14 +1,18 @@
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
 from urllib.parse import urlparse
 
-import boto3
-
+from emr_cli import clients
 from emr_cli.deployments import SparkParams
 from emr_cli.deployments.emr_serverless import DeploymentPackage
+from emr_cli.packaging.build_cache import docker_build_cache, local_build_cache
+from emr_cli.packaging.docker_build import run_docker_build
+from emr_cli.packaging.local_build import LocalBuilder
 from emr_cli.utils import (
     PrettyUploader,
     console_log,
@@ -16,6 +20,9 @@ from emr_cli.utils import (
     validate_build_target,
 )
 
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+
 
 class PythonPoetryProject(DeploymentPackage):
     def initialize(self, target_dir: str = os.getcwd()):
@@ -30,38 +37,57 @@ class PythonPoetryProject(DeploymentPackage):
         copy_template("poetry", target_dir)
         console_log("Project initialized.")
 
-    def build(self):
+    def build(self, force: bool = False):
         if not Path("poetry.lock").exists():
             print("Error: No poetry.lock present, please setup your poetry project.")
             sys.exit(1)
 
-        console_log(f"Packaging assets into {self.dist_dir}/")
-        # TODO: Add an option for --force-local-build
-        self._run_docker_build(self.dist_dir)
+        if self.local_build:
+            builder = LocalBuilder(self.python_version)
+            cache = local_build_cache(self, builder.python_version)
+        else:
+            cache = docker_build_cache(self, "export-poetry", self._dockerfile_path())
+        if not force and cache.is_fresh():
+            console_log(f"Build cache hit ({cache.short_digest()}), reusing {cache.artifact_path}")
+            return
+
+        reason = "forced" if force else "miss"
+        console_log(f"Build cache {reason} ({cache.short_digest()}), packaging assets into {self.dist_dir}/")
+        if self.local_build:
+            self._run_local_build(builder)
+        else:
+            self._run_docker_build(self.dist_dir)
+        cache.record()
+
+    def _run_local_build(self, builder: LocalBuilder):
+        """
+        Pins dependencies from poetry.lock with `poetry export` and installs them with pip.
+        """
+        if shutil.which("poetry") is None:
+            print("Error: --local-build needs poetry installed to read poetry.lock")
+            sys.exit(1)
 
-    def _run_local_build(self, output_dir: str = "dist"):
-        subprocess.run(
-            ["poetry", "bundle", "venv", "poeticemrbundle", "--without", "dev"],
-            check=True,
-        )
+        with tempfile.TemporaryDirectory(prefix="emr-cli-poetry-") as tmp:
+            requirements = os.path.join(tmp, "requirements.txt")
+            subprocess.run(
+                [
+                    "poetry",
+                    "export",
+                    "--format",
+                    "requirements.txt",
+                    "--without-hashes",
+                    "--without",
+                    "dev",
+                    "--output",
+                    requirements,
+                ],
+                check=True,
+            )
+            builder.build(self.deps_archive_path(), requirements)
 
     def _run_docker_build(self, output_dir: str):
         validate_build_target("export-poetry")
-        subprocess.run(
-            [
-                "docker",
-                "build",
-                "--target",
-                "export-poetry",
-                "--output",
-                output_dir,
-                "--file",
-                self._dockerfile_path(),
-                ".",
-            ],
-            check=True,
-            env=dict(os.environ, DOCKER_BUILDKIT="1"),
-        )
+        run_docker_build("export-poetry", output_dir, self._dockerfile_path(), self.docker_cache_dir)
 
     def _dockerfile_path(self) -> str:
         if Path("Dockerfile").is_file():
@@ -72,11 +98,12 @@ class PythonPoetryProject(DeploymentPackage):
         )
         return os.path.join(templates, "Dockerfile")
 
-    def deploy(self, s3_code_uri: str) -> str:
+    def deploy(self, s3_code_uri: str, transfer_config: Optional["TransferConfig"] = None) -> str:
         """
         Copies local code to S3 and returns the path to the uploaded entrypoint
         """
-        s3_client = boto3.client("s3")
+        self.s3_uri_base = s3_code_uri
+        s3_client = clients.client("s3")
         bucket, prefix = self._parse_bucket_uri(s3_code_uri)
         filename = os.path.basename(self.entry_point_path)
 
@@ -85,19 +112,19 @@ class PythonPoetryProject(DeploymentPackage):
         uploader = PrettyUploader(
             s3_client,
             bucket,
-            {
-                self.entry_point_path: os.path.join(prefix, filename),
-                os.path.join(self.dist_dir, "pyspark_deps.tar.gz"): os.path.join(
-                    prefix, "pyspark_deps.tar.gz"
-                ),
-            },
+            {**self.source_artifacts(prefix), **self.build_artifacts(prefix)},
+            transfer_config=transfer_config,
         )
         uploader.run()
 
         return f"s3://{bucket}/{prefix}/{filename}"
 
+    def build_artifacts(self, prefix: str) -> Dict[str, str]:
+        # Content-addressed archives live outside of the code prefix, so use a full URI
+        return {self.deps_archive_path(): self.deps_archive_uri()}
+
     def spark_submit_parameters(self) -> SparkParams:
-        tar_path = os.path.join(self.s3_uri_base, "pyspark_deps.tar.gz")
+        tar_path = self.deps_archive_uri()
         return SparkParams(
             common_params={
                 "spark.archives": f"{tar_path}#environment",
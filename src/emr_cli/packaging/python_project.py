@@ -1,13 +1,15 @@
 import os
-import subprocess
 import sys
 from pathlib import Path
 from shutil import copy
+from typing import TYPE_CHECKING, Dict, Optional
 
-import boto3
-
+from emr_cli import clients
 from emr_cli.deployments import SparkParams
 from emr_cli.deployments.emr_serverless import DeploymentPackage
+from emr_cli.packaging.build_cache import docker_build_cache, local_build_cache
+from emr_cli.packaging.docker_build import run_docker_build
+from emr_cli.packaging.local_build import LocalBuilder
 from emr_cli.utils import (
     PrettyUploader,
     console_log,
@@ -16,6 +18,9 @@ from emr_cli.utils import (
     validate_build_target,
 )
 
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+
 
 class PythonProject(DeploymentPackage):
     def initialize(self, target_dir: str = os.getcwd()):
@@ -39,11 +44,14 @@ class PythonProject(DeploymentPackage):
         target_path = Path(target_dir)
         copy(template_path, target_path)
 
-    def build(self):
+    def build(self, force: bool = False):
         """
-        For now, uses a pre-existing Docker file and setuptools
+        For now, uses a pre-existing Docker file and setuptools, or pip with `local_build`.
+
+        The build is skipped if none of its inputs have changed since the
+        last build, unless `force` is set.
         """
-        if not Path("Dockerfile").exists():
+        if not self.local_build and not Path("Dockerfile").exists():
             print(
                 "Error: No Dockerfile present, use 'emr-cli init --dockerfile' to generate one"  # noqa: E501
             )
@@ -52,31 +60,33 @@ class PythonProject(DeploymentPackage):
             print("Error: No pyproject.toml present, please set one up before building")
             sys.exit(1)
 
-        console_log(f"Packaging assets into {self.dist_dir}/")
-        self._run_docker_build(self.dist_dir)
+        if self.local_build:
+            builder = LocalBuilder(self.python_version)
+            cache = local_build_cache(self, builder.python_version)
+        else:
+            cache = docker_build_cache(self, "export-python", "Dockerfile")
+        if not force and cache.is_fresh():
+            console_log(f"Build cache hit ({cache.short_digest()}), reusing {cache.artifact_path}")
+            return
+
+        reason = "forced" if force else "miss"
+        console_log(f"Build cache {reason} ({cache.short_digest()}), packaging assets into {self.dist_dir}/")
+        if self.local_build:
+            builder.build(self.deps_archive_path())
+        else:
+            self._run_docker_build(self.dist_dir)
+        cache.record()
 
     def _run_docker_build(self, output_dir: str):
         validate_build_target("export-python")
-        subprocess.run(
-            [
-                "docker",
-                "build",
-                "--target",
-                "export-python",
-                "--output",
-                output_dir,
-                ".",
-            ],
-            check=True,
-            env=dict(os.environ, DOCKER_BUILDKIT="1"),
-        )
+        run_docker_build("export-python", output_dir, cache_dir=self.docker_cache_dir)
 
-    def deploy(self, s3_code_uri: str) -> str:
+    def deploy(self, s3_code_uri: str, transfer_config: Optional["TransferConfig"] = None) -> str:
         """
         Copies local code to S3 and returns the path to the uploaded entrypoint
         """
         self.s3_uri_base = s3_code_uri
-        s3_client = boto3.client("s3")
+        s3_client = clients.client("s3")
         bucket, prefix = parse_bucket_uri(self.s3_uri_base)
         filename = os.path.basename(self.entry_point_path)
 
@@ -85,19 +95,19 @@ class PythonProject(DeploymentPackage):
         uploader = PrettyUploader(
             s3_client,
             bucket,
-            {
-                self.entry_point_path: os.path.join(prefix, filename),
-                os.path.join(self.dist_dir, "pyspark_deps.tar.gz"): os.path.join(
-                    prefix, "pyspark_deps.tar.gz"
-                ),
-            },
+            {**self.source_artifacts(prefix), **self.build_artifacts(prefix)},
+            transfer_config=transfer_config,
         )
         uploader.run()
 
         return f"s3://{bucket}/{prefix}/{filename}"
 
+    def build_artifacts(self, prefix: str) -> Dict[str, str]:
+        # Content-addressed archives live outside of the code prefix, so use a full URI
+        return {self.deps_archive_path(): self.deps_archive_uri()}
+
     def spark_submit_parameters(self) -> SparkParams:
-        tar_path = os.path.join(self.s3_uri_base, "pyspark_deps.tar.gz")
+        tar_path = self.deps_archive_uri()
         return SparkParams(
             common_params={
                 "spark.archives": f"{tar_path}#environment",
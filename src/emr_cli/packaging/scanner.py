@@ -0,0 +1,262 @@
+import json
+import os
+from fnmatch import fnmatch
+from typing import Dict, Iterable, List, Optional, Set
+
+from emr_cli.config import DEFAULT_CONFIG_PATH, ConfigReader
+
+# Directories that never contain project sources but can be huge to walk
+DEFAULT_IGNORE = [
+    ".venv",
+    "venv",
+    ".git",
+    ".hg",
+    ".svn",
+    ".emr",
+    ".tox",
+    ".mypy_cache",
+    ".pytest_cache",
+    "__pycache__",
+    "node_modules",
+    "dist",
+    "target",
+]
+
+# Files whose presence determines the project type
+PROJECT_MARKERS = ["pyproject.toml", "setup.py", "poetry.lock"]
+
+# Scan results are cached here, relative to the project root
+DEFAULT_CACHE_DIR = os.path.join(".emr", "cache")
+SCAN_CACHE_FILE = "project-scan.json"
+SCAN_CACHE_VERSION = 1
+
+
+class ScanResult:
+    """
+    The result of a single walk of a project directory.
+
+    `py_files` are paths relative to `root`, in sorted order. If the scan stopped
+    early because the project type was already decided, `complete` is False and
+    `py_files` may only be a partial list.
+
+    `dir_mtimes` records the mtime of every directory that was walked. Adding,
+    removing or renaming a file changes the mtime of its directory, so these
+    are enough to tell whether the result is still valid without walking again.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        py_files: List[str],
+        markers: Set[str],
+        complete: bool,
+        dir_mtimes: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.root = root
+        self.py_files = py_files
+        self.markers = markers
+        self.complete = complete
+        self.dir_mtimes = dir_mtimes or {}
+
+    def has(self, marker: str) -> bool:
+        return marker in self.markers
+
+    def py_file_paths(self) -> List[str]:
+        """
+        Returns the absolute paths of all `.py` files in the project.
+        """
+        return [os.path.join(self.root, f) for f in self.py_files]
+
+
+class ProjectScanner:
+    """
+    Walks a project directory once, collecting `.py` files and project markers.
+
+    Directories matching the ignore list are pruned and never descended into.
+    The ignore list is made up of DEFAULT_IGNORE, the `project.ignore` list in
+    the emr-cli config file, and the patterns in the project's `.gitignore`.
+
+    Results are cached in `.emr/cache/` and reused for as long as none of the
+    walked directories have changed, so repeated invocations only need to stat
+    a handful of directories instead of walking the whole tree.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        ignore: Optional[List[str]] = None,
+        use_gitignore: bool = True,
+        use_cache: bool = True,
+    ) -> None:
+        self.root = os.path.abspath(root or os.getcwd())
+        if ignore is None:
+            ignore = DEFAULT_IGNORE + self._configured_ignores()
+        self.ignore = list(ignore)
+        if use_gitignore:
+            self.ignore += self._read_gitignore()
+        self.cache = ScanCache(self.root, self.ignore) if use_cache else None
+
+    def scan(self, stop_early: bool = False) -> ScanResult:
+        """
+        Walks the project directory. If `stop_early` is set, the walk stops as
+        soon as the project type can no longer change (a `poetry.lock` was found).
+        """
+        if self.cache:
+            cached = self.cache.load()
+            if cached is not None and (cached.complete or stop_early):
+                return cached
+
+        result = self._walk(stop_early)
+        if self.cache:
+            self.cache.save(result)
+        return result
+
+    def _walk(self, stop_early: bool) -> ScanResult:
+        py_files = []
+        markers = set()
+        dir_mtimes = {}
+        for dirpath, dirs, filenames in os.walk(self.root):
+            reldir = os.path.relpath(dirpath, self.root)
+            if reldir == os.curdir:
+                reldir = ""
+            dir_mtimes[reldir] = os.stat(dirpath).st_mtime_ns
+            dirs[:] = [d for d in dirs if not self.is_ignored(os.path.join(reldir, d), is_dir=True)]
+            for filename in filenames:
+                relpath = os.path.join(reldir, filename)
+                if self.is_ignored(relpath):
+                    continue
+                if filename.endswith(".py"):
+                    py_files.append(relpath)
+                if filename in PROJECT_MARKERS:
+                    markers.add(filename)
+
+            if stop_early and "poetry.lock" in markers:
+                return ScanResult(self.root, sorted(py_files), markers, False, dir_mtimes)
+
+        return ScanResult(self.root, sorted(py_files), markers, True, dir_mtimes)
+
+    def is_ignored(self, relpath: str, is_dir: bool = False) -> bool:
+        relpath = relpath.replace(os.sep, "/")
+        name = relpath.rsplit("/", 1)[-1]
+        for pattern in self.ignore:
+            if pattern.endswith("/"):
+                if not is_dir:
+                    continue
+                pattern = pattern.rstrip("/")
+            if "/" in pattern:
+                # Patterns containing a slash are relative to the project root
+                if fnmatch(relpath, pattern.lstrip("/")):
+                    return True
+            elif fnmatch(name, pattern):
+                return True
+        return False
+
+    def _configured_ignores(self) -> List[str]:
+        return list(ConfigReader.project_settings().get("ignore", []))
+
+    def _read_gitignore(self) -> List[str]:
+        """
+        Reads the patterns from the top-level .gitignore. Negated patterns are
+        not supported and are skipped, which can only cause us to include more files.
+        """
+        path = os.path.join(self.root, ".gitignore")
+        if not os.path.isfile(path):
+            return []
+        with open(path) as f:
+            return list(_parse_gitignore(f))
+
+
+class ScanCache:
+    """
+    Persists a ScanResult in the project's `.emr/cache/` directory.
+
+    A cached result is only used if it was produced with the same ignore rules
+    and every directory it walked still has the same mtime. The config file and
+    .gitignore are also fingerprinted since they feed into the ignore rules.
+    """
+
+    def __init__(self, root: str, ignore: List[str], cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self.root = root
+        self.ignore = ignore
+        self.cache_dir = os.path.join(root, cache_dir)
+        self.path = os.path.join(self.cache_dir, SCAN_CACHE_FILE)
+
+    def load(self) -> Optional[ScanResult]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != SCAN_CACHE_VERSION or data.get("root") != self.root:
+            return None
+        if data.get("ignore") != self.ignore or data.get("inputs") != self._input_mtimes():
+            return None
+
+        dir_mtimes = data.get("dirs", {})
+        for reldir, mtime in dir_mtimes.items():
+            try:
+                if os.stat(os.path.join(self.root, reldir)).st_mtime_ns != mtime:
+                    return None
+            except OSError:
+                return None
+
+        return ScanResult(
+            self.root,
+            data.get("py_files", []),
+            set(data.get("markers", [])),
+            data.get("complete", False),
+            dir_mtimes,
+        )
+
+    def save(self, result: ScanResult):
+        dir_mtimes = dict(result.dir_mtimes)
+        try:
+            created_emr_dir = not os.path.isdir(os.path.dirname(self.cache_dir))
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Creating .emr/ is the one change to the project root we're responsible for
+            if created_emr_dir and "" in dir_mtimes:
+                dir_mtimes[""] = os.stat(self.root).st_mtime_ns
+
+            # Keep cache files out of version control, the same way pytest does
+            gitignore = os.path.join(self.cache_dir, ".gitignore")
+            if not os.path.exists(gitignore):
+                with open(gitignore, "w") as f:
+                    f.write("# Created by emr-cli automatically.\n*\n")
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(
+                    {
+                        "version": SCAN_CACHE_VERSION,
+                        "root": self.root,
+                        "ignore": self.ignore,
+                        "inputs": self._input_mtimes(),
+                        "dirs": dir_mtimes,
+                        "py_files": result.py_files,
+                        "markers": sorted(result.markers),
+                        "complete": result.complete,
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The cache is an optimization, a read-only checkout shouldn't break anything
+            pass
+
+    def _input_mtimes(self) -> Dict[str, Optional[int]]:
+        mtimes = {}
+        for name in [".gitignore", DEFAULT_CONFIG_PATH]:
+            try:
+                mtimes[name] = os.stat(os.path.join(self.root, name)).st_mtime_ns
+            except OSError:
+                mtimes[name] = None
+        return mtimes
+
+
+def _parse_gitignore(lines: Iterable[str]) -> Iterable[str]:
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or line.startswith("!"):
+            continue
+        yield line
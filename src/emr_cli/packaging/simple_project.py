@@ -1,10 +1,13 @@
 import os
+from typing import TYPE_CHECKING, Optional
 
-import boto3
-
+from emr_cli import clients
 from emr_cli.deployments.emr_serverless import DeploymentPackage
 from emr_cli.utils import PrettyUploader, console_log, parse_bucket_uri
 
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+
 
 class SimpleProject(DeploymentPackage):
     """
@@ -12,14 +15,14 @@ class SimpleProject(DeploymentPackage):
     This can be a pyspark file or packaged jar file.
     """
 
-    def build(self):
+    def build(self, force: bool = False):
         pass
 
-    def deploy(self, s3_code_uri: str) -> str:
+    def deploy(self, s3_code_uri: str, transfer_config: Optional["TransferConfig"] = None) -> str:
         """
         Copies local code to S3 and returns the path to the uploaded entrypoint
         """
-        s3_client = boto3.client("s3")
+        s3_client = clients.client("s3")
         bucket, prefix = parse_bucket_uri(s3_code_uri)
         filename = os.path.basename(self.entry_point_path)
 
@@ -27,9 +30,8 @@ class SimpleProject(DeploymentPackage):
         uploader = PrettyUploader(
             s3_client,
             bucket,
-            {
-                self.entry_point_path: os.path.join(prefix, filename),
-            },
+            {**self.source_artifacts(prefix), **self.build_artifacts(prefix)},
+            transfer_config=transfer_config,
         )
         uploader.run()
 
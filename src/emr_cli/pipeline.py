@@ -0,0 +1,55 @@
+"""
+Pipelined `emr run --build`: build, upload and get ready to submit at the same time.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from emr_cli import clients
+from emr_cli.deployments.emr_serverless import DeploymentPackage
+from emr_cli.utils import PrettyUploader, StageTimer, console_log, parse_bucket_uri
+
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+
+
+def run_pipelined(
+    package: DeploymentPackage,
+    s3_code_uri: str,
+    readiness_checks: Dict[str, Callable[[], Any]],
+    force_build: bool = False,
+    transfer_config: Optional["TransferConfig"] = None,
+) -> StageTimer:
+    """
+    Builds and deploys `package` while running `readiness_checks` for the target backend.
+
+    Source artifacts like the entrypoint are uploaded while the build runs, and build
+    artifacts are uploaded as soon as the build finishes. Returns once everything needed
+    to submit the job is in place, and raises the first error from any stage.
+    """
+    bucket, prefix = parse_bucket_uri(s3_code_uri)
+    package.s3_uri_base = s3_code_uri
+    timer = StageTimer()
+
+    def upload(artifacts: Dict[str, str]):
+        PrettyUploader(
+            clients.client("s3"), bucket, artifacts, transfer_config=transfer_config, show_progress=False
+        ).run()
+
+    def build_and_upload():
+        timer.time("build", package.build, force_build)
+        timer.time("upload build artifacts", lambda: upload(package.build_artifacts(prefix)), after="build")
+
+    stages = [
+        lambda: timer.time("upload sources", upload, package.source_artifacts(prefix)),
+        build_and_upload,
+    ]
+    stages += [lambda name=name, check=check: timer.time(name, check) for name, check in readiness_checks.items()]
+
+    console_log(f"Building and deploying to {s3_code_uri} in parallel with {len(readiness_checks)} readiness checks")
+    with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+        futures = [executor.submit(stage) for stage in stages]
+        for future in futures:
+            future.result()
+
+    timer.report("Pipeline timing", "Ready to submit")
+    return timer
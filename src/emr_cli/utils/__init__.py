@@ -1,19 +1,33 @@
+import codecs
 import gzip
+import hashlib
 import os
 import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from shutil import copyfile, copytree, ignore_patterns
-from typing import TYPE_CHECKING, Dict, List
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
-from rich.progress import Progress, TotalFileSizeColumn
-
 if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
     from mypy_boto3_s3 import S3Client
 else:
     S3Client = object
 
+MiB = 1024 * 1024
+
+# S3 object metadata key holding the SHA-256 of uploaded artifacts
+HASH_METADATA_KEY = "sha256"
+
+# Logs are decompressed this many bytes at a time
+LOG_CHUNK_SIZE = 64 * 1024
+MAX_LOG_LINE = 1024 * 1024
+
 
 def console_log(message):
     print(f"[emr-cli]: {message}")
@@ -29,11 +43,30 @@ def find_files(directory, excluded_dirs=[], search=None) -> List[str]:
     return files
 
 
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Returns the hex SHA-256 of a file without reading it into memory all at once.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 def parse_bucket_uri(uri: str) -> List[str]:
     result = urlparse(uri, allow_fragments=False)
     return [result.netloc, result.path.strip("/")]
 
 
+def user_cache_dir() -> str:
+    """
+    Returns the per-user cache directory for emr-cli, following the XDG base directory spec.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "emr-cli")
+
+
 def mkdir(path: str):
     try:
         os.mkdir(path)
@@ -97,26 +130,111 @@ def validate_build_target(name: str) -> bool:
     return False
 
 
+def iter_gz_text(fileobj: IO[bytes], chunk_size: int = LOG_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Decompresses a gzip stream incrementally and yields its text in blocks of whole lines.
+
+    Only one chunk and the current partial line are held in memory. UTF-8 sequences that
+    span chunks are decoded correctly, and lines longer than `MAX_LOG_LINE` are yielded in
+    pieces so that a log without newlines can't grow memory use either.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    partial = ""
+    with gzip.open(fileobj) as data:
+        for chunk in iter(lambda: data.read(chunk_size), b""):
+            text = partial + decoder.decode(chunk)
+            end = text.rfind("\n") + 1
+            if end:
+                yield text[:end]
+            partial = text[end:]
+            while len(partial) > MAX_LOG_LINE:
+                yield partial[:MAX_LOG_LINE]
+                partial = partial[MAX_LOG_LINE:]
+    partial += decoder.decode(b"", final=True)
+    if partial:
+        yield partial
+
+
+def iter_gz_lines(fileobj: IO[bytes], chunk_size: int = LOG_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Like `iter_gz_text`, but yields one line at a time, including its line ending.
+    """
+    for block in iter_gz_text(fileobj, chunk_size):
+        lines = block.split("\n")
+        last = lines.pop()
+        for line in lines:
+            yield line + "\n"
+        if last:
+            yield last
+
+
 def print_s3_gz(client: S3Client, s3_uri: str):
     """
-    Downloads and decompresses a gzip file from S3 and prints the logs to stdout.
+    Downloads and decompresses a gzip file from S3 and streams the logs to stdout.
     """
     bucket, key = parse_bucket_uri(s3_uri)
     gz = client.get_object(Bucket=bucket, Key=key)
-    with gzip.open(gz["Body"]) as data:
-        print(data.read().decode())
+    text = "\n"
+    for text in iter_gz_text(gz["Body"]):
+        sys.stdout.write(text)
+    if not text.endswith("\n"):
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def build_transfer_config(
+    multipart_threshold_mb: Optional[int] = None,
+    multipart_chunksize_mb: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+) -> Optional["TransferConfig"]:
+    """
+    Returns an S3 TransferConfig with the provided overrides, or None to use the boto3 defaults.
+    """
+    overrides = {}
+    if multipart_threshold_mb is not None:
+        overrides["multipart_threshold"] = multipart_threshold_mb * MiB
+    if multipart_chunksize_mb is not None:
+        overrides["multipart_chunksize"] = multipart_chunksize_mb * MiB
+    if max_concurrency is not None:
+        overrides["max_concurrency"] = max_concurrency
+    if not overrides:
+        return None
+
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(**overrides)
 
 
 class PrettyUploader:
+    """
+    Uploads local files to S3 concurrently, with a single progress bar for all of them.
+
+    Targets are keys in `bucket`, or full `s3://` URIs for files that go elsewhere.
+
+    Each object is stored with the SHA-256 of its contents in its metadata. Before
+    uploading, the existing object is checked with a HEAD request and the upload
+    is skipped if the hashes match.
+    """
+
     def __init__(
         self,
         s3_client: S3Client,
         bucket: str,
         src_target: Dict[str, str],
+        skip_unchanged: bool = True,
+        transfer_config: Optional["TransferConfig"] = None,
+        show_progress: bool = True,
     ):
+        # rich is only needed when we actually upload, so keep it out of CLI startup
+        from rich.progress import Progress, TotalFileSizeColumn
+
         self._s3_client = s3_client
         self._bucket = bucket
         self._src_target = src_target
+        self._skip_unchanged = skip_unchanged
+        self._transfer_config = transfer_config
+        # Only one progress bar can be live at a time, so concurrent uploaders turn theirs off
+        self._show_progress = show_progress
         self._totalsize = sum(
             [float(os.path.getsize(filename)) for filename in self._src_target.keys()]
         )
@@ -127,9 +245,106 @@ class PrettyUploader:
         self._task = self._progress.add_task("Uploading...", total=self._totalsize)
 
     def run(self):
-        with self._progress:
-            for src, target in self._src_target.items():
-                self._s3_client.upload_file(src, self._bucket, target, Callback=self)
+        uploads = {}
+        for src, target in self._src_target.items():
+            bucket, key = self._resolve(target)
+            digest = file_sha256(src)
+            if self._skip_unchanged and self._remote_sha256(bucket, key) == digest:
+                console_log(f"{src} is up to date in s3://{bucket}/{key}")
+                continue
+            uploads[src] = (bucket, key, digest)
+
+        if not uploads:
+            return
+
+        self._progress.update(self._task, total=sum(float(os.path.getsize(src)) for src in uploads))
+        progress = self._progress if self._show_progress else nullcontext()
+        with progress, ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+            futures = [executor.submit(self._upload, src, *upload) for src, upload in uploads.items()]
+            for future in futures:
+                future.result()
+        if not self._show_progress:
+            for src, (bucket, key, _) in uploads.items():
+                console_log(f"Uploaded {src} to s3://{bucket}/{key}")
+
+    def _resolve(self, target: str) -> List[str]:
+        if target.startswith("s3://"):
+            return parse_bucket_uri(target)
+        return [self._bucket, target]
+
+    def _upload(self, src: str, bucket: str, key: str, digest: str):
+        extra = {}
+        if self._transfer_config is not None:
+            extra["Config"] = self._transfer_config
+        self._s3_client.upload_file(
+            src,
+            bucket,
+            key,
+            ExtraArgs={"Metadata": {HASH_METADATA_KEY: digest}},
+            Callback=self,
+            **extra,
+        )
+
+    def _remote_sha256(self, bucket: str, key: str) -> Optional[str]:
+        """
+        Returns the content hash recorded on an existing object, or None if the
+        object doesn't exist or wasn't uploaded by us.
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self._s3_client.head_object(Bucket=bucket, Key=key)
+        except ClientError:
+            return None
+        return response.get("Metadata", {}).get(HASH_METADATA_KEY)
 
     def __call__(self, bytes_amount):
+        # Called from multiple upload threads, rich's Progress handles the locking
         self._progress.update(self._task, advance=bytes_amount)
+
+
+class StageTimer:
+    """
+    Records when each of a set of concurrent stages starts and ends, relative to when
+    the timer was created, and which stage each one had to wait for.
+    """
+
+    def __init__(self) -> None:
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+        # name -> (start, end, name of the stage it had to wait for)
+        self.stages: Dict[str, Tuple[float, float, Optional[str]]] = {}
+
+    def time(self, name: str, fn: Callable[..., Any], *args, after: Optional[str] = None) -> Any:
+        start = time.monotonic() - self._t0
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.stages[name] = (start, time.monotonic() - self._t0, after)
+
+    def critical_path(self) -> List[str]:
+        """
+        The chain of stages that ended last, i.e. what everything else was waiting on.
+        """
+        if not self.stages:
+            return []
+        name: Optional[str] = max(self.stages, key=lambda n: self.stages[n][1])
+        path = []
+        while name is not None:
+            path.insert(0, name)
+            name = self.stages[name][2]
+        return path
+
+    def report(self, title: str = "Timing", finished: str = "Finished"):
+        console_log(f"{title} (seconds from start):")
+        width = max(len(name) for name in self.stages)
+        for name, (start, end, _) in sorted(self.stages.items(), key=lambda item: item[1][0]):
+            print(f"  {name:<{width}}  {start:6.1f} -> {end:6.1f}  ({end - start:.1f}s)")
+        path = self.critical_path()
+        total = self.stages[path[-1]][1]
+        sequential = sum(end - start for start, end, _ in self.stages.values())
+        console_log(
+            f"{finished} after {total:.1f}s, critical path: {' -> '.join(path)}. "
+            f"Running the stages one after another would take {sequential:.1f}s."
+        )
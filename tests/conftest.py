@@ -0,0 +1,11 @@
+import pytest
+
+from emr_cli import clients
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    # Tests stub methods on clients, so don't share them between tests
+    clients.reset()
+    yield
+    clients.reset()
@@ -0,0 +1,108 @@
+import threading
+import unittest
+
+from emr_cli.deployments.batch import SUBMIT_FAILED, BatchRunner, expand_matrix, parse_batch_entries
+
+
+class TestBatchArgs(unittest.TestCase):
+    def test_expand_matrix(self):
+        arg_sets = expand_matrix({"date": ["2024-01-01", "2024-01-02"], "limit": [10]})
+        self.assertEqual(
+            arg_sets,
+            [["--date", "2024-01-01", "--limit", "10"], ["--date", "2024-01-02", "--limit", "10"]],
+        )
+
+    def test_expand_matrix_requires_values(self):
+        with self.assertRaises(ValueError):
+            expand_matrix({"date": []})
+
+    def test_parse_entries(self):
+        self.assertEqual(parse_batch_entries(["a,b", ["c", 1]]), [["a", "b"], ["c", "1"]])
+        self.assertEqual(parse_batch_entries({"matrix": {"x": [1, 2]}}), [["--x", "1"], ["--x", "2"]])
+        with self.assertRaises(ValueError):
+            parse_batch_entries({"runs": []})
+
+
+class TestBatchRunner(unittest.TestCase):
+    def test_submits_and_waits_for_every_run(self):
+        submitted = []
+        lock = threading.Lock()
+
+        def submit(name, args):
+            if args == ["bad"]:
+                raise RuntimeError("ValidationException")
+            with lock:
+                submitted.append(name)
+            return f"id-{args[0]}"
+
+        def wait(job_run_id, label):
+            return {"state": "FAILED" if job_run_id == "id-fail" else "SUCCESS", "stateDetails": None}
+
+        runs = BatchRunner(submit, wait, "SUCCESS", max_workers=2).run("job", [["ok"], ["fail"], ["bad"]])
+
+        self.assertEqual(sorted(submitted), ["job-1", "job-2"])
+        self.assertEqual([r.state for r in runs], ["SUCCESS", "FAILED", SUBMIT_FAILED])
+        self.assertEqual([r.succeeded for r in runs], [True, False, False])
+        self.assertEqual(runs[2].details, "ValidationException")
+
+    def test_submit_concurrency_is_bounded(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+        release = threading.Event()
+
+        def submit(name, args):
+            with lock:
+                active.append(name)
+                peak.append(len(active))
+            release.wait(0.05)
+            with lock:
+                active.remove(name)
+            return name
+
+        runs = BatchRunner(submit, None, "SUCCESS", max_workers=3).run("job", [[str(i)] for i in range(10)])
+        self.assertLessEqual(max(peak), 3)
+        self.assertTrue(all(r.succeeded and r.state == "SUBMITTED" for r in runs))
+
+    def test_wait_concurrency_is_bounded(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def wait(job_run_id, label):
+            with lock:
+                active.append(job_run_id)
+                peak.append(len(active))
+            threading.Event().wait(0.01)
+            with lock:
+                active.remove(job_run_id)
+            return {"state": "SUCCESS"}
+
+        runs = BatchRunner(lambda name, args: name, wait, "SUCCESS", max_workers=3).run(
+            "job", [[str(i)] for i in range(10)]
+        )
+        self.assertLessEqual(max(peak), 3)
+        self.assertTrue(all(r.succeeded for r in runs))
+
+    def test_wait_all_waits_from_one_thread(self):
+        threads = set()
+
+        def wait(job_run_id, label):
+            raise AssertionError("runs should be waited on together")
+
+        def wait_all(labels):
+            threads.add(threading.get_ident())
+            self.assertEqual(labels["job-2"], "Run 2 (job-2)")
+            for job_run_id in reversed(list(labels)):
+                threads.add(threading.get_ident())
+                if job_run_id == "job-3":
+                    yield job_run_id, {}, RuntimeError("AccessDenied")
+                else:
+                    yield job_run_id, {"state": "FAILED" if job_run_id == "job-2" else "SUCCESS"}, None
+
+        runs = BatchRunner(lambda name, args: name, wait, "SUCCESS", wait_all=wait_all).run(
+            "job", [[str(i)] for i in range(4)]
+        )
+        self.assertEqual(len(threads), 1)
+        self.assertEqual([r.state for r in runs], ["SUCCESS", "FAILED", "UNKNOWN", "SUCCESS"])
+        self.assertEqual(runs[2].details, "AccessDenied")
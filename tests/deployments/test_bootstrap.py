@@ -0,0 +1,247 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+
+from emr_cli.deployments.bootstrap import ResourceGraph, is_iam_propagation_error, wait_for_propagation
+from emr_cli.deployments.emr_ec2 import Bootstrap
+from emr_cli.deployments.polling import Backoff
+
+INVALID_PRINCIPAL = ClientError(
+    {"Error": {"Code": "MalformedPolicyDocument", "Message": 'Invalid principal in policy: "AWS":"arn"'}},
+    "CreateRole",
+)
+INVALID_PROFILE = ClientError(
+    {"Error": {"Code": "ValidationException", "Message": "Invalid InstanceProfile: emr-cli-instance."}},
+    "RunJobFlow",
+)
+ACCESS_DENIED = ClientError({"Error": {"Code": "AccessDenied", "Message": "no"}}, "CreateRole")
+
+
+class TestResourceGraph:
+    def test_independent_resources_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        graph = ResourceGraph()
+        graph.add("a", lambda: (barrier.wait(), "A")[1])
+        graph.add("b", lambda: (barrier.wait(), "B")[1])
+        graph.add("c", lambda a, b: a + b, depends_on=["a", "b"])
+
+        assert graph.run() == {"a": "A", "b": "B", "c": "AB"}
+        assert graph.timer.stages["c"][2] in ("a", "b")
+        assert graph.timer.critical_path()[-1] == "c"
+
+    def test_error_stops_dependents(self):
+        created = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        graph = ResourceGraph()
+        graph.add("a", fail)
+        graph.add("b", lambda: created.append("b"))
+        graph.add("c", lambda a: created.append("c"), depends_on=["a"])
+        with pytest.raises(RuntimeError, match="boom"):
+            graph.run()
+        assert created == ["b"]
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError):
+            ResourceGraph().add("a", lambda b: b, depends_on=["b"])
+
+
+class TestWaitForPropagation:
+    def test_propagation_errors(self):
+        assert is_iam_propagation_error(INVALID_PRINCIPAL)
+        assert is_iam_propagation_error(INVALID_PROFILE)
+        assert not is_iam_propagation_error(ACCESS_DENIED)
+
+    def test_retries_with_backoff(self):
+        sleeps = []
+        backoff = Backoff(sleep=sleeps.append, jitter=lambda low, high: high)
+        create = MagicMock(side_effect=[INVALID_PRINCIPAL, INVALID_PRINCIPAL, "arn"])
+        assert wait_for_propagation(create, backoff=backoff) == "arn"
+        assert sleeps == [1.0, 2.0]
+
+    def test_gives_up(self):
+        now = [0.0]
+        backoff = Backoff(sleep=lambda s: now.__setitem__(0, now[0] + s), jitter=lambda low, high: high)
+        with pytest.raises(ClientError):
+            wait_for_propagation(MagicMock(side_effect=INVALID_PRINCIPAL), timeout=30, backoff=backoff, clock=lambda: now[0])
+        assert now[0] >= 30
+
+        with pytest.raises(ClientError):
+            wait_for_propagation(MagicMock(side_effect=ACCESS_DENIED), backoff=Backoff(sleep=pytest.fail))
+
+
+NO_SUCH_ENTITY = ClientError({"Error": {"Code": "NoSuchEntity", "Message": "not found"}}, "GetRole")
+INVALID_REQUEST = ClientError({"Error": {"Code": "InvalidRequestException", "Message": "not found"}}, "Describe")
+
+
+class FakeIAM:
+    """
+    Just enough of IAM to bootstrap an environment twice.
+    """
+
+    def __init__(self):
+        self.client = MagicMock()
+        self.roles = {}
+        self.policies = {}
+        self.profiles = {}
+        self.client.get_role.side_effect = self.get_role
+        self.client.create_role.side_effect = self.create_role
+        self.client.create_policy.side_effect = self.create_policy
+        self.client.get_policy.side_effect = lambda PolicyArn: {"Policy": {"Arn": PolicyArn}}
+        self.client.get_instance_profile.side_effect = self.get_instance_profile
+        self.client.create_instance_profile.side_effect = lambda InstanceProfileName: self.profiles.setdefault(
+            InstanceProfileName, []
+        )
+        self.client.add_role_to_instance_profile.side_effect = (
+            lambda InstanceProfileName, RoleName: self.profiles[InstanceProfileName].append({"RoleName": RoleName})
+        )
+
+    def get_role(self, RoleName):
+        if RoleName not in self.roles:
+            raise NO_SUCH_ENTITY
+        return {"Role": {"Arn": self.roles[RoleName]}}
+
+    def create_role(self, RoleName, AssumeRolePolicyDocument):
+        self.roles[RoleName] = f"arn:aws:iam::123456789012:role/{RoleName}"
+        return {"Role": {"Arn": self.roles[RoleName]}}
+
+    def create_policy(self, PolicyName, PolicyDocument):
+        self.policies[PolicyName] = PolicyDocument
+        return {"Policy": {"Arn": f"arn:aws:iam::123456789012:policy/{PolicyName}"}}
+
+    def get_instance_profile(self, InstanceProfileName):
+        if InstanceProfileName not in self.profiles:
+            raise NO_SUCH_ENTITY
+        return {"InstanceProfile": {"Roles": self.profiles[InstanceProfileName]}}
+
+
+class TestEC2Bootstrap:
+    def bootstrap(self, iam):
+        b = Bootstrap("code-bucket", "log-bucket", "instance-role", "job-role")
+        b.s3_client = MagicMock()
+        b.iam_client = iam.client
+        b.emr_client = MagicMock()
+        b.sts_client = MagicMock()
+        b.sts_client.get_caller_identity.return_value = {
+            "Account": "123456789012",
+            "Arn": "arn:aws:iam::123456789012:user/admin",
+        }
+        b.emr_client.meta.region_name = "us-west-2"
+        b.emr_client.describe_security_configuration.side_effect = INVALID_REQUEST
+        b.emr_client.create_security_configuration.return_value = {"Name": "emr-cli-runtime-roles"}
+        b.emr_client.describe_cluster.return_value = {"Cluster": {"Status": {"State": "WAITING"}}}
+        b.emr_client.run_job_flow.side_effect = [INVALID_PROFILE, {"JobFlowId": "j-1234"}]
+        return b
+
+    def test_create_environment(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        iam = FakeIAM()
+        b = self.bootstrap(iam)
+
+        config = b.create_environment()
+
+        assert config["cluster_id"] == "j-1234"
+        assert config["job_role_arn"] == "arn:aws:iam::123456789012:role/job-role"
+        assert b.s3_client.create_bucket.call_count == 2
+        attached = sorted(c.kwargs["PolicyArn"] for c in iam.client.attach_role_policy.call_args_list)
+        assert attached == [
+            "arn:aws:iam::123456789012:policy/emr-cli-GlueAccess",
+            "arn:aws:iam::123456789012:policy/emr-cli-S3Access",
+        ]
+        assert "role/job-role" in iam.client.put_role_policy.call_args.kwargs["PolicyDocument"]
+        assert b.emr_client.run_job_flow.call_args.kwargs["JobFlowRole"] == "instance-role"
+        assert "Environment created" in capsys.readouterr().out
+        assert (tmp_path / ".emr" / "bootstrap-state.json").exists()
+
+    def test_rerun_only_checks(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        iam = FakeIAM()
+        self.bootstrap(iam).create_environment()
+
+        b = self.bootstrap(iam)
+        b.emr_client.describe_security_configuration.side_effect = None
+        config = b.create_environment()
+
+        assert config["cluster_id"] == "j-1234"
+        b.s3_client.create_bucket.assert_not_called()
+        b.emr_client.create_security_configuration.assert_not_called()
+        b.emr_client.run_job_flow.assert_not_called()
+        assert iam.client.create_role.call_count == 2
+        assert iam.client.create_policy.call_count == 2
+        assert iam.client.create_instance_profile.call_count == 1
+
+        b.print_destroy_commands("j-1234")
+        out = capsys.readouterr().out
+        assert "aws emr terminate-clusters --cluster-ids j-1234" in out
+        assert "aws iam delete-role-policy --role-name instance-role --policy-name AssumeRuntimeRole" in out
+        assert "aws iam delete-policy --policy-arn arn:aws:iam::123456789012:policy/emr-cli-S3Access" in out
+        assert "aws emr delete-security-configuration --name emr-cli-runtime-roles" in out
+        iam.client.list_attached_role_policies.assert_not_called()
+
+    def test_changed_policy_gets_new_version(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        iam = FakeIAM()
+        self.bootstrap(iam).create_environment()
+
+        b = self.bootstrap(iam)
+        b.code_bucket = "other-code-bucket"
+        iam.client.create_policy.side_effect = ClientError(
+            {"Error": {"Code": "EntityAlreadyExists", "Message": "exists"}}, "CreatePolicy"
+        )
+        iam.client.list_policy_versions.return_value = {"Versions": [{"VersionId": "v1", "IsDefaultVersion": True}]}
+        b.create_environment()
+
+        iam.client.create_policy_version.assert_called_once()
+        assert "other-code-bucket" in iam.client.create_policy_version.call_args.kwargs["PolicyDocument"]
+
+    def test_leaves_other_projects_resources_alone(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        iam = FakeIAM()
+        self.bootstrap(iam).create_environment()
+        documents = dict(iam.policies)
+
+        # Another project in the same account, with its own state file
+        other = tmp_path / "other"
+        other.mkdir()
+        monkeypatch.chdir(other)
+        b = self.bootstrap(iam)
+        b.job_role_name, b.instance_role_name = "other-job-role", "other-instance-role"
+        b.code_bucket = "other-code-bucket"
+        iam.client.create_policy.side_effect = ClientError(
+            {"Error": {"Code": "EntityAlreadyExists", "Message": "exists"}}, "CreatePolicy"
+        )
+        iam.client.get_policy.side_effect = lambda PolicyArn: {"Policy": {"Arn": PolicyArn, "DefaultVersionId": "v1"}}
+        iam.client.get_policy_version.side_effect = lambda PolicyArn, VersionId: {
+            "PolicyVersion": {"Document": json.loads(documents[PolicyArn.split("/")[-1]])}
+        }
+        with pytest.raises(RuntimeError, match="emr-cli-S3Access already exists with a different document"):
+            b.create_environment()
+        iam.client.create_policy_version.assert_not_called()
+
+        b = self.bootstrap(iam)
+        with pytest.raises(RuntimeError, match="role/.*-role already exists"):
+            b.create_environment()
+        iam.client.update_assume_role_policy.assert_not_called()
+        iam.client.create_policy_version.assert_not_called()
+
+    def test_existing_bucket_is_used_as_is(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        b = self.bootstrap(FakeIAM())
+        b.s3_client.create_bucket.side_effect = ClientError(
+            {"Error": {"Code": "BucketAlreadyOwnedByYou", "Message": "yours"}}, "CreateBucket"
+        )
+        b.create_environment()
+
+        b.s3_client.put_bucket_policy.assert_not_called()
+        assert "Using existing S3 bucket: s3://code-bucket" in capsys.readouterr().out
+
+        b.print_destroy_commands("j-1234")
+        out = capsys.readouterr().out
+        assert "aws emr terminate-clusters --cluster-ids j-1234" in out
+        assert "s3://code-bucket" not in out
+        assert "delete-bucket" not in out
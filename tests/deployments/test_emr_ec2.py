@@ -1,8 +1,11 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
 
 from emr_cli.deployments.emr_ec2 import EMREC2
 from emr_cli.deployments.emr_serverless import DeploymentPackage
+from emr_cli.deployments.polling import Backoff
 
 CLUSTER_ID = "j-11111111"
 
@@ -37,3 +40,29 @@ class TestEMREC2(unittest.TestCase):
         )
         # Ensure that "s3n:" is replaced with "s3:" in the returned S3 location
         self.assertEqual(self.obj._fetch_log_location(), "s3://example-bucket/logs/")
+
+    def test_wait_for_logs_polls_with_backoff(self):
+        not_found = ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        self.obj.s3_client.head_object = MagicMock(side_effect=[not_found, not_found, not_found, {}])
+        sleeps = []
+        backoff = lambda **kwargs: Backoff(sleep=sleeps.append, jitter=lambda low, high: high, **kwargs)  # noqa: E731
+        with patch("emr_cli.deployments.emr_ec2.Backoff", backoff):
+            location = self.obj._wait_for_logs("s-1234", "s3://example-bucket/logs/", 60)
+        self.assertEqual(location, f"s3://example-bucket/logs/{CLUSTER_ID}/steps/s-1234/stdout.gz")
+        self.obj.s3_client.head_object.assert_called_with(
+            Bucket="example-bucket", Key=f"logs/{CLUSTER_ID}/steps/s-1234/stdout.gz"
+        )
+        self.assertEqual(sleeps, [1, 2, 4])
+
+    def test_wait_for_logs_raises_other_errors(self):
+        denied = ClientError({"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject")
+        self.obj.s3_client.head_object = MagicMock(side_effect=denied)
+        with self.assertRaises(ClientError):
+            self.obj._wait_for_logs("s-1234", "s3://example-bucket/logs/", 60)
+
+    def test_wait_for_job_uses_describe_step(self):
+        self.obj.client.describe_step = MagicMock(
+            return_value={"Step": {"Status": {"State": "FAILED", "FailureDetails": {"Reason": "boom"}}}}
+        )
+        step = self.obj.wait_for_job("s-1234")
+        self.assertEqual(step, {"state": "FAILED", "stateDetails": {"Reason": "boom"}})
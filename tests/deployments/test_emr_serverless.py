@@ -0,0 +1,185 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from emr_cli.deployments.emr_serverless import (
+    ApplicationConfig,
+    Bootstrap,
+    DeploymentPackage,
+    EMRServerless,
+    parse_worker_resources,
+)
+
+APPLICATION_ID = "00f1111111111111"
+
+
+def application(state: str) -> dict:
+    return {"application": {"applicationId": APPLICATION_ID, "state": state}}
+
+
+@patch("emr_cli.deployments.polling.Backoff.sleep", lambda self: None)
+class TestPrewarm(unittest.TestCase):
+    def setUp(self):
+        self.obj = EMRServerless(APPLICATION_ID, "arn:aws:iam::123456789012:role/job", DeploymentPackage("main.py"))
+        self.obj.client = MagicMock()
+        self.obj.client.start_job_run.return_value = {"jobRunId": "00f2222222222222"}
+
+    def test_already_started(self):
+        self.obj.client.get_application.return_value = application("STARTED")
+        self.obj.prewarm()
+        self.obj.client.start_application.assert_not_called()
+        self.assertEqual(self.obj.wait_until_started(), "")
+
+    def test_starts_stopped_application_before_submit(self):
+        self.obj.client.get_application.side_effect = [
+            application("STOPPED"),
+            application("STARTING"),
+            application("STARTING"),
+            application("STARTED"),
+        ]
+        self.obj.prewarm()
+        self.obj.submit_job("job")
+
+        self.obj.client.start_application.assert_called_once_with(applicationId=APPLICATION_ID)
+        self.assertEqual(self.obj.client.get_application.call_count, 4)
+        self.obj.client.start_job_run.assert_called_once()
+        self.assertEqual(list(self.obj.readiness_checks()), ["start application"])
+
+    def test_waits_for_stopping_application(self):
+        self.obj.client.get_application.side_effect = [
+            application("STOPPING"),
+            application("STOPPED"),
+            application("STARTED"),
+        ]
+        self.obj.prewarm()
+        self.assertEqual(self.obj.wait_until_started(), "STARTED")
+        self.obj.client.start_application.assert_called_once()
+
+    def test_failed_start_fails_submit(self):
+        self.obj.client.get_application.side_effect = [application("CREATED"), application("STOPPED")]
+        self.obj.prewarm()
+        with self.assertRaises(RuntimeError):
+            self.obj.submit_job("job")
+        self.obj.client.start_job_run.assert_not_called()
+
+    def test_prewarm_does_not_block_exit(self):
+        starting = threading.Event()
+        self.obj.client.get_application.side_effect = [application("STOPPED"), application("STARTED")]
+        self.obj.client.start_application.side_effect = lambda applicationId: starting.wait(5)
+        self.obj.prewarm()
+
+        thread = next(t for t in threading.enumerate() if t.name == "emr-cli-prewarm")
+        self.assertTrue(thread.daemon)
+        starting.set()
+        self.assertEqual(self.obj.wait_until_started(), "STARTED")
+
+    def test_terminated_application(self):
+        self.obj.client.get_application.return_value = application("TERMINATED")
+        with self.assertRaises(RuntimeError):
+            self.obj.prewarm()
+
+
+class TestApplicationConfig(unittest.TestCase):
+    def test_parse_worker_resources(self):
+        self.assertEqual(parse_worker_resources("4vCPU,16GB"), {"cpu": "4vCPU", "memory": "16GB"})
+        self.assertEqual(
+            parse_worker_resources("4vCPU, 16GB, 50GB"), {"cpu": "4vCPU", "memory": "16GB", "disk": "50GB"}
+        )
+        for value in ["4vCPU", "4vCPU,,50GB", "1,2,3,4"]:
+            with self.assertRaises(ValueError):
+                parse_worker_resources(value)
+
+    def test_defaults(self):
+        args = ApplicationConfig().create_application_args()
+        self.assertEqual(
+            args,
+            {
+                "releaseLabel": "emr-6.9.0",
+                "autoStartConfiguration": {"enabled": True},
+                "autoStopConfiguration": {"enabled": True, "idleTimeoutMinutes": 15},
+            },
+        )
+
+    def test_create_application_with_capacity(self):
+        config = ApplicationConfig(
+            release_label="emr-6.15.0",
+            driver_workers=1,
+            executor_workers=4,
+            executor_size="8vCPU,32GB,100GB",
+            max_capacity="64vCPU,256GB",
+            idle_timeout=30,
+        )
+        b = Bootstrap("code-bucket", "", "job-role", config)
+        b.emrs_client = MagicMock()
+        b.emrs_client.create_application.return_value = {"applicationId": APPLICATION_ID}
+
+        self.assertEqual(b._create_application(), APPLICATION_ID)
+        kwargs = b.emrs_client.create_application.call_args.kwargs
+        self.assertEqual(kwargs["releaseLabel"], "emr-6.15.0")
+        self.assertEqual(
+            kwargs["initialCapacity"],
+            {
+                "DRIVER": {"workerCount": 1, "workerConfiguration": {"cpu": "4vCPU", "memory": "16GB"}},
+                "EXECUTOR": {
+                    "workerCount": 4,
+                    "workerConfiguration": {"cpu": "8vCPU", "memory": "32GB", "disk": "100GB"},
+                },
+            },
+        )
+        self.assertEqual(kwargs["maximumCapacity"], {"cpu": "64vCPU", "memory": "256GB"})
+        self.assertEqual(kwargs["autoStopConfiguration"], {"enabled": True, "idleTimeoutMinutes": 30})
+        self.assertEqual(config.to_config()["executor_workers"], 4)
+
+    def test_ensure_application_updates_changed_config(self):
+        import tempfile
+
+        from emr_cli.deployments.bootstrap import BootstrapState
+
+        with tempfile.TemporaryDirectory() as tmp:
+            b = Bootstrap("code-bucket", "", "job-role", ApplicationConfig(executor_workers=2))
+            b._state = BootstrapState("123456789012", "us-east-1", path=f"{tmp}/state.json")
+            b.emrs_client = MagicMock()
+            b.emrs_client.create_application.return_value = {"applicationId": APPLICATION_ID}
+            b.emrs_client.get_application.return_value = application("STOPPED")
+
+            self.assertEqual(b._ensure_application(), APPLICATION_ID)
+            self.assertEqual(b._ensure_application(), APPLICATION_ID)
+            b.emrs_client.create_application.assert_called_once()
+            b.emrs_client.update_application.assert_not_called()
+
+            b.application_config.idle_timeout = 60
+            self.assertEqual(b._ensure_application(), APPLICATION_ID)
+            kwargs = b.emrs_client.update_application.call_args.kwargs
+            self.assertEqual(kwargs["autoStopConfiguration"]["idleTimeoutMinutes"], 60)
+            self.assertEqual(kwargs["initialCapacity"]["EXECUTOR"]["workerCount"], 2)
+
+    def test_ensure_application_reports_max_capacity_it_cant_remove(self):
+        import io
+        import tempfile
+        from contextlib import redirect_stdout
+
+        from emr_cli.deployments.bootstrap import BootstrapState
+
+        with tempfile.TemporaryDirectory() as tmp:
+            b = Bootstrap("code-bucket", "", "job-role", ApplicationConfig(max_capacity="64vCPU,256GB"))
+            b._state = BootstrapState("123456789012", "us-east-1", path=f"{tmp}/state.json")
+            b.emrs_client = MagicMock()
+            b.emrs_client.create_application.return_value = {"applicationId": APPLICATION_ID}
+            b.emrs_client.get_application.return_value = application("STOPPED")
+            b._ensure_application()
+            self.assertEqual(
+                b.emrs_client.create_application.call_args.kwargs["maximumCapacity"],
+                {"cpu": "64vCPU", "memory": "256GB"},
+            )
+
+            b.application_config.max_capacity = None
+            app = application("STOPPED")
+            app["application"]["maximumCapacity"] = {"cpu": "64 vCPU", "memory": "256 GB"}
+            b.emrs_client.get_application.return_value = app
+            out = io.StringIO()
+            with redirect_stdout(out):
+                b._ensure_application()
+
+            kwargs = b.emrs_client.update_application.call_args.kwargs
+            self.assertNotIn("maximumCapacity", kwargs)
+            self.assertIn("keeps its limit of 64 vCPU,256 GB. Pass --max-capacity", out.getvalue())
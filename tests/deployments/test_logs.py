@@ -0,0 +1,107 @@
+import gzip
+import io
+import unittest
+from unittest.mock import MagicMock
+
+from emr_cli.deployments.emr_ec2 import EMREC2
+from emr_cli.deployments.emr_eks import EMREKS
+from emr_cli.deployments.emr_serverless import DeploymentPackage, EMRServerless
+from emr_cli.deployments.logs import LogFetcher
+
+PREFIX = "s3://bucket/logs/applications/app-1/jobs/jr-1/"
+
+LOGS = {
+    "logs/applications/app-1/jobs/jr-1/SPARK_DRIVER/stdout.gz": b"hello\nresult=42\n",
+    "logs/applications/app-1/jobs/jr-1/SPARK_DRIVER/stderr.gz": b"INFO starting\nERROR boom\n",
+    "logs/applications/app-1/jobs/jr-1/SPARK_EXECUTOR/1/stderr.gz": b"INFO task 1\nERROR oom",
+    "logs/applications/app-1/jobs/jr-1/SPARK_EXECUTOR/1/metadata.json": b"{}",
+}
+
+
+def stub_s3_client():
+    client = MagicMock()
+    keys = list(LOGS)
+    client.get_paginator.return_value.paginate.return_value = [
+        {"Contents": [{"Key": key} for key in keys[:2]]},
+        {"Contents": [{"Key": key} for key in keys[2:]]},
+    ]
+    client.get_object.side_effect = lambda Bucket, Key: {"Body": io.BytesIO(gzip.compress(LOGS[Key]))}
+    return client
+
+
+class TestLogFetcher(unittest.TestCase):
+    def test_fetches_every_container(self):
+        client = stub_s3_client()
+        out = io.StringIO()
+        self.assertEqual(LogFetcher(client, PREFIX, out=out).run(), 3)
+        client.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="bucket", Prefix="logs/applications/app-1/jobs/jr-1/"
+        )
+        self.assertEqual(
+            sorted(out.getvalue().splitlines()),
+            [
+                "[SPARK_DRIVER/stderr] ERROR boom",
+                "[SPARK_DRIVER/stderr] INFO starting",
+                "[SPARK_DRIVER/stdout] hello",
+                "[SPARK_DRIVER/stdout] result=42",
+                "[SPARK_EXECUTOR/1/stderr] ERROR oom",
+                "[SPARK_EXECUTOR/1/stderr] INFO task 1",
+            ],
+        )
+
+    def test_grep(self):
+        out = io.StringIO()
+        LogFetcher(stub_s3_client(), PREFIX, pattern="ERROR|result", out=out).run()
+        self.assertEqual(
+            sorted(out.getvalue().splitlines()),
+            ["[SPARK_DRIVER/stderr] ERROR boom", "[SPARK_DRIVER/stdout] result=42", "[SPARK_EXECUTOR/1/stderr] ERROR oom"],
+        )
+
+
+class TestLogPaths(unittest.TestCase):
+    def test_emr_serverless(self):
+        emrs = EMRServerless("app-1", "role", DeploymentPackage())
+        self.assertEqual(emrs.log_prefix("jr-1", "s3://bucket/logs/"), PREFIX)
+        self.assertEqual(
+            emrs.driver_log_uri("jr-1", "s3://bucket/logs"),
+            "s3://bucket/logs/applications/app-1/jobs/jr-1/SPARK_DRIVER/stdout.gz",
+        )
+        with self.assertRaises(RuntimeError):
+            emrs.log_prefix("jr-1")
+
+    def test_emr_eks(self):
+        emreks = EMREKS("vc-1", "role", DeploymentPackage())
+        self.assertEqual(
+            emreks.driver_log_uri("jr-1", "s3://bucket/logs/"),
+            "s3://bucket/logs/vc-1/jobs/jr-1/containers/spark-jr-1/spark-jr-1-driver/stdout.gz",
+        )
+
+    def test_emr_ec2_includes_container_logs(self):
+        logs = {
+            "logs/j-1/steps/s-1/stderr.gz": b"INFO Client: Submitted application application_1700000000000_0007\n",
+            "logs/j-1/steps/s-1/stdout.gz": b"",
+            "logs/j-1/containers/application_1700000000000_0007/container_01_000001/stderr.gz": b"ERROR driver\n",
+            "logs/j-1/containers/application_1700000000000_0007/container_01_000002/stdout.gz": b"executor\n",
+            "logs/j-1/containers/application_1700000000000_0003/container_01_000001/stderr.gz": b"other job\n",
+        }
+        emrec2 = EMREC2("j-1", DeploymentPackage())
+        emrec2.s3_client = client = MagicMock()
+        client.get_object.side_effect = lambda Bucket, Key: {"Body": io.BytesIO(gzip.compress(logs[Key]))}
+        client.get_paginator.return_value.paginate.side_effect = lambda Bucket, Prefix: [
+            {"Contents": [{"Key": key} for key in logs if key.startswith(Prefix)]}
+        ]
+
+        prefix, paths = emrec2.log_paths("s-1", "s3://bucket/logs/")
+        self.assertEqual(prefix, "s3://bucket/logs/j-1/")
+        self.assertEqual(paths, ["steps/s-1/", "containers/application_1700000000000_0007/"])
+
+        out = io.StringIO()
+        self.assertEqual(LogFetcher(client, prefix, out=out, paths=paths).run(), 4)
+        self.assertEqual(
+            sorted(out.getvalue().splitlines()),
+            [
+                "[containers/application_1700000000000_0007/container_01_000001/stderr] ERROR driver",
+                "[containers/application_1700000000000_0007/container_01_000002/stdout] executor",
+                "[steps/s-1/stderr] INFO Client: Submitted application application_1700000000000_0007",
+            ],
+        )
@@ -0,0 +1,56 @@
+import unittest
+
+from botocore.exceptions import ClientError
+
+from emr_cli.deployments.polling import AdaptivePoller
+
+TERMINAL = ["SUCCESS", "FAILED", "CANCELLED"]
+
+
+def no_jitter(low, high):
+    return high
+
+
+class TestAdaptivePoller(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+
+    def poller(self, **kwargs):
+        return AdaptivePoller(TERMINAL, sleep=self.sleeps.append, jitter=no_jitter, **kwargs)
+
+    def responses(self, *items):
+        it = iter(items)
+
+        def get_job_run():
+            item = next(it)
+            if isinstance(item, Exception):
+                raise item
+            return {"state": item}
+
+        return get_job_run
+
+    def test_backs_off_while_running(self):
+        states = ["SUBMITTED", "SCHEDULED", "SCHEDULED"] + ["RUNNING"] * 8 + ["SUCCESS"]
+        response = self.poller(max_interval=10).wait(self.responses(*states))
+        self.assertEqual(response, {"state": "SUCCESS"})
+        # Fast while pending, reset on every state change, then doubling up to the cap
+        self.assertEqual(self.sleeps, [1, 1, 1, 1, 2, 4, 8, 10, 10, 10, 10])
+
+    def test_throttling_is_retried_with_backoff(self):
+        throttled = ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "GetJobRun")
+        poller = self.poller()
+        response = poller.wait(self.responses("SUBMITTED", throttled, throttled, "SUCCESS"))
+        self.assertEqual(response, {"state": "SUCCESS"})
+        self.assertEqual(self.sleeps, [1, 2, 4])
+        self.assertEqual(poller.api_calls, 4)
+
+    def test_other_errors_are_raised(self):
+        denied = ClientError({"Error": {"Code": "AccessDeniedException", "Message": "No"}}, "GetJobRun")
+        with self.assertRaises(ClientError):
+            self.poller().wait(self.responses(denied))
+
+    def test_jitter_stays_within_interval(self):
+        poller = AdaptivePoller(TERMINAL, sleep=self.sleeps.append, max_interval=8)
+        poller.wait(self.responses(*(["RUNNING"] * 10 + ["FAILED"])))
+        for interval, slept in zip([1, 2, 4, 8, 8, 8, 8, 8, 8, 8], self.sleeps):
+            self.assertTrue(interval / 2 <= slept <= interval)
@@ -0,0 +1,49 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from emr_cli.deployments.release_labels import ReleaseLabelCache, latest_release_label, user_cache_dir
+
+
+class TestReleaseLabelCache:
+    def test_user_cache_dir(self, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", "/tmp/xdg")
+        assert user_cache_dir() == "/tmp/xdg/emr-cli"
+        monkeypatch.delenv("XDG_CACHE_HOME")
+        assert user_cache_dir() == os.path.join(os.path.expanduser("~"), ".cache", "emr-cli")
+
+    def test_ttl_and_regions(self, tmp_path):
+        now = [1000.0]
+        cache = ReleaseLabelCache(str(tmp_path / "labels.json"), ttl=60, clock=lambda: now[0])
+        assert cache.get("us-east-1") is None
+        cache.put("us-east-1", "emr-6.15.0")
+        assert cache.get("us-east-1") == "emr-6.15.0"
+        assert cache.get("eu-west-1") is None
+
+        now[0] += 61
+        assert cache.get("us-east-1") is None
+
+    def test_disabled_and_corrupt(self, tmp_path):
+        path = tmp_path / "labels.json"
+        ReleaseLabelCache(str(path)).put("us-east-1", "emr-6.15.0")
+        assert ReleaseLabelCache(str(path), ttl=0).get("us-east-1") is None
+
+        path.write_text("not json")
+        assert ReleaseLabelCache(str(path)).get("us-east-1") is None
+
+
+class TestLatestReleaseLabel:
+    def test_cached_between_calls(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        emr_client = MagicMock()
+        emr_client.list_release_labels.return_value = {"ReleaseLabels": ["emr-6.15.0"]}
+        with patch("emr_cli.clients.client", return_value=emr_client) as client:
+            assert latest_release_label("us-east-1") == "emr-6.15.0"
+            assert latest_release_label("us-east-1") == "emr-6.15.0"
+            assert client.call_count == 1
+
+            emr_client.list_release_labels.return_value = {"ReleaseLabels": ["emr-6.16.0"]}
+            assert latest_release_label("us-east-1", refresh=True) == "emr-6.16.0"
+            assert latest_release_label("us-east-1") == "emr-6.16.0"
+            assert latest_release_label("us-east-1", ttl=0) == "emr-6.16.0"
+            assert client.call_count == 3
+        assert (tmp_path / "emr-cli" / "release-labels.json").exists()
@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from emr_cli.deployments.emr_serverless import DeploymentPackage, EMRServerless
+from emr_cli.deployments.polling import JobRunTracker
+
+RUNS = 10
+PAGE_SIZE = 4
+
+
+class StubEMRServerlessClient:
+    """
+    Job run i is RUNNING for the first i polls and then finishes, run 3 fails.
+    A poll is one full pass over the paginated listing, or a `get_job_run` call
+    while only the last run is pending.
+    """
+
+    def __init__(self) -> None:
+        self.polls = 0
+        self.calls = {"list_job_runs": 0, "get_job_run": 0}
+        self.lock = threading.Lock()
+
+    def state(self, i: int) -> str:
+        if self.polls <= i:
+            return "RUNNING"
+        return "FAILED" if i == 3 else "SUCCESS"
+
+    def list_job_runs(self, applicationId, createdAtAfter, states, nextToken=None):
+        with self.lock:
+            self.calls["list_job_runs"] += 1
+            active = [{"id": f"run-{i}", "state": self.state(i)} for i in range(RUNS) if self.state(i) in states]
+            start = int(nextToken or 0)
+            page = {"jobRuns": active[start : start + PAGE_SIZE]}
+            if start + PAGE_SIZE < len(active):
+                page["nextToken"] = str(start + PAGE_SIZE)
+            else:
+                self.polls += 1
+            return page
+
+    def get_job_run(self, applicationId, jobRunId):
+        with self.lock:
+            self.calls["get_job_run"] += 1
+            i = int(jobRunId.split("-")[1])
+            if i == RUNS - 1 and self.state(i) == "RUNNING":
+                self.polls += 1
+            return {"jobRun": {"id": jobRunId, "state": self.state(i), "stateDetails": f"details {i}"}}
+
+
+class TestJobRunTracker(unittest.TestCase):
+    def test_waits_for_many_runs_with_few_api_calls(self):
+        emrs = EMRServerless("app-1234", "role", DeploymentPackage())
+        client = emrs.client = StubEMRServerlessClient()
+
+        def sleep(_):
+            # Let every waiter join before the next poll, as they would while we sleep
+            while len(emrs._tracker._runs) < RUNS:
+                time.sleep(0.001)
+
+        emrs._tracker = JobRunTracker(
+            emrs.list_job_runs,
+            emrs.get_job_run,
+            active_states=emrs.ACTIVE_STATES,
+            terminal_states=emrs.TERMINAL_STATES,
+            sleep=sleep,
+        )
+
+        with ThreadPoolExecutor(max_workers=RUNS) as executor:
+            results = list(executor.map(lambda i: emrs.wait_for_job(f"run-{i}", label=f"Run {i}"), range(RUNS)))
+
+        self.assertEqual([r["state"] for r in results], ["FAILED" if i == 3 else "SUCCESS" for i in range(RUNS)])
+        self.assertEqual(results[3]["stateDetails"], "details 3")
+        # Each run is fetched individually once, when it drops out of the listing. Runs are
+        # also fetched directly while they're the only pending one: the first run before the
+        # others are submitted, and the last run once the others have finished.
+        self.assertLessEqual(client.calls["get_job_run"], RUNS + 3)
+        # Polling each run separately would take at least one call per run per poll
+        self.assertLess(client.calls["list_job_runs"], RUNS * client.polls / 2)
+        self.assertEqual(emrs._tracker.api_calls, sum(client.calls.values()))
+
+    def test_listing_errors_are_raised_to_waiters(self):
+        def list_job_runs(created_after, states, next_token):
+            raise RuntimeError("AccessDenied")
+
+        tracker = JobRunTracker(
+            list_job_runs, lambda _: {"state": "RUNNING"}, ["RUNNING"], ["SUCCESS"], sleep=lambda _: None
+        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            waits = [executor.submit(tracker.wait, f"run-{i}") for i in range(2)]
+            for wait in waits:
+                with self.assertRaises(RuntimeError):
+                    wait.result(timeout=5)
+
+    def test_single_run_is_fetched_directly(self):
+        states = iter(["RUNNING", "RUNNING", "SUCCESS"])
+
+        def list_job_runs(created_after, states, next_token):
+            raise AssertionError("a single run shouldn't list every job run")
+
+        tracker = JobRunTracker(
+            list_job_runs, lambda _: {"state": next(states)}, ["RUNNING"], ["SUCCESS"], sleep=lambda _: None
+        )
+        self.assertEqual(tracker.wait("run-1")["state"], "SUCCESS")
+        self.assertEqual(tracker.api_calls, 3)
+
+    def test_wait_all_yields_runs_as_they_finish(self):
+        emrs = EMRServerless("app-1234", "role", DeploymentPackage())
+        client = emrs.client = StubEMRServerlessClient()
+        emrs._tracker = JobRunTracker(
+            emrs.list_job_runs,
+            emrs.get_job_run,
+            active_states=emrs.ACTIVE_STATES,
+            terminal_states=emrs.TERMINAL_STATES,
+            sleep=lambda _: None,
+        )
+
+        finished = list(emrs.wait_for_jobs({f"run-{i}": f"Run {i}" for i in range(RUNS)}))
+
+        self.assertEqual([job_run_id for job_run_id, _, _ in finished], [f"run-{i}" for i in range(RUNS)])
+        self.assertEqual([r["state"] for _, r, _ in finished], ["FAILED" if i == 3 else "SUCCESS" for i in range(RUNS)])
+        self.assertTrue(all(error is None for _, _, error in finished))
+        self.assertLess(client.calls["list_job_runs"], RUNS * client.polls / 2)
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from emr_cli.packaging.archive import FIXED_DATE_TIME, ZipArchiveBuilder
+
+
+def sha256(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class TestZipArchiveBuilder:
+    def test_reproducible(self, fs):
+        fs.create_file("b.py", contents="print('b')\n" * 100)
+        fs.create_file("a/c.py", contents="print('c')\n" * 100)
+        files = {"b.py": "b.py", "a/c.py": "a/c.py"}
+        ZipArchiveBuilder().build("first.zip", files)
+        os.utime("b.py", (1_700_000_000, 1_700_000_000))
+        os.chmod("a/c.py", 0o755)
+        ZipArchiveBuilder().build("second.zip", dict(reversed(list(files.items()))))
+        assert sha256("first.zip") == sha256("second.zip")
+
+    def test_sorted_normalized_entries(self, fs):
+        fs.create_file("z.py", contents="z = 1\n")
+        fs.create_file("a.py", contents="a = 1\n")
+        ZipArchiveBuilder().build("out.zip", {"z.py": "z.py", "a.py": "a.py"})
+        with zipfile.ZipFile("out.zip") as zf:
+            assert zf.namelist() == ["a.py", "z.py"]
+            for info in zf.infolist():
+                assert info.date_time == FIXED_DATE_TIME
+                assert info.external_attr >> 16 == 0o100644
+                assert info.compress_type == zipfile.ZIP_DEFLATED
+            assert zf.read("z.py") == b"z = 1\n"
+
+    def test_compression_settings(self, fs):
+        fs.create_file("a.py", contents="x = 1\n" * 1000)
+        ZipArchiveBuilder("stored").build("stored.zip", {"a.py": "a.py"})
+        ZipArchiveBuilder("deflated", 9).build("deflated.zip", {"a.py": "a.py"})
+        assert os.path.getsize("deflated.zip") < os.path.getsize("stored.zip")
+
+    def test_compression_from_config(self, fs):
+        fs.create_file(".emr/config.yaml", contents="project:\n  zip_compression: bzip2\n  zip_compresslevel: 1\n")
+        builder = ZipArchiveBuilder.from_config()
+        assert builder.compress_type == zipfile.ZIP_BZIP2
+        assert builder.compresslevel == 1
+
+    def test_unknown_compression(self):
+        with pytest.raises(ValueError):
+            ZipArchiveBuilder("brotli")
+
+    @pytest.mark.parametrize("compression", ["stored", "deflated", "bzip2", "lzma"])
+    def test_valid_archive(self, fs, compression):
+        fs.create_file("a.py", contents="a = 1\n" * 500)
+        fs.create_file("pkg/ünïcode.py", contents="b = 2\n")
+        fs.create_file("pkg/empty.py")
+        files = {"a.py": "a.py", "pkg/ünïcode.py": "pkg/ünïcode.py", "pkg/empty.py": "pkg/empty.py"}
+        ZipArchiveBuilder(compression).build("out.zip", files)
+        with zipfile.ZipFile("out.zip") as zf:
+            assert zf.testzip() is None
+            assert zf.namelist() == ["a.py", "pkg/empty.py", "pkg/ünïcode.py"]
+            assert zf.read("a.py") == b"a = 1\n" * 500
+            assert zf.read("pkg/empty.py") == b""
+
+    def test_same_output_for_any_worker_count(self, fs):
+        files = {}
+        for i in range(50):
+            fs.create_file(f"pkg/mod{i}.py", contents=f"value = {i}\n" * i)
+            files[f"pkg/mod{i}.py"] = f"pkg/mod{i}.py"
+        ZipArchiveBuilder(workers=1).build("serial.zip", files)
+        ZipArchiveBuilder(workers=8).build("parallel.zip", files)
+        assert sha256("serial.zip") == sha256("parallel.zip")
+
+
+class TestIncrementalUpdate:
+    def _files(self, fs, count=20):
+        files = {}
+        for i in range(count):
+            fs.create_file(f"pkg/mod{i}.py", contents=f"value = {i}\n" * 50)
+            files[f"pkg/mod{i}.py"] = f"pkg/mod{i}.py"
+        return files
+
+    def test_first_update_compresses_everything(self, fs):
+        files = self._files(fs)
+        stats = ZipArchiveBuilder().update("out.zip", files)
+        assert (stats.compressed, stats.reused, stats.removed) == (20, 0, 0)
+        assert os.path.exists("out.zip.manifest.json")
+
+    def test_only_changed_files_are_compressed(self, fs, monkeypatch):
+        files = self._files(fs)
+        builder = ZipArchiveBuilder()
+        builder.update("out.zip", files)
+
+        Path("pkg/mod3.py").write_text("value = 'changed'\n")
+        fs.create_file("pkg/new.py", contents="new = True\n")
+        files["pkg/new.py"] = "pkg/new.py"
+        os.remove("pkg/mod7.py")
+        del files["pkg/mod7.py"]
+
+        compressed = []
+        original = builder.compress
+        monkeypatch.setattr(builder, "compress", lambda a, p: compressed.append(a) or original(a, p))
+        stats = builder.update("out.zip", files)
+        assert sorted(compressed) == ["pkg/mod3.py", "pkg/new.py"]
+        assert (stats.compressed, stats.reused, stats.removed) == (2, 18, 1)
+
+        # The result is identical to building from scratch
+        ZipArchiveBuilder().build("full.zip", files)
+        assert sha256("out.zip") == sha256("full.zip")
+        with zipfile.ZipFile("out.zip") as zf:
+            assert zf.testzip() is None
+            assert zf.read("pkg/mod3.py") == b"value = 'changed'\n"
+
+    def test_touched_files_are_reused(self, fs):
+        files = self._files(fs)
+        builder = ZipArchiveBuilder()
+        builder.update("out.zip", files)
+        os.utime("pkg/mod1.py", (1_700_000_000, 1_700_000_000))
+        stats = builder.update("out.zip", files)
+        assert (stats.compressed, stats.reused) == (0, 20)
+
+    def test_settings_change_rebuilds(self, fs):
+        files = self._files(fs)
+        ZipArchiveBuilder("deflated", 6).update("out.zip", files)
+        stats = ZipArchiveBuilder("deflated", 9).update("out.zip", files)
+        assert stats.compressed == 20
+
+    def test_full_build_discards_manifest(self, fs):
+        files = self._files(fs)
+        builder = ZipArchiveBuilder()
+        builder.update("out.zip", files)
+        builder.build("out.zip", files)
+        assert not os.path.exists("out.zip.manifest.json")
+
+    def test_mismatched_manifest_entries_are_recompressed(self, fs):
+        files = self._files(fs)
+        builder = ZipArchiveBuilder()
+        builder.update("out.zip", files)
+
+        # A manifest that no longer describes the archive, with valid sizes
+        manifest = json.loads(Path("out.zip.manifest.json").read_text())
+        entries = manifest["files"]
+        entries["pkg/mod1.py"]["offset"], entries["pkg/mod2.py"]["offset"] = (
+            entries["pkg/mod2.py"]["offset"],
+            entries["pkg/mod1.py"]["offset"],
+        )
+        entries["pkg/mod3.py"]["offset"] += 1
+        Path("out.zip.manifest.json").write_text(json.dumps(manifest))
+
+        stats = builder.update("out.zip", files)
+        assert (stats.compressed, stats.reused) == (3, 17)
+        ZipArchiveBuilder().build("full.zip", files)
+        assert sha256("out.zip") == sha256("full.zip")
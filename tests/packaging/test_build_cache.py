@@ -0,0 +1,129 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from emr_cli.packaging.build_cache import BuildCache, dockerignore_rules, is_ignored
+from emr_cli.packaging.python_project import PythonProject
+
+
+def fake_docker_build(output_dir):
+    Path(output_dir).mkdir(exist_ok=True)
+    Path(output_dir, "pyspark_deps.tar.gz").write_bytes(b"archive")
+
+
+class TestBuildCache:
+    def test_fresh_after_record(self, fs):
+        fs.create_file("pyproject.toml", contents="[project]")
+        fs.create_file("dist/pyspark_deps.tar.gz")
+        cache = BuildCache("dist/pyspark_deps.tar.gz", ["pyproject.toml"])
+        assert not cache.is_fresh()
+        cache.record()
+        assert BuildCache("dist/pyspark_deps.tar.gz", ["pyproject.toml"]).is_fresh()
+
+    def test_stale_when_inputs_change(self, fs):
+        fs.create_file("pyproject.toml", contents="[project]")
+        fs.create_file("dist/pyspark_deps.tar.gz")
+        BuildCache("dist/pyspark_deps.tar.gz", ["pyproject.toml"]).record()
+        Path("pyproject.toml").write_text("[project]\nname = 'changed'")
+        assert not BuildCache("dist/pyspark_deps.tar.gz", ["pyproject.toml"]).is_fresh()
+
+    def test_stale_when_artifact_missing(self, fs):
+        fs.create_file("pyproject.toml", contents="[project]")
+        fs.create_file("dist/pyspark_deps.tar.gz")
+        BuildCache("dist/pyspark_deps.tar.gz", ["pyproject.toml"]).record()
+        Path("dist/pyspark_deps.tar.gz").unlink()
+        assert not BuildCache("dist/pyspark_deps.tar.gz", ["pyproject.toml"]).is_fresh()
+
+    def test_target_is_part_of_the_key(self, fs):
+        fs.create_file("pyproject.toml", contents="[project]")
+        a = BuildCache("dist/pyspark_deps.tar.gz", ["pyproject.toml"], salt="export-python")
+        b = BuildCache("dist/pyspark_deps.tar.gz", ["pyproject.toml"], salt="export-poetry")
+        assert a.digest() != b.digest()
+
+
+class TestPythonProjectBuild:
+    def _project(self, fs):
+        fs.create_file("Dockerfile", contents="FROM scratch AS export-python")
+        fs.create_file("pyproject.toml", contents="[project]")
+        fs.create_file("main.py")
+        fs.create_file("jobs/job.py", contents="print(1)")
+        p = PythonProject("main.py")
+        p._run_docker_build = MagicMock(side_effect=fake_docker_build)
+        return p
+
+    def test_skips_unchanged_build(self, fs, capsys):
+        self._project(fs).build()
+        second = PythonProject("main.py")
+        second._run_docker_build = MagicMock(side_effect=fake_docker_build)
+        second.build()
+        second._run_docker_build.assert_not_called()
+        assert "Build cache hit" in capsys.readouterr().out
+
+    def test_rebuilds_on_source_change(self, fs):
+        self._project(fs).build()
+        Path("jobs/job.py").write_text("print(2)")
+        second = PythonProject("main.py")
+        second._run_docker_build = MagicMock(side_effect=fake_docker_build)
+        second.build()
+        second._run_docker_build.assert_called_once()
+
+    def test_force_build(self, fs, capsys):
+        self._project(fs).build()
+        second = PythonProject("main.py")
+        second._run_docker_build = MagicMock(side_effect=fake_docker_build)
+        second.build(force=True)
+        second._run_docker_build.assert_called_once()
+        assert "Build cache forced" in capsys.readouterr().out
+
+    def test_rebuilds_on_data_file_change(self, fs):
+        fs.create_file("jobs/queries/report.sql", contents="SELECT 1")
+        self._project(fs).build()
+        Path("jobs/queries/report.sql").write_text("SELECT 2")
+        second = PythonProject("main.py")
+        second._run_docker_build = MagicMock(side_effect=fake_docker_build)
+        second.build()
+        second._run_docker_build.assert_called_once()
+
+    def test_dockerignored_files_dont_rebuild(self, fs):
+        fs.create_file(".dockerignore", contents="# local only\nnotebooks/\n**/*.log\n!keep.log\n")
+        fs.create_file("notebooks/scratch.py", contents="x = 1")
+        fs.create_file("jobs/run.log", contents="a")
+        self._project(fs).build()
+        Path("notebooks/scratch.py").write_text("x = 2")
+        Path("jobs/run.log").write_text("b")
+        second = PythonProject("main.py")
+        second._run_docker_build = MagicMock(side_effect=fake_docker_build)
+        second.build()
+        second._run_docker_build.assert_not_called()
+
+        fs.create_file("keep.log", contents="kept")
+        second.build()
+        second._run_docker_build.assert_called_once()
+
+
+class TestDockerignore:
+    @pytest.mark.parametrize(
+        "pattern, path, ignored",
+        [
+            ("data", "data/x.json", True),
+            ("/data/", "data/x.json", True),
+            ("*.md", "README.md", True),
+            ("*.md", "docs/guide.md", False),
+            ("**/*.pyc", "jobs/__pycache__/a.pyc", True),
+            ("**/*.pyc", "a.pyc", True),
+            ("docs/**", "docs/a/b.md", True),
+            ("file?.txt", "file1.txt", True),
+            ("[!a]x", "bx", False),
+        ],
+    )
+    def test_patterns(self, tmp_path, pattern, path, ignored):
+        (tmp_path / ".dockerignore").write_text(pattern + "\n")
+        assert is_ignored(path, dockerignore_rules(str(tmp_path / ".dockerignore"))) is ignored
+
+    def test_last_match_wins(self, tmp_path):
+        (tmp_path / ".dockerignore").write_text("*.md\n!README*.md\nREADME-secret.md\n")
+        rules = dockerignore_rules(str(tmp_path / ".dockerignore"))
+        assert is_ignored("CHANGES.md", rules)
+        assert not is_ignored("README.md", rules)
+        assert is_ignored("README-secret.md", rules)
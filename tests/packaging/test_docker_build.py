@@ -0,0 +1,91 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from emr_cli.packaging.docker_build import docker_build_command, run_docker_build
+
+TEMPLATE = Path(__file__).parents[2] / "src" / "emr_cli" / "templates" / "pyspark" / "Dockerfile"
+
+
+class TestDockerBuildCommand:
+    def test_plain_build(self):
+        assert docker_build_command("export-python", "dist") == [
+            "docker", "build", "--target", "export-python", "--output", "dist", ".",
+        ]
+
+    def test_layer_cache(self, tmp_path):
+        cache = str(tmp_path / "cache")
+        cmd = docker_build_command("export-poetry", "dist", "Dockerfile", cache, f"{cache}-new")
+        assert cmd[:3] == ["docker", "buildx", "build"]
+        assert "--cache-from" not in cmd
+        assert cmd[cmd.index("--cache-to") + 1] == f"type=local,dest={cache}-new,mode=max"
+        assert cmd[cmd.index("--file") + 1] == "Dockerfile"
+
+        (tmp_path / "cache").mkdir()
+        (tmp_path / "cache" / "index.json").write_text("{}")
+        cmd = docker_build_command("export-poetry", "dist", cache_dir=cache)
+        assert cmd[cmd.index("--cache-from") + 1] == f"type=local,src={cache}"
+
+    @pytest.mark.parametrize("suffix", ["", "/"])
+    def test_new_cache_replaces_old(self, tmp_path, monkeypatch, suffix):
+        monkeypatch.chdir(tmp_path)
+        cache = tmp_path / "cache"
+        cache.mkdir()
+        (cache / "stale").write_text("old layers")
+
+        def build(cmd, **kwargs):
+            dest = cmd[cmd.index("--cache-to") + 1].split(",")[1][len("dest="):]
+            assert os.path.dirname(dest) == str(tmp_path)
+            Path(dest, "index.json").write_text("{}")
+
+        with patch("subprocess.run", side_effect=build):
+            run_docker_build("export-python", "dist", cache_dir="cache" + suffix)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["cache"]
+        assert sorted(p.name for p in cache.iterdir()) == ["index.json"]
+
+    def test_failed_build_keeps_old_cache(self, tmp_path):
+        cache = tmp_path / "cache"
+        cache.mkdir()
+        (cache / "index.json").write_text("{}")
+        with patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "docker")):
+            with pytest.raises(subprocess.CalledProcessError):
+                run_docker_build("export-python", "dist", cache_dir=str(cache))
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["cache"]
+        assert (cache / "index.json").exists()
+
+
+class TestDockerfileTemplate:
+    def test_dependencies_installed_before_sources_copied(self):
+        dockerfile = TEMPLATE.read_text()
+        for stage in ("build-python", "build-poetry"):
+            body = re.search(rf"FROM base as {stage}\n(.*?)\n\n", dockerfile, re.S | re.I).group(1)
+            assert body.index("--mount=type=cache,target=/root/.cache/pip") < body.index("COPY . .")
+        base = re.search(r"AS base\n(.*?)\n# Test stage", dockerfile, re.S).group(1)
+        assert "COPY . ." not in base
+
+    @pytest.mark.parametrize(
+        "pyproject, expected",
+        [
+            ('[project]\nname = "jobs"\nreadme = "README.md"\ndependencies = ["pandas==1.3.5"]\n', "pandas==1.3.5\n"),
+            ('[project]\nname = "jobs"\n', "\n"),
+            ('[project]\nname = "jobs"\ndynamic = ["dependencies"]\n', None),
+            ('[build-system]\nrequires = ["setuptools"]\n', None),
+        ],
+    )
+    def test_dependency_list(self, tmp_path, pyproject, expected):
+        tomllib = pytest.importorskip("tomllib")
+        script = re.search(r"COPY <<'EOF' /tmp/dependencies.py\n(.*?)\nEOF\n", TEMPLATE.read_text(), re.S).group(1)
+        (tmp_path / "pyproject.toml").write_text(pyproject)
+        env = dict(os.environ, PYTHONPATH=str(tmp_path / "shim"))
+        (tmp_path / "shim").mkdir()
+        (tmp_path / "shim" / "tomli.py").write_text(f"from {tomllib.__name__} import *\n")
+        result = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, capture_output=True, text=True)
+        if expected is None:
+            assert result.returncode != 0
+        else:
+            assert result.returncode == 0 and result.stdout == expected
@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import tarfile
+
+import pytest
+
+from emr_cli.packaging.local_build import LocalBuilder, pack_venv
+
+
+def site_packages(tmp_path):
+    root = tmp_path / "site-packages"
+    (root / "requests").mkdir(parents=True)
+    (root / "requests" / "__init__.py").write_text("VERSION = 1")
+    (root / "requests" / "__init__.cpython-37.pyc").write_bytes(b"bytecode")
+    (root / "requests-2.31.0.dist-info").mkdir()
+    (root / "requests-2.31.0.dist-info" / "METADATA").write_text("Name: requests")
+    return root
+
+
+class TestPackVenv:
+    def test_layout(self, tmp_path):
+        output = tmp_path / "pyspark_deps.tar.gz"
+        pack_venv(str(site_packages(tmp_path)), str(output), "3.9")
+
+        with tarfile.open(output) as tar:
+            members = {m.name: m for m in tar.getmembers()}
+            assert sorted(members) == [
+                "bin/python",
+                "bin/python3",
+                "bin/python3.9",
+                "lib/python3.9/site-packages/requests-2.31.0.dist-info/METADATA",
+                "lib/python3.9/site-packages/requests/__init__.py",
+                "pyvenv.cfg",
+            ]
+            assert members["bin/python"].linkname == "/usr/bin/python3"
+            assert "version = 3.9" in tar.extractfile("pyvenv.cfg").read().decode()
+
+    def test_deterministic(self, tmp_path):
+        packages = site_packages(tmp_path)
+        pack_venv(str(packages), str(tmp_path / "a.tar.gz"))
+        (packages / "requests" / "__init__.py").touch()
+        pack_venv(str(packages), str(tmp_path / "b.tar.gz"))
+        assert (tmp_path / "a.tar.gz").read_bytes() == (tmp_path / "b.tar.gz").read_bytes()
+
+
+class TestLocalBuilder:
+    def test_installs_target_platform_wheels(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        commands = []
+
+        def run(cmd, check):
+            commands.append(cmd)
+            if cmd[3] == "wheel":
+                wheel_dir = cmd[cmd.index("--wheel-dir") + 1]
+                os.makedirs(wheel_dir)
+                open(os.path.join(wheel_dir, "project-0.1.0-py3-none-any.whl"), "w").close()
+
+        builder = LocalBuilder("3.9", cache_dir="/cache", run=run)
+        builder.build("dist/pyspark_deps.tar.gz", "requirements.txt")
+
+        wheel, install = commands
+        assert wheel[3:6] == ["wheel", ".", "--no-deps"]
+        assert install[3] == "install"
+        assert install[install.index("--python-version") + 1] == "3.9"
+        assert "--only-binary=:all:" in install
+        assert "manylinux2014_x86_64" in install
+        assert install[install.index("--requirement") + 1] == "requirements.txt"
+        assert install[-4].endswith("project-0.1.0-py3-none-any.whl")
+        assert all(c[c.index("--cache-dir") + 1] == "/cache" for c in commands)
+        assert (tmp_path / "dist" / "pyspark_deps.tar.gz").exists()
+
+    def test_pip_failure(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+
+        def run(cmd, check):
+            raise subprocess.CalledProcessError(1, cmd)
+
+        with pytest.raises(SystemExit):
+            LocalBuilder(run=run).build("dist/pyspark_deps.tar.gz")
+        assert "without --local-build" in capsys.readouterr().out
+
+    def test_rebuild_is_byte_identical(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        def run(cmd, check):
+            if cmd[3] == "wheel":
+                wheel_dir = cmd[cmd.index("--wheel-dir") + 1]
+                os.makedirs(wheel_dir)
+                open(os.path.join(wheel_dir, "project-0.1.0-py3-none-any.whl"), "w").close()
+                return
+            wheel = cmd[-4]
+            dist_info = os.path.join(cmd[cmd.index("--target") + 1], "project-0.1.0.dist-info")
+            os.makedirs(dist_info)
+            with open(os.path.join(dist_info, "direct_url.json"), "w") as f:
+                json.dump({"archive_info": {}, "url": f"file://{wheel}"}, f)
+            with open(os.path.join(dist_info, "RECORD"), "w") as f:
+                f.write("project/__init__.py,sha256=abc,10\n")
+                f.write("project-0.1.0.dist-info/direct_url.json,sha256=def,99\n")
+                f.write("project-0.1.0.dist-info/RECORD,,\n")
+
+        builder = LocalBuilder("3.9", cache_dir="/cache", run=run)
+        builder.build("a.tar.gz")
+        builder.build("b.tar.gz")
+
+        assert (tmp_path / "a.tar.gz").read_bytes() == (tmp_path / "b.tar.gz").read_bytes()
+        with tarfile.open(tmp_path / "a.tar.gz") as tar:
+            dist_info = "lib/python3.9/site-packages/project-0.1.0.dist-info"
+            assert f"{dist_info}/direct_url.json" not in tar.getnames()
+            assert tar.extractfile(f"{dist_info}/RECORD").read() == (
+                b"project/__init__.py,sha256=abc,10\nproject-0.1.0.dist-info/RECORD,,\n"
+            )
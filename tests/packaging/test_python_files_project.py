@@ -1,3 +1,4 @@
+import zipfile
 from pathlib import Path
 from emr_cli.deployments import SparkParams
 
@@ -12,6 +13,16 @@ class TestPythonFilesProject:
         pfp = PythonFilesProject("main.py")
         pfp.build()
         assert Path("dist/pyfiles.zip").exists()
+
+    def test_build_excludes_entrypoint_and_ignored(self, fs):
+        fs.create_file("main.py")
+        fs.create_file("lib/file1.py")
+        fs.create_file(".venv/lib/site.py")
+        fs.create_file("build/generated.py")
+        fs.create_file(".gitignore", contents="build/\n")
+        PythonFilesProject("main.py").build()
+        with zipfile.ZipFile("dist/pyfiles.zip") as zf:
+            assert zf.namelist() == ["lib/file1.py"]
     
     def test_spark_submit(self, fs):
         fs.create_file("main.py")
@@ -1,3 +1,5 @@
+import hashlib
+
 from emr_cli.deployments import SparkParams
 from emr_cli.packaging.python_poetry_project import PythonPoetryProject
 
@@ -12,3 +14,18 @@ class TestPythonFilesProject:
         assert type(sp) == SparkParams
         assert "spark.archives" in sp.params_for("emr_serverless")
         assert "spark.emr-serverless.driverEnv" in sp.params_for("emr_serverless")
+
+    def test_content_addressed_deps(self, fs):
+        fs.create_file("main.py")
+        fs.create_file("dist/pyspark_deps.tar.gz", contents="deps")
+        digest = hashlib.sha256(b"deps").hexdigest()
+        ppp = PythonPoetryProject("main.py", "s3://bucket/code/", deps_uri="s3://bucket/deps/")
+        assert ppp.deps_archive_uri() == f"s3://bucket/deps/{digest}.tar.gz"
+        assert f"spark.archives=s3://bucket/deps/{digest}.tar.gz#environment" in ppp.spark_submit_parameters().params_for(
+            "emr_serverless"
+        )
+
+    def test_default_deps_location(self, fs):
+        fs.create_file("main.py")
+        ppp = PythonPoetryProject("main.py", "s3://bucket/code/")
+        assert ppp.deps_archive_uri() == "s3://bucket/code/pyspark_deps.tar.gz"
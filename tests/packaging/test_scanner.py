@@ -0,0 +1,96 @@
+import os
+
+from emr_cli.packaging.scanner import ProjectScanner
+
+
+class TestProjectScanner:
+    def test_collects_files_and_markers(self, fs):
+        fs.create_file("main.py")
+        fs.create_file("lib/file1.py")
+        fs.create_file("lib/nested/file2.py")
+        fs.create_file("pyproject.toml")
+        scan = ProjectScanner().scan()
+        assert scan.complete
+        assert scan.py_files == sorted(["main.py", os.path.join("lib", "file1.py"), os.path.join("lib", "nested", "file2.py")])
+        assert scan.has("pyproject.toml")
+        assert not scan.has("poetry.lock")
+
+    def test_prunes_default_ignores(self, fs):
+        fs.create_file("main.py")
+        for d in [".venv", ".git", "node_modules", "dist", "__pycache__", "target"]:
+            fs.create_file(f"{d}/module.py")
+            fs.create_file(f"{d}/setup.py")
+        scan = ProjectScanner().scan()
+        assert scan.py_files == ["main.py"]
+        assert not scan.has("setup.py")
+
+    def test_honours_gitignore(self, fs):
+        fs.create_file("main.py")
+        fs.create_file("generated/out.py")
+        fs.create_file("lib/keep.py")
+        fs.create_file("lib/scratch_test.py")
+        fs.create_file(".gitignore", contents="# comment\ngenerated/\n*_test.py\n!lib/important.py\n")
+        scan = ProjectScanner().scan()
+        assert scan.py_files == ["lib/keep.py".replace("/", os.sep), "main.py"]
+
+    def test_honours_configured_ignores(self, fs):
+        fs.create_file("main.py")
+        fs.create_file("vendored/lib.py")
+        fs.create_file(".emr/config.yaml", contents="project:\n  ignore:\n    - vendored\n")
+        assert ProjectScanner().scan().py_files == ["main.py"]
+
+    def test_explicit_ignore_list(self, fs):
+        fs.create_file("main.py")
+        fs.create_file(".venv/lib.py")
+        scan = ProjectScanner(ignore=[], use_gitignore=False).scan()
+        assert scan.py_files == [os.path.join(".venv", "lib.py"), "main.py"]
+
+    def test_stop_early(self, fs):
+        fs.create_file("poetry.lock")
+        fs.create_file("main.py")
+        fs.create_file("lib/file1.py")
+        scan = ProjectScanner().scan(stop_early=True)
+        assert scan.has("poetry.lock")
+        assert not scan.complete
+        assert scan.py_files == ["main.py"]
+
+
+class TestScanCache:
+    def test_reuses_cached_scan(self, fs, monkeypatch):
+        fs.create_file("main.py")
+        fs.create_file("lib/file1.py")
+        first = ProjectScanner().scan()
+        assert os.path.exists(".emr/cache/project-scan.json")
+
+        def fail_walk(*args, **kwargs):
+            raise AssertionError("project should not be walked on a cache hit")
+
+        monkeypatch.setattr(os, "walk", fail_walk)
+        second = ProjectScanner().scan()
+        assert second.py_files == first.py_files
+        assert second.complete
+
+    def test_invalidated_when_files_added(self, fs):
+        fs.create_file("main.py")
+        ProjectScanner().scan()
+        fs.create_file("lib/file1.py")
+        # Make sure the directory change is visible even with coarse mtimes
+        os.utime(".", ns=(0, os.stat(".").st_mtime_ns + 1_000_000_000))
+        assert ProjectScanner().scan().py_files == ["lib/file1.py".replace("/", os.sep), "main.py"]
+
+    def test_invalidated_when_files_removed(self, fs):
+        fs.create_file("main.py")
+        fs.create_file("lib/file1.py")
+        ProjectScanner().scan()
+        os.remove("lib/file1.py")
+        os.utime("lib", ns=(0, os.stat("lib").st_mtime_ns + 1_000_000_000))
+        assert ProjectScanner().scan().py_files == ["main.py"]
+
+    def test_partial_scan_completed_on_demand(self, fs):
+        fs.create_file("poetry.lock")
+        fs.create_file("main.py")
+        fs.create_file("lib/file1.py")
+        assert not ProjectScanner().scan(stop_early=True).complete
+        scan = ProjectScanner().scan()
+        assert scan.complete
+        assert len(scan.py_files) == 2
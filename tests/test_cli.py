@@ -1,9 +1,14 @@
+import os
+from unittest.mock import patch
+
 from click.testing import CliRunner
 
 from emr_cli.emr_cli import cli
 
 class TestCli:
-    def test_version(self):
+    def test_version(self, tmp_path, monkeypatch):
+        # Project detection caches its scan under .emr/, so keep it out of the working tree
+        monkeypatch.chdir(tmp_path)
         runner = CliRunner()
         result = runner.invoke(cli, ['status'])
         assert result.exit_code == 0
@@ -19,7 +24,8 @@ class TestCli:
             assert result.exit_code == 0
             assert 'Project type:\t\tSimpleProject' in result.output
     
-    def test_resource_validation(self):
+    def test_resource_validation(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
         runner = CliRunner()
         result = runner.invoke(cli, ['run'])
         assert result.exit_code == 2
@@ -35,3 +41,109 @@ class TestCli:
             result = runner.invoke(cli, ['run', arg, '1234'])
             assert result.exit_code == 2
             assert 'Error: --entry-point' in result.output
+
+    def test_batch_validation(self):
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open('main.py', 'w') as f:
+                f.write('print("Hello World")')
+            with open('batch.yaml', 'w') as f:
+                f.write('runs: []\n')
+
+            base = ['run', '--application-id', '1234', '--entry-point', 'main.py', '--s3-code-uri', 's3://b/code/']
+            result = runner.invoke(cli, base + ['--batch-args', 'a,b', '--job-args', 'c'])
+            assert result.exit_code == 2
+            assert '--job-args can\'t be used' in result.output
+
+            result = runner.invoke(cli, base + ['--batch-file', 'batch.yaml'])
+            assert result.exit_code == 2
+            assert 'matrix' in result.output
+
+    def test_pipeline_requires_build(self):
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open('main.py', 'w') as f:
+                f.write('print("Hello World")')
+            result = runner.invoke(cli, [
+                'run', '--cluster-id', 'j-1234', '--entry-point', 'main.py', '--s3-code-uri', 's3://b/code/', '--pipeline'
+            ])
+            assert result.exit_code == 2
+            assert '--pipeline can only be used with --build' in result.output
+
+    def test_bootstrap_worker_size_validation(self):
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            'bootstrap', '--target', 'emr-serverless', '--code-bucket', 'b', '--job-role-name', 'r',
+            '--executor-size', '4vCPU'
+        ])
+        assert result.exit_code == 2
+        assert 'cpu,memory[,disk]' in result.output
+
+    def test_config_sections_survive_bootstrap_and_save_config(self):
+        import yaml
+
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open('main.py', 'w') as f:
+                f.write('print("Hello World")')
+            os.makedirs('.emr')
+            with open('.emr/config.yaml', 'w') as f:
+                yaml.dump({'project': {'ignore': ['data/']}, 'aws': {'max_pool_connections': 50}}, f)
+
+            environment = {'application_id': '00abc', 'code_bucket': 'b', 'log_bucket': 'b'}
+            with patch('emr_cli.deployments.emr_serverless.Bootstrap.create_environment', return_value=environment):
+                result = runner.invoke(cli, [
+                    'bootstrap', '--target', 'emr-serverless', '--code-bucket', 'b', '--job-role-name', 'r'
+                ])
+            assert result.exit_code == 0, result.output
+
+            # Saves the config, then fails because there's no job role
+            result = runner.invoke(cli, [
+                'run', '--entry-point', 'main.py', '--s3-code-uri', 's3://b/other/', '--save-config'
+            ])
+            assert '--job-role are required' in result.output
+
+            with open('.emr/config.yaml') as f:
+                config = yaml.safe_load(f)
+            assert config['project'] == {'ignore': ['data/']}
+            assert config['aws'] == {'max_pool_connections': 50}
+            assert config['bootstrap']['idle_timeout'] == 15
+            assert config['run']['application_id'] == '00abc'
+            assert config['run']['s3_code_uri'] == 's3://b/other/'
+
+    def test_python_version_requires_local_build(self):
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open('main.py', 'w') as f:
+                f.write('print("Hello World")')
+            result = runner.invoke(cli, ['package', '--entry-point', 'main.py', '--python-version', '3.9'])
+            assert result.exit_code == 2
+            assert '--python-version can only be used with --local-build' in result.output
+
+            result = runner.invoke(cli, [
+                'run', '--cluster-id', 'j-1234', '--entry-point', 'main.py', '--s3-code-uri', 's3://b/code/',
+                '--build', '--python-version', '3.9'
+            ])
+            assert result.exit_code == 2
+            assert '--python-version can only be used with --local-build' in result.output
+
+    def test_docker_cache_dir_requires_docker_build(self):
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open('main.py', 'w') as f:
+                f.write('print("Hello World")')
+            run = ['run', '--cluster-id', 'j-1234', '--entry-point', 'main.py', '--s3-code-uri', 's3://b/code/']
+            for args in (run, run + ['--build', '--local-build']):
+                result = runner.invoke(cli, args + ['--docker-cache-dir', 'cache'])
+                assert result.exit_code == 2
+                assert '--docker-cache-dir can only be used with --build' in result.output
+
+            result = runner.invoke(cli, [
+                'package', '--entry-point', 'main.py', '--local-build', '--docker-cache-dir', 'cache'
+            ])
+            assert result.exit_code == 2
+            assert "--docker-cache-dir can't be used with --local-build" in result.output
+
+            result = runner.invoke(cli, ['package', '--entry-point', 'main.py', '--docker-cache-dir', '.'])
+            assert result.exit_code == 2
+            assert 'not one containing the project' in result.output
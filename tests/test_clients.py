@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from emr_cli import clients
+
+
+class TestClients:
+    def test_clients_are_shared_per_service_and_region(self):
+        s3 = clients.client("s3")
+        assert clients.client("s3") is s3
+        assert clients.client("s3", "eu-west-1") is not s3
+        assert clients.client("s3", "eu-west-1").meta.region_name == "eu-west-1"
+        assert clients.client("emr-serverless") is not s3
+
+    def test_concurrent_creation(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            created = list(executor.map(lambda _: clients.client("emr"), range(16)))
+        assert all(c is created[0] for c in created)
+
+    def test_default_config(self):
+        config = clients.client("s3").meta.config
+        assert config.max_pool_connections == 32
+        assert config.retries["mode"] == "adaptive"
+        # botocore counts the first attempt too
+        assert config.retries["total_max_attempts"] == 11
+        assert config.connect_timeout == 10
+        assert config.read_timeout == 60
+
+    def test_config_file(self, monkeypatch):
+        monkeypatch.setattr(
+            clients.ConfigReader, "read", lambda: {"aws": {"max_pool_connections": 64, "retry_mode": "standard"}}
+        )
+        config = clients.client("s3").meta.config
+        assert config.max_pool_connections == 64
+        assert config.retries["mode"] == "standard"
+
+    def test_configure_and_reset(self):
+        before = clients.client("s3")
+        clients.configure(max_pool_connections=100)
+        after = clients.client("s3")
+        assert after is not before
+        assert after.meta.config.max_pool_connections == 100
+        with pytest.raises(ValueError):
+            clients.configure(pool_size=1)
+
+        clients.reset()
+        assert clients.client("s3").meta.config.max_pool_connections == 32
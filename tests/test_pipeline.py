@@ -0,0 +1,81 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from emr_cli.deployments.emr_serverless import DeploymentPackage
+from emr_cli.pipeline import run_pipelined
+from emr_cli.utils import StageTimer
+
+NOT_FOUND = ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+
+
+class SlowBuildProject(DeploymentPackage):
+    """
+    A project whose build only finishes once the entrypoint has been uploaded.
+    """
+
+    def __init__(self, entry_point_path: str, dist_dir: str, entrypoint_uploaded: threading.Event):
+        super().__init__(entry_point_path)
+        self.dist_dir = dist_dir
+        self.entrypoint_uploaded = entrypoint_uploaded
+
+    def build(self, force: bool = False):
+        assert self.entrypoint_uploaded.wait(timeout=5), "entrypoint wasn't uploaded during the build"
+        with open(f"{self.dist_dir}/pyfiles.zip", "w") as f:
+            f.write("zip")
+
+    def build_artifacts(self, prefix: str):
+        return {f"{self.dist_dir}/pyfiles.zip": f"{prefix}/pyfiles.zip"}
+
+
+@pytest.fixture
+def s3_client():
+    client = MagicMock()
+    client.head_object.side_effect = NOT_FOUND
+    with patch("emr_cli.clients.client", return_value=client):
+        yield client
+
+
+class TestRunPipelined:
+    def test_uploads_sources_during_build(self, tmp_path, s3_client, capsys):
+        entrypoint = tmp_path / "main.py"
+        entrypoint.write_text("print('hello')")
+        uploaded = threading.Event()
+        s3_client.upload_file.side_effect = lambda src, *args, **kwargs: uploaded.set() if src.endswith("main.py") else None
+        check = MagicMock(return_value="STARTED")
+
+        project = SlowBuildProject(str(entrypoint), str(tmp_path), uploaded)
+        timer = run_pipelined(project, "s3://bucket/code", {"check application": check})
+
+        assert project.s3_uri_base == "s3://bucket/code"
+        check.assert_called_once()
+        keys = sorted(c.args[2] for c in s3_client.upload_file.call_args_list)
+        assert keys == ["code/main.py", "code/pyfiles.zip"]
+        assert set(timer.stages) == {"upload sources", "build", "upload build artifacts", "check application"}
+        assert "critical path" in capsys.readouterr().out
+
+    def test_readiness_check_errors_are_raised(self, tmp_path, s3_client):
+        entrypoint = tmp_path / "main.py"
+        entrypoint.write_text("print('hello')")
+        done = threading.Event()
+        done.set()
+
+        def terminated():
+            raise RuntimeError("application is terminated")
+
+        with pytest.raises(RuntimeError, match="terminated"):
+            run_pipelined(SlowBuildProject(str(entrypoint), str(tmp_path), done), "s3://bucket/code", {"app": terminated})
+
+
+class TestStageTimer:
+    def test_critical_path_follows_dependencies(self):
+        timer = StageTimer()
+        timer.stages = {
+            "upload sources": (0.0, 1.0, None),
+            "build": (0.0, 30.0, None),
+            "upload build artifacts": (30.0, 34.0, "build"),
+            "check application": (0.0, 0.5, None),
+        }
+        assert timer.critical_path() == ["build", "upload build artifacts"]
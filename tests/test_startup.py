@@ -0,0 +1,64 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Modules that are expensive to import and must stay out of CLI startup
+HEAVY_MODULES = ["boto3", "botocore", "rich", "yaml"]
+
+# Generous wall-clock budget (seconds) on top of the interpreter and click import.
+# Loading boto3 alone costs more than this on most machines, so a regression
+# that pulls it back into startup fails well before this is reached.
+STARTUP_BUDGET_SEC = 1.0
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import click
+click_loaded = time.perf_counter()
+from emr_cli.emr_cli import cli
+imported = time.perf_counter()
+try:
+    cli(sys.argv[1:], prog_name="emr")
+except SystemExit:
+    pass
+done = time.perf_counter()
+print(json.dumps({
+    "import_sec": imported - click_loaded,
+    "total_sec": done - click_loaded,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (
+    HEAVY_MODULES,
+)
+
+
+def run_probe(args, cwd):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    @pytest.mark.parametrize("args", [[], ["--help"], ["status"], ["run", "--help"]])
+    def test_no_heavy_imports(self, tmp_path, args):
+        (tmp_path / "main.py").write_text("print('hello')")
+        stats = run_probe(args, tmp_path)
+        assert stats["loaded"] == []
+
+    @pytest.mark.parametrize("args", [["--help"], ["status"], ["run", "--help"]])
+    def test_startup_budget(self, tmp_path, args):
+        (tmp_path / "main.py").write_text("print('hello')")
+        # Take the best of a few runs to smooth out noisy CI machines
+        runs = [run_probe(args, tmp_path) for _ in range(3)]
+        import_sec = min(r["import_sec"] for r in runs)
+        total_sec = min(r["total_sec"] for r in runs)
+        print(f"emr {' '.join(args)}: import {import_sec * 1000:.1f}ms, total {total_sec * 1000:.1f}ms")
+        assert import_sec < STARTUP_BUDGET_SEC
+        assert total_sec < STARTUP_BUDGET_SEC
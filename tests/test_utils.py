@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import io
+from unittest.mock import MagicMock
+
+from botocore.exceptions import ClientError
+
+from emr_cli.utils import PrettyUploader, build_transfer_config, iter_gz_lines, print_s3_gz
+
+NOT_FOUND = ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+
+
+class TestPrettyUploader:
+    def test_uploads_with_hash_metadata(self, fs):
+        fs.create_file("main.py", contents="print('hello')")
+        client = MagicMock()
+        client.head_object.side_effect = NOT_FOUND
+        PrettyUploader(client, "bucket", {"main.py": "code/main.py"}).run()
+
+        digest = hashlib.sha256(b"print('hello')").hexdigest()
+        client.upload_file.assert_called_once()
+        args, kwargs = client.upload_file.call_args
+        assert args == ("main.py", "bucket", "code/main.py")
+        assert kwargs["ExtraArgs"] == {"Metadata": {"sha256": digest}}
+
+    def test_skips_unchanged(self, fs, capsys):
+        fs.create_file("main.py", contents="print('hello')")
+        fs.create_file("dist/pyspark_deps.tar.gz", contents="deps")
+        client = MagicMock()
+        client.head_object.side_effect = lambda Bucket, Key: {
+            "Metadata": {"sha256": hashlib.sha256(b"deps").hexdigest()}
+        } if Key == "code/pyspark_deps.tar.gz" else {"Metadata": {"sha256": "stale"}}
+
+        PrettyUploader(
+            client,
+            "bucket",
+            {"main.py": "code/main.py", "dist/pyspark_deps.tar.gz": "code/pyspark_deps.tar.gz"},
+        ).run()
+
+        assert [c.args[0] for c in client.upload_file.call_args_list] == ["main.py"]
+        assert "dist/pyspark_deps.tar.gz is up to date" in capsys.readouterr().out
+
+    def test_full_uri_target(self, fs):
+        fs.create_file("dist/pyspark_deps.tar.gz", contents="deps")
+        client = MagicMock()
+        client.head_object.side_effect = NOT_FOUND
+        PrettyUploader(client, "bucket", {"dist/pyspark_deps.tar.gz": "s3://shared/deps/abc.tar.gz"}).run()
+        client.head_object.assert_called_once_with(Bucket="shared", Key="deps/abc.tar.gz")
+        assert client.upload_file.call_args.args == ("dist/pyspark_deps.tar.gz", "shared", "deps/abc.tar.gz")
+
+    def test_skip_can_be_disabled(self, fs):
+        fs.create_file("main.py", contents="print('hello')")
+        client = MagicMock()
+        PrettyUploader(client, "bucket", {"main.py": "code/main.py"}, skip_unchanged=False).run()
+        client.head_object.assert_not_called()
+        client.upload_file.assert_called_once()
+
+    def test_concurrent_uploads_with_transfer_config(self, fs):
+        import threading
+
+        fs.create_file("main.py", contents="print('hello')")
+        fs.create_file("dist/pyfiles.zip", contents="zip")
+        config = build_transfer_config(multipart_threshold_mb=16, multipart_chunksize_mb=8, max_concurrency=4)
+        assert config.multipart_threshold == 16 * 1024 * 1024
+        assert config.multipart_chunksize == 8 * 1024 * 1024
+        assert config.max_concurrency == 4
+
+        # Both uploads must be in flight at the same time to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        client = MagicMock()
+        client.head_object.side_effect = NOT_FOUND
+        client.upload_file.side_effect = lambda *args, **kwargs: barrier.wait()
+        PrettyUploader(
+            client,
+            "bucket",
+            {"main.py": "code/main.py", "dist/pyfiles.zip": "code/pyfiles.zip"},
+            transfer_config=config,
+        ).run()
+        assert all(c.kwargs["Config"] is config for c in client.upload_file.call_args_list)
+
+    def test_default_transfer_config(self):
+        assert build_transfer_config() is None
+
+
+class TestGzipLogs:
+    def test_lines_across_chunks(self):
+        text = "first line\nsecond ünïcödé line ✓\n" * 50 + "no newline at end"
+        lines = list(iter_gz_lines(io.BytesIO(gzip.compress(text.encode())), chunk_size=7))
+        assert "".join(lines) == text
+        assert lines[1] == "second ünïcödé line ✓\n"
+        assert lines[-1] == "no newline at end"
+
+    def test_long_lines_are_split(self, monkeypatch):
+        monkeypatch.setattr("emr_cli.utils.MAX_LOG_LINE", 10)
+        lines = list(iter_gz_lines(io.BytesIO(gzip.compress(b"x" * 35 + b"\n")), chunk_size=4))
+        assert "".join(lines) == "x" * 35 + "\n"
+        assert max(len(line) for line in lines) <= 11
+
+    def test_print_s3_gz(self, capsys):
+        client = MagicMock()
+        client.get_object.return_value = {"Body": io.BytesIO(gzip.compress(b"hello\nworld"))}
+        print_s3_gz(client, "s3://bucket/logs/stdout.gz")
+        client.get_object.assert_called_once_with(Bucket="bucket", Key="logs/stdout.gz")
+        assert capsys.readouterr().out == "hello\nworld\n"